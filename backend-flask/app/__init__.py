@@ -1,10 +1,19 @@
 from flask import Flask, request
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
-from app.models.db import init_db
+from app.models.db import init_db, init_pool, init_checkpoint, CONFIG_PADRAO
+from app.utils.json_provider import JSONProviderRapido
+from app.utils import idempotencia, limite_taxa, senhas
+from app.service import gravador_pedidos
+from app.service.fila_cozinha import obter_fila_cozinha
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
 
+    # Serialização JSON com orjson quando disponível (fallback para a stdlib)
+    app.json_provider_class = JSONProviderRapido
+    app.json = JSONProviderRapido(app)
+
     # Configurar CORS para permitir requisições do frontend
     @app.after_request
     def after_request(response):
@@ -32,14 +41,67 @@ def create_app():
     # Usar caminho absoluto baseado na localização do arquivo
     app_dir = os.path.dirname(os.path.abspath(__file__))
     db_path = os.path.join(app_dir, '..', 'database', 'db.sqlite3')
-    schema_path = os.path.join(app_dir, '..', 'database', 'schema.sql')
+    migracoes_path = os.path.join(app_dir, '..', 'database', 'migracoes')
     seed_path = os.path.join(app_dir, '..', 'database', 'seed.sql')
 
     app.config['DB_PATH'] = db_path
 
-    # Inicializar banco de dados apenas com schema (sem dados iniciais automáticos)
+    # Pool de conexões (DB_POOL_SIZE=0 desabilita e abre uma conexão por chamada)
+    app.config['DB_POOL_SIZE'] = int(os.getenv('DB_POOL_SIZE', 8))
+    app.config['DB_POOL_TIMEOUT'] = float(os.getenv('DB_POOL_TIMEOUT', 5.0))
+    app.config['DB_POOL_HEALTH_CHECK'] = float(os.getenv('DB_POOL_HEALTH_CHECK', 30.0))
+
+    # Configuração do SQLite (journal, sincronização, caches e checkpoints do WAL)
+    for chave, padrao in CONFIG_PADRAO.items():
+        valor = os.getenv(chave)
+        app.config[chave] = type(padrao)(valor) if valor is not None else padrao
+
+    # Segundos entre verificações da geração do catálogo em cache
+    app.config['CATALOGO_CACHE_VERIFICACAO'] = float(os.getenv('CATALOGO_CACHE_VERIFICACAO', 1.0))
+    # Segundos entre verificações de escritas de outros workers na fila da cozinha
+    app.config['FILA_COZINHA_VERIFICACAO'] = float(os.getenv('FILA_COZINHA_VERIFICACAO', 1.0))
+
+    # Cache de tokens JWT já verificados (entradas e segundos de validade)
+    app.config['JWT_CACHE_TAMANHO'] = int(os.getenv('JWT_CACHE_TAMANHO', 1024))
+    app.config['JWT_CACHE_TTL'] = float(os.getenv('JWT_CACHE_TTL', 300.0))
+    # Segundos entre leituras de revogações feitas por outros workers
+    app.config['JWT_REVOGACAO_VERIFICACAO'] = float(os.getenv('JWT_REVOGACAO_VERIFICACAO', 1.0))
+
+    # Hash de senhas (custo do scrypt, threads do pool e limite de admissão)
+    # e limite de taxa do login (token bucket por IP e por email)
+    # e validade das chaves de idempotência da criação de pedidos
+    # e gravação de pedidos (direta ou em lote pela fila)
+    for chave, padrao in {**senhas.CONFIG_PADRAO, **limite_taxa.CONFIG_PADRAO,
+                          **idempotencia.CONFIG_PADRAO, **gravador_pedidos.CONFIG_PADRAO}.items():
+        valor = os.getenv(chave)
+        app.config[chave] = type(padrao)(valor) if valor is not None else padrao
+
+    # Proxies reversos à frente da aplicação (0: nenhum); com eles, o IP do
+    # cliente vem de X-Forwarded-For (usado pelo limite de taxa do login)
+    app.config['PROXIES_CONFIAVEIS'] = int(os.getenv('PROXIES_CONFIAVEIS', 0))
+
+    # Sobrescritas explícitas (testes, benchmarks)
+    if config:
+        app.config.update(config)
+    db_path = app.config['DB_PATH']
+
+    if app.config['PROXIES_CONFIAVEIS'] > 0:
+        proxies = app.config['PROXIES_CONFIAVEIS']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies, x_host=proxies)
+
+    # Aplicar migrações pendentes (sem dados iniciais automáticos); com o banco
+    # já atualizado é só uma leitura de schema_version
+    with app.app_context():
+        init_db(db_path, migracoes_path, journal_mode=app.config['DB_JOURNAL_MODE'])
+
+    init_pool(app)
+    init_checkpoint(app)
+
+    # Fila da cozinha já carregada antes da primeira requisição; o limitador de
+    # login também é criado aqui, para que limites inválidos falhem na subida
     with app.app_context():
-        init_db(db_path, schema_path)
+        obter_fila_cozinha().carregar()
+        limite_taxa.obter_limitador_login()
 
     from .routes.init import init_bp
     from .routes.usuarios import usuarios_bp
@@ -47,6 +109,7 @@ def create_app():
     from .routes.produtos import produtos_bp
     from .routes.categorias import categorias_bp
     from .routes.pedidos import pedidos_bp
+    from .routes.batch import batch_bp
 
     app.register_blueprint(init_bp)
     app.register_blueprint(usuarios_bp)
@@ -54,5 +117,6 @@ def create_app():
     app.register_blueprint(produtos_bp)
     app.register_blueprint(categorias_bp)
     app.register_blueprint(pedidos_bp)
+    app.register_blueprint(batch_bp)
 
     return app
\ No newline at end of file
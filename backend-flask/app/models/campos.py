@@ -0,0 +1,47 @@
+from datetime import datetime
+
+
+class DataHora:
+    """Atributo de data/hora com conversão preguiçosa.
+
+    Guarda o valor como veio (texto do SQLite, datetime ou None) em um slot
+    `_<nome>` e só chama datetime.fromisoformat quando alguém lê o atributo.
+    Sem valor, usa datetime.now() no primeiro acesso.
+    """
+
+    def __set_name__(self, dono, nome):
+        self.slot = f"_{nome}"
+
+    def __get__(self, obj, tipo=None):
+        if obj is None:
+            return self
+
+        valor = getattr(obj, self.slot)
+        if isinstance(valor, datetime):
+            return valor
+
+        if valor is None:
+            valor = datetime.now()
+        else:
+            try:
+                valor = datetime.fromisoformat(valor)
+            except (ValueError, TypeError):
+                valor = None
+
+        setattr(obj, self.slot, valor)
+        return valor
+
+    def __set__(self, obj, valor):
+        setattr(obj, self.slot, valor)
+
+    def iso(self, obj):
+        """Valor em ISO 8601 sem converter para datetime quando veio do banco"""
+        valor = getattr(obj, self.slot)
+        if isinstance(valor, str):
+            # "AAAA-MM-DD HH:MM:SS[.ffffff]" (SQLite) -> "AAAA-MM-DDTHH:MM:SS[.ffffff]"
+            if len(valor) > 10 and valor[10] == ' ':
+                return f"{valor[:10]}T{valor[11:]}"
+            return valor
+
+        valor = self.__get__(obj)
+        return valor.isoformat() if valor else None
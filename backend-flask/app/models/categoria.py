@@ -1,17 +1,25 @@
 from datetime import datetime
 
+from app.models.campos import DataHora
+
 
 class Categoria:
     """Modelo de dados para Categoria de Produto"""
 
+    __slots__ = ('id', 'nome', 'descricao', 'ativo', '_criado_em',
+                 '_atualizado_em')
+
+    criado_em = DataHora()
+    atualizado_em = DataHora()
+
     def __init__(self, id=None, nome=None, descricao=None,
                  ativo=True, criado_em=None, atualizado_em=None):
         self.id = id
         self.nome = nome
         self.descricao = descricao
         self.ativo = ativo
-        self.criado_em = criado_em or datetime.now()
-        self.atualizado_em = atualizado_em or datetime.now()
+        self.criado_em = criado_em
+        self.atualizado_em = atualizado_em
 
     def to_dict(self):
         """Converte o objeto para dicionário (para JSON)"""
@@ -20,9 +28,8 @@ class Categoria:
             'nome': self.nome,
             'descricao': self.descricao,
             'ativo': self.ativo,
-            'criado_em': self.criado_em.isoformat() if self.criado_em else None,
-            'atualizado_em': (self.atualizado_em.isoformat()
-                              if self.atualizado_em else None)
+            'criado_em': type(self).criado_em.iso(self),
+            'atualizado_em': type(self).atualizado_em.iso(self)
         }
 
     @staticmethod
@@ -1,35 +1,373 @@
 import sqlite3
 import os
-from flask import current_app
+import threading
+import time
+from collections import deque
+from flask import current_app, g
+from app.models.migracoes import migrar
+
+# Valores padrão das configurações do SQLite (sobrescritos por app.config)
+CONFIG_PADRAO = {
+    'DB_JOURNAL_MODE': 'WAL',
+    'DB_SYNCHRONOUS': 'NORMAL',
+    'DB_BUSY_TIMEOUT_MS': 5000,
+    'DB_CACHE_SIZE_KB': 8192,
+    'DB_MMAP_SIZE': 64 * 1024 * 1024,
+    'DB_TEMP_STORE': 'MEMORY',
+    'DB_CHECKPOINT_INTERVALO': 60.0,
+    'DB_WAL_LIMITE_BYTES': 16 * 1024 * 1024,
+}
+
+# Pragmas aplicados uma única vez, quando a conexão do pool é aberta
+PRAGMAS_CONEXAO = (
+    "PRAGMA busy_timeout = 5000",
+)
+
+
+def pragmas_da_config(config):
+    """Monta os pragmas por conexão a partir da configuração da aplicação"""
+    valor = lambda chave: config.get(chave, CONFIG_PADRAO[chave])
+    return (
+        f"PRAGMA busy_timeout = {int(valor('DB_BUSY_TIMEOUT_MS'))}",
+        f"PRAGMA synchronous = {valor('DB_SYNCHRONOUS')}",
+        # Valor negativo: tamanho em KiB em vez de número de páginas
+        f"PRAGMA cache_size = -{int(valor('DB_CACHE_SIZE_KB'))}",
+        f"PRAGMA mmap_size = {int(valor('DB_MMAP_SIZE'))}",
+        f"PRAGMA temp_store = {valor('DB_TEMP_STORE')}",
+    )
+
+
+def conectar(db_path, pragmas=PRAGMAS_CONEXAO, **kwargs):
+    """Abre uma conexão e aplica os pragmas por conexão"""
+    conn = sqlite3.connect(db_path, **kwargs)
+    for pragma in pragmas:
+        conn.execute(pragma)
+    return conn
+
+
+class PoolEsgotadoError(Exception):
+    """Nenhuma conexão livre no pool dentro do tempo de espera"""
+
+
+class ConexaoPool:
+    """Conexão emprestada pelo pool.
+
+    Delega tudo para a conexão sqlite3 real. O close() apenas descarta a
+    transação pendente (como o close original fazia); a conexão continua
+    com o app context até o teardown, quando volta para o pool.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def close(self):
+        if self._conn.in_transaction:
+            self._conn.rollback()
+
+    def __getattr__(self, nome):
+        return getattr(self._conn, nome)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+
+class ConnectionPool:
+    """Pool limitado de conexões SQLite de longa duração.
+
+    A conexão emprestada fica com o app context (e portanto com a thread
+    que o atende) até o teardown. Ao pedir uma nova conexão, a thread
+    recebe preferencialmente a mesma que usou da última vez.
+    """
+
+    def __init__(self, db_path, max_size=8, timeout=5.0,
+                 health_check_interval=30.0, pragmas=PRAGMAS_CONEXAO):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.pragmas = pragmas
+
+        # (conexão, thread que a devolveu, instante da devolução)
+        self._livres = deque()
+        self._abertas = 0
+        self._cond = threading.Condition()
+
+    def _abrir(self):
+        return conectar(self.db_path, self.pragmas, check_same_thread=False)
+
+    def _saudavel(self, conn, devolvida_em):
+        if time.monotonic() - devolvida_em < self.health_check_interval:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _descartar(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._cond:
+            self._abertas -= 1
+            self._cond.notify()
+
+    def _retirar_livre(self):
+        """Retira uma conexão livre, preferindo a última usada por esta thread"""
+        thread_id = threading.get_ident()
+        for entrada in reversed(self._livres):
+            if entrada[1] == thread_id:
+                self._livres.remove(entrada)
+                return entrada
+        return self._livres.pop()
+
+    def acquire(self):
+        """Empresta uma conexão, abrindo uma nova se o limite permitir"""
+        limite = time.monotonic() + self.timeout
+        while True:
+            with self._cond:
+                while not self._livres and self._abertas >= self.max_size:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        raise PoolEsgotadoError(
+                            "Nenhuma conexão disponível no pool")
+                    self._cond.wait(restante)
+
+                if self._livres:
+                    conn, _, devolvida_em = self._retirar_livre()
+                else:
+                    self._abertas += 1
+                    conn, devolvida_em = None, None
+
+            if conn is None:
+                try:
+                    return self._abrir()
+                except Exception:
+                    with self._cond:
+                        self._abertas -= 1
+                        self._cond.notify()
+                    raise
+
+            if self._saudavel(conn, devolvida_em):
+                return conn
+            self._descartar(conn)
+
+    def release(self, conn):
+        """Devolve uma conexão ao pool, descartando transações pendentes"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._descartar(conn)
+            return
+
+        with self._cond:
+            self._livres.append((conn, threading.get_ident(), time.monotonic()))
+            self._cond.notify()
+
+    def close_all(self):
+        """Fecha todas as conexões livres"""
+        with self._cond:
+            while self._livres:
+                conn, _, _ = self._livres.pop()
+                conn.close()
+                self._abertas -= 1
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'abertas': self._abertas,
+                'livres': len(self._livres),
+                'max_size': self.max_size
+            }
+
+
+class GerenciadorCheckpoint:
+    """Thread que faz checkpoints periódicos do WAL.
+
+    A cada intervalo roda um checkpoint PASSIVE (não bloqueia leitores nem
+    escritores); se o arquivo -wal passou do limite, tenta um TRUNCATE para
+    devolver o espaço em disco.
+    """
+
+    def __init__(self, db_path, intervalo, limite_wal_bytes, pragmas=PRAGMAS_CONEXAO):
+        self.db_path = db_path
+        self.intervalo = intervalo
+        self.limite_wal_bytes = limite_wal_bytes
+        self.pragmas = pragmas
+        self.ultimo = None
+        self.execucoes = 0
+        self._parar = threading.Event()
+        self._thread = None
+
+    def checkpoint(self):
+        """Executa um checkpoint agora e retorna o resultado"""
+        caminho_wal = self.db_path + '-wal'
+        tamanho = os.path.getsize(caminho_wal) if os.path.exists(caminho_wal) else 0
+        modo = 'TRUNCATE' if tamanho > self.limite_wal_bytes else 'PASSIVE'
+
+        conn = conectar(self.db_path, self.pragmas)
+        try:
+            ocupado, paginas_log, paginas_copiadas = conn.execute(
+                f"PRAGMA wal_checkpoint({modo})").fetchone()
+        finally:
+            conn.close()
+
+        self.execucoes += 1
+        self.ultimo = {
+            'modo': modo,
+            'ocupado': bool(ocupado),
+            'paginas_log': paginas_log,
+            'paginas_copiadas': paginas_copiadas,
+            'tamanho_wal_antes': tamanho,
+            'em': time.time()
+        }
+        return self.ultimo
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.checkpoint()
+            except sqlite3.Error as e:
+                self.ultimo = {'erro': str(e), 'em': time.time()}
+
+    def iniciar(self):
+        self._thread = threading.Thread(
+            target=self._executar, name='sqlite-checkpoint', daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+
+    def stats(self):
+        return {
+            'intervalo': self.intervalo,
+            'limite_wal_bytes': self.limite_wal_bytes,
+            'execucoes': self.execucoes,
+            'ultimo': self.ultimo
+        }
+
+
+def init_checkpoint(app):
+    """Inicia o checkpoint periódico quando o banco está em modo WAL"""
+    intervalo = app.config.get('DB_CHECKPOINT_INTERVALO',
+                               CONFIG_PADRAO['DB_CHECKPOINT_INTERVALO'])
+    modo = app.config.get('DB_JOURNAL_MODE', CONFIG_PADRAO['DB_JOURNAL_MODE'])
+    if intervalo <= 0 or modo.upper() != 'WAL':
+        app.extensions['sqlite_checkpoint'] = None
+        return None
+
+    gerenciador = GerenciadorCheckpoint(
+        app.config['DB_PATH'], intervalo,
+        app.config.get('DB_WAL_LIMITE_BYTES', CONFIG_PADRAO['DB_WAL_LIMITE_BYTES']),
+        pragmas_da_config(app.config))
+    gerenciador.iniciar()
+    app.extensions['sqlite_checkpoint'] = gerenciador
+    return gerenciador
+
+
+def diagnostico_banco():
+    """Configuração efetiva do SQLite vista pela conexão atual"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    efetivo = {}
+    for pragma in ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size',
+                   'mmap_size', 'temp_store', 'wal_autocheckpoint', 'page_size'):
+        cursor.execute(f"PRAGMA {pragma}")
+        efetivo[pragma] = cursor.fetchone()[0]
+    conn.close()
+
+    # synchronous e temp_store voltam como números
+    efetivo['synchronous'] = {0: 'OFF', 1: 'NORMAL', 2: 'FULL', 3: 'EXTRA'}.get(
+        efetivo['synchronous'], efetivo['synchronous'])
+    efetivo['temp_store'] = {0: 'DEFAULT', 1: 'FILE', 2: 'MEMORY'}.get(
+        efetivo['temp_store'], efetivo['temp_store'])
+
+    pool = current_app.extensions.get('sqlite_pool')
+    checkpoint = current_app.extensions.get('sqlite_checkpoint')
+    return {
+        'sqlite_version': sqlite3.sqlite_version,
+        'pragmas': efetivo,
+        'pool': pool.stats() if pool else None,
+        'checkpoint': checkpoint.stats() if checkpoint else None
+    }
+
+
+def init_pool(app):
+    """Cria o pool da aplicação e registra a devolução no teardown"""
+    pragmas = pragmas_da_config(app.config)
+    app.extensions['sqlite_pragmas'] = pragmas
+
+    max_size = app.config.get('DB_POOL_SIZE', 8)
+    if max_size <= 0:
+        # Pool desabilitado: volta ao comportamento de uma conexão por chamada
+        app.extensions['sqlite_pool'] = None
+        return None
+
+    pool = ConnectionPool(
+        app.config['DB_PATH'],
+        max_size=max_size,
+        timeout=app.config.get('DB_POOL_TIMEOUT', 5.0),
+        health_check_interval=app.config.get('DB_POOL_HEALTH_CHECK', 30.0),
+        pragmas=pragmas
+    )
+    app.extensions['sqlite_pool'] = pool
+
+    @app.teardown_appcontext
+    def liberar_conexao(exception=None):
+        conn = g.pop('_sqlite_conn', None)
+        if conn is not None:
+            pool.release(conn)
+
+    return pool
 
 # Conexão com o banco de dados
 def get_connection(db_path=None):
-    if db_path is None:
-        db_path = current_app.config['DB_PATH']
-    return sqlite3.connect(db_path)
+    if db_path is not None:
+        return sqlite3.connect(db_path)
+
+    pool = current_app.extensions.get('sqlite_pool')
+    if pool is None:
+        return conectar(current_app.config['DB_PATH'],
+                        current_app.extensions.get('sqlite_pragmas', PRAGMAS_CONEXAO))
+
+    conn = g.get('_sqlite_conn')
+    if conn is None:
+        conn = g._sqlite_conn = pool.acquire()
+    return ConexaoPool(conn)
 
 # Inicializa o banco de dados
-def init_db(db_path, schema_path, data_path=None):
+def init_db(db_path, migracoes_path, data_path=None, journal_mode=None):
+    """Aplica as migrações pendentes (e os dados iniciais, se `data_path`)"""
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
 
-    # Sempre executar o schema para garantir que as tabelas existam
     conn = get_connection(db_path)
-
     try:
-        # Executar schema
-        with open(schema_path, 'r', encoding='utf-8') as f:
-            schema_sql = f.read()
-            conn.executescript(schema_sql)
+        # O modo de journal fica gravado no arquivo do banco (vale para todas as conexões)
+        if journal_mode:
+            conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+    finally:
+        conn.close()
 
-        # Executar dados iniciais apenas se data_path foi fornecido
-        if data_path:
+    migrar(db_path, migracoes_path)
+
+    # Executar dados iniciais apenas se data_path foi fornecido
+    if data_path:
+        conn = get_connection(db_path)
+        try:
             with open(data_path, 'r', encoding='utf-8') as f:
                 conn.executescript(f.read())
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
 
-        conn.commit()
-        return "Banco inicializado com sucesso!"
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
\ No newline at end of file
+    return "Banco inicializado com sucesso!"
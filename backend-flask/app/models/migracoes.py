@@ -0,0 +1,141 @@
+"""Migrações numeradas do schema (database/migracoes/NNNN_nome.sql).
+
+Cada arquivo é aplicado uma única vez, em ordem, em uma transação junto com o
+registro na tabela schema_version. Na inicialização, o worker que encontra o
+banco já na última versão faz só uma leitura e segue para as requisições.
+Com migração pendente, os workers disputam uma trava de arquivo ao lado do
+banco (<banco>.migracao.lock): um migra, os outros esperam a trava, veem que
+não há mais nada pendente e seguem sem executar DDL.
+
+A 0001 é o schema original; cada migração seguinte traz as mudanças de uma
+funcionalidade. Bancos criados antes do controle de versão já podem ter
+parte delas, então as migrações só usam IF NOT EXISTS/IF EXISTS e cargas
+condicionais. Migrações não devem conter BEGIN/COMMIT nem comandos que não
+rodam em transação (VACUUM, PRAGMA journal_mode).
+"""
+
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+PADRAO_ARQUIVO = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+# Segundos que a conexão da migração espera por escritas de outros processos
+TIMEOUT_CONEXAO = 30.0
+
+
+class MigracaoError(Exception):
+    """Migração inválida ou que falhou; o banco fica na versão anterior a ela"""
+
+
+def listar_migracoes(diretorio):
+    """Migrações do diretório em ordem de versão: [(versao, nome, caminho)]"""
+    migracoes = {}
+    for arquivo in os.listdir(diretorio):
+        encontrado = PADRAO_ARQUIVO.match(arquivo)
+        if not encontrado:
+            continue
+        versao = int(encontrado.group(1))
+        if versao in migracoes:
+            raise MigracaoError(
+                f"Versão {versao} repetida: {os.path.basename(migracoes[versao][2])} e {arquivo}")
+        migracoes[versao] = (versao, encontrado.group(2), os.path.join(diretorio, arquivo))
+    return [migracoes[versao] for versao in sorted(migracoes)]
+
+
+def versoes_aplicadas(conn):
+    """Versões registradas em schema_version (vazio se a tabela não existe)"""
+    existe = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    ).fetchone()
+    if not existe:
+        return set()
+    return {row[0] for row in conn.execute("SELECT versao FROM schema_version")}
+
+
+def pendentes(migracoes, aplicadas):
+    """Migrações ainda não aplicadas; recusa versões anteriores à atual do banco"""
+    faltando = [m for m in migracoes if m[0] not in aplicadas]
+    atual = max(aplicadas, default=0)
+    fora_de_ordem = [f"{versao:04d}_{nome}" for versao, nome, _ in faltando if versao < atual]
+    if fora_de_ordem:
+        raise MigracaoError(
+            f"Migrações anteriores à versão atual do banco ({atual}) nunca aplicadas: "
+            f"{', '.join(fora_de_ordem)}")
+    return faltando
+
+
+@contextmanager
+def trava_arquivo(caminho):
+    """Trava exclusiva entre processos; o sistema a solta se o processo morrer"""
+    with open(caminho, 'a+b') as arquivo:
+        if fcntl:
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX)
+        else:
+            arquivo.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(arquivo.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK desiste após ~10 s; continua esperando
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+            else:
+                arquivo.seek(0)
+                msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def aplicar(conn, versao, nome, caminho):
+    """Roda uma migração e a registra em schema_version na mesma transação"""
+    with open(caminho, 'r', encoding='utf-8') as f:
+        sql = f.read()
+
+    try:
+        # executescript roda o script como está: com o BEGIN explícito, o DDL
+        # fica na transação e some no rollback se algo falhar
+        conn.executescript("BEGIN IMMEDIATE;\n" + sql)
+        conn.execute("INSERT INTO schema_version (versao, nome) VALUES (?, ?)", (versao, nome))
+        conn.commit()
+    except Exception as e:
+        if conn.in_transaction:
+            conn.rollback()
+        raise MigracaoError(f"Falha na migração {versao:04d}_{nome}: {e}") from e
+
+
+def migrar(db_path, diretorio):
+    """Aplica as migrações pendentes; retorna as versões aplicadas por este processo"""
+    migracoes = listar_migracoes(diretorio)
+    conn = sqlite3.connect(db_path, timeout=TIMEOUT_CONEXAO)
+    try:
+        # Caminho comum: banco já atualizado, sem trava e sem DDL
+        if not pendentes(migracoes, versoes_aplicadas(conn)):
+            return []
+
+        with trava_arquivo(db_path + '.migracao.lock'):
+            # Outro worker pode ter migrado enquanto este esperava a trava
+            faltando = pendentes(migracoes, versoes_aplicadas(conn))
+            if faltando:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS schema_version (
+                        versao INTEGER PRIMARY KEY,
+                        nome TEXT NOT NULL,
+                        aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+            for versao, nome, caminho in faltando:
+                aplicar(conn, versao, nome, caminho)
+            return [versao for versao, _, _ in faltando]
+    finally:
+        conn.close()
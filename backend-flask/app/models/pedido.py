@@ -14,6 +14,10 @@ class StatusPedido(Enum):
 class Pedido:
     """Modelo de dados para Pedido"""
 
+    # Datas ficam como vieram do banco (texto); to_dict as repassa sem conversão
+    __slots__ = ('id', 'usuario_id', 'status', 'total', 'observacoes',
+                 'criado_em', 'atualizado_em')
+
     def __init__(self, id=None, usuario_id=None, status=StatusPedido.EM_ANDAMENTO.value,
                  total=0.0, observacoes=None, criado_em=None, atualizado_em=None):
         self.id = id
@@ -102,6 +106,9 @@ class Pedido:
 class ItemPedido:
     """Modelo de dados para Item de Pedido"""
 
+    __slots__ = ('id', 'pedido_id', 'produto_id', 'quantidade', 'preco_unitario',
+                 'criado_em')
+
     def __init__(self, id=None, pedido_id=None, produto_id=None, quantidade=1,
                  preco_unitario=0.0, criado_em=None):
         self.id = id
@@ -1,10 +1,18 @@
 from datetime import datetime
 import re
 
+from app.models.campos import DataHora
+
 
 class Produto:
     """Modelo de dados para Produto"""
 
+    __slots__ = ('id', 'nome', 'preco', 'categoria', 'disponivel', 'imagem',
+                 'descricao', '_criado_em', '_atualizado_em')
+
+    criado_em = DataHora()
+    atualizado_em = DataHora()
+
     def __init__(self, id=None, nome=None, preco=None, categoria=None,
                  disponivel=True, imagem=None, descricao=None,
                  criado_em=None, atualizado_em=None):
@@ -15,8 +23,8 @@ class Produto:
         self.disponivel = disponivel
         self.imagem = imagem
         self.descricao = descricao
-        self.criado_em = criado_em or datetime.now()
-        self.atualizado_em = atualizado_em or datetime.now()
+        self.criado_em = criado_em
+        self.atualizado_em = atualizado_em
 
     def to_dict(self):
         """Converte o objeto para dicionário (para JSON)"""
@@ -28,9 +36,8 @@ class Produto:
             'disponivel': self.disponivel,
             'imagem': self.imagem,
             'descricao': self.descricao,
-            'criado_em': self.criado_em.isoformat() if self.criado_em else None,
-            'atualizado_em': (self.atualizado_em.isoformat()
-                              if self.atualizado_em else None)
+            'criado_em': type(self).criado_em.iso(self),
+            'atualizado_em': type(self).atualizado_em.iso(self)
         }
 
     @staticmethod
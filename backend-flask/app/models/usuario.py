@@ -1,10 +1,18 @@
 from datetime import datetime
 import re
 
+from app.models.campos import DataHora
+
 
 class Usuario:
     """Modelo de dados para Usuário"""
 
+    __slots__ = ('id', 'nome', 'email', 'senha', 'telefone', 'role', 'is_admin',
+                 'ativo', '_criado_em', '_atualizado_em')
+
+    criado_em = DataHora()
+    atualizado_em = DataHora()
+
     def __init__(self, id=None, nome=None, email=None, senha=None,
                  telefone=None, role=None, is_admin=False, ativo=True,
                  criado_em=None, atualizado_em=None):
@@ -16,8 +24,8 @@ class Usuario:
         self.role = role or "client"  # Valor padrão: client
         self.is_admin = is_admin
         self.ativo = ativo
-        self.criado_em = criado_em or datetime.now()
-        self.atualizado_em = atualizado_em or datetime.now()
+        self.criado_em = criado_em
+        self.atualizado_em = atualizado_em
 
     def to_dict(self):
         """Converte o objeto para dicionário (para JSON)"""
@@ -29,9 +37,8 @@ class Usuario:
             'role': self.role,
             'is_admin': self.is_admin,
             'ativo': self.ativo,
-            'criado_em': self.criado_em.isoformat() if self.criado_em else None,
-            'atualizado_em': (self.atualizado_em.isoformat()
-                              if self.atualizado_em else None)
+            'criado_em': type(self).criado_em.iso(self),
+            'atualizado_em': type(self).atualizado_em.iso(self)
         }
 
     @staticmethod
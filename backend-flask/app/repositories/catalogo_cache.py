@@ -0,0 +1,117 @@
+import threading
+import time
+from flask import current_app
+from app.models.db import get_connection
+
+
+class CatalogoCache:
+    """Cache em memória do catálogo de produtos.
+
+    Guarda os objetos Produto já montados, com índices por ID, por categoria
+    e por disponibilidade. A validade é controlada pela geração gravada na
+    tabela catalogo_versao (incrementada por triggers a cada escrita em
+    produtos e categorias), o que permite a cada worker detectar que sua cópia ficou
+    velha. Escritas feitas por este processo invalidam o cache na hora.
+
+    Os objetos retornados são compartilhados e não devem ser alterados.
+    """
+
+    def __init__(self, intervalo_verificacao=1.0):
+        self.intervalo_verificacao = intervalo_verificacao
+        self._lock = threading.Lock()
+        # Última geração lida do banco e quando foi lida
+        self._versao = None
+        self._versao_lida_em = 0.0
+        # Geração correspondente aos índices carregados
+        self._geracao = None
+        # Índices trocados de uma vez, para leitores nunca verem metade da carga
+        self._indices = {
+            'por_id': {},
+            'ordenados': [],
+            'disponiveis': [],
+            'por_categoria': {}
+        }
+
+    @staticmethod
+    def _ler_versao():
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT geracao FROM catalogo_versao WHERE id = 1")
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else 0
+
+    def versao(self):
+        """Geração atual do catálogo, relida do banco no máximo a cada intervalo"""
+        agora = time.monotonic()
+        versao = self._versao
+        if versao is None or agora - self._versao_lida_em >= self.intervalo_verificacao:
+            versao = self._versao = self._ler_versao()
+            self._versao_lida_em = agora
+        return versao
+
+    def _carregar(self, carregar_produtos):
+        # A geração é lida antes dos produtos: se houver escrita no meio, o
+        # cache fica com uma geração antiga e será recarregado na próxima vez
+        geracao = self._versao = self._ler_versao()
+        self._versao_lida_em = time.monotonic()
+        produtos = sorted(carregar_produtos(), key=lambda p: p.nome)
+
+        por_categoria = {}
+        disponiveis = []
+        for produto in produtos:
+            if produto.disponivel:
+                disponiveis.append(produto)
+                por_categoria.setdefault(produto.categoria, []).append(produto)
+
+        self._indices = {
+            'por_id': {produto.id: produto for produto in produtos},
+            'ordenados': produtos,
+            'disponiveis': disponiveis,
+            'por_categoria': por_categoria
+        }
+        self._geracao = geracao
+
+    def _garantir_atual(self, carregar_produtos):
+        if self._geracao is not None and self._geracao == self.versao():
+            return
+
+        with self._lock:
+            if self._geracao is None or self._geracao != self.versao():
+                self._carregar(carregar_produtos)
+
+    def invalidar(self):
+        """Descarta o conteúdo; a próxima leitura recarrega do banco"""
+        with self._lock:
+            self._versao = None
+            self._geracao = None
+
+    def por_id(self, produto_id, carregar_produtos):
+        self._garantir_atual(carregar_produtos)
+        return self._indices['por_id'].get(produto_id)
+
+    def por_ids(self, produto_ids, carregar_produtos):
+        self._garantir_atual(carregar_produtos)
+        por_id = self._indices['por_id']
+        return {produto_id: por_id[produto_id]
+                for produto_id in produto_ids if produto_id in por_id}
+
+    def por_categoria(self, categoria, carregar_produtos):
+        self._garantir_atual(carregar_produtos)
+        return list(self._indices['por_categoria'].get(categoria, []))
+
+    def listar(self, disponiveis_apenas, carregar_produtos):
+        self._garantir_atual(carregar_produtos)
+        indices = self._indices
+        return list(indices['disponiveis'] if disponiveis_apenas
+                    else indices['ordenados'])
+
+
+def obter_catalogo_cache():
+    """Retorna o cache do catálogo da aplicação atual, criando-o se preciso"""
+    cache = current_app.extensions.get('catalogo_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            'catalogo_cache',
+            CatalogoCache(current_app.config.get('CATALOGO_CACHE_VERIFICACAO', 1.0)))
+    return cache
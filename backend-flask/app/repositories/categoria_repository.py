@@ -1,7 +1,7 @@
 from app.models.db import get_connection
 from app.models.categoria import Categoria
+from app.repositories.catalogo_cache import obter_catalogo_cache
 import sqlite3
-from datetime import datetime
 
 
 class CategoriaRepository:
@@ -21,6 +21,7 @@ class CategoriaRepository:
 
             categoria.id = cursor.lastrowid
             conn.commit()
+            obter_catalogo_cache().invalidar()
 
             return categoria
         finally:
@@ -47,8 +48,8 @@ class CategoriaRepository:
                 nome=row[1],
                 descricao=row[2],
                 ativo=bool(row[3]),
-                criado_em=datetime.fromisoformat(row[4]) if row[4] else None,
-                atualizado_em=datetime.fromisoformat(row[5]) if row[5] else None
+                criado_em=row[4],
+                atualizado_em=row[5]
             )
         return None
 
@@ -73,8 +74,8 @@ class CategoriaRepository:
             nome=row[1],
             descricao=row[2],
             ativo=bool(row[3]),
-            criado_em=datetime.fromisoformat(row[4]) if row[4] else None,
-            atualizado_em=datetime.fromisoformat(row[5]) if row[5] else None
+            criado_em=row[4],
+            atualizado_em=row[5]
         ) for row in rows]
 
     @staticmethod
@@ -112,6 +113,7 @@ class CategoriaRepository:
 
         conn.commit()
         conn.close()
+        obter_catalogo_cache().invalidar()
 
         # Retornar categoria atualizada
         return CategoriaRepository.buscar_por_id(categoria_id)
@@ -134,6 +136,7 @@ class CategoriaRepository:
 
         conn.commit()
         conn.close()
+        obter_catalogo_cache().invalidar()
 
         return True
 
@@ -151,6 +154,7 @@ class CategoriaRepository:
 
         conn.commit()
         conn.close()
+        obter_catalogo_cache().invalidar()
 
         return True
 
@@ -187,7 +191,7 @@ class CategoriaRepository:
                 nome=row[1],
                 descricao=row[2],
                 ativo=bool(row[3]),
-                criado_em=datetime.fromisoformat(row[4]) if row[4] else None,
-                atualizado_em=datetime.fromisoformat(row[5]) if row[5] else None
+                criado_em=row[4],
+                atualizado_em=row[5]
             )
         return None
@@ -1,5 +1,6 @@
 from app.models.db import get_connection
 from app.models.pedido import Pedido, ItemPedido, StatusPedido
+from app.utils.projecao import colunas_sql, consultar_dicts
 import sqlite3
 from datetime import datetime
 
@@ -7,6 +8,21 @@ from datetime import datetime
 class PedidoRepository:
     """Repository para operações CRUD de pedidos no banco de dados"""
 
+    # Linhas lidas do cursor por vez em exportar
+    TAMANHO_LOTE_EXPORTACAO = 500
+
+    # Campos aceitos em listar_projetado (as datas já são texto em to_dict).
+    # DECIMAL no SQLite guarda 5.0 como inteiro; o CAST devolve float como to_dict
+    CAMPOS_PROJECAO = {
+        'id': 'id',
+        'usuario_id': 'usuario_id',
+        'status': 'status',
+        'total': 'CAST(total AS REAL)',
+        'observacoes': 'observacoes',
+        'criado_em': 'criado_em',
+        'atualizado_em': 'atualizado_em'
+    }
+
     @staticmethod
     def criar(pedido):
         """Cria um novo pedido no banco"""
@@ -17,15 +33,66 @@ class PedidoRepository:
             cursor.execute("""
                 INSERT INTO pedidos (usuario_id, status, total, observacoes)
                 VALUES (?, ?, ?, ?)
+                RETURNING id, criado_em, atualizado_em
             """, (pedido.usuario_id, pedido.status, pedido.total, pedido.observacoes))
 
-            pedido.id = cursor.lastrowid
+            pedido.id, pedido.criado_em, pedido.atualizado_em = cursor.fetchone()
             conn.commit()
 
             return pedido
         finally:
             conn.close()
 
+    @staticmethod
+    def criar_com_itens(pedido, itens):
+        """Cria o pedido e todos os seus itens em uma única transação.
+
+        Os itens recebem o ID do pedido recém-criado e são validados antes
+        da inserção; qualquer erro desfaz o pedido inteiro.
+        """
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        try:
+            PedidoRepository.inserir_com_itens(cursor, pedido, itens)
+            conn.commit()
+
+            return pedido
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def inserir_com_itens(cursor, pedido, itens):
+        """Insere o pedido e os itens pelo cursor dado, sem commit.
+
+        Usado por criar_com_itens e pelo gravador em lote, que junta vários
+        pedidos na mesma transação. Pedido e itens recebem o id e as datas
+        gravadas pelo banco (CURRENT_TIMESTAMP, UTC), as mesmas que uma
+        leitura posterior devolve.
+        """
+        cursor.execute("""
+            INSERT INTO pedidos (usuario_id, status, total, observacoes)
+            VALUES (?, ?, ?, ?)
+            RETURNING id, criado_em, atualizado_em
+        """, (pedido.usuario_id, pedido.status, pedido.total, pedido.observacoes))
+        pedido.id, pedido.criado_em, pedido.atualizado_em = cursor.fetchone()
+
+        for item in itens:
+            item.pedido_id = pedido.id
+            item.validar()
+
+        for item in itens:
+            cursor.execute("""
+                INSERT INTO itens_pedido (pedido_id, produto_id, quantidade, preco_unitario)
+                VALUES (?, ?, ?, ?)
+                RETURNING id, criado_em
+            """, (item.pedido_id, item.produto_id, item.quantidade, item.preco_unitario))
+            item.id, item.criado_em = cursor.fetchone()
+        return pedido
+
     @staticmethod
     def buscar_por_id(pedido_id):
         """Busca pedido por ID"""
@@ -54,27 +121,92 @@ class PedidoRepository:
         return None
 
     @staticmethod
-    def buscar_por_usuario(usuario_id, status=None):
-        """Busca pedidos por usuário, opcionalmente filtrando por status"""
+    def buscar_por_usuario(usuario_id, status=None, limit=None, cursor=None):
+        """Busca pedidos por usuário, opcionalmente filtrando por status.
+
+        A ordenação é (criado_em, id) decrescente; `cursor` é a tupla
+        (criado_em, id) do último pedido da página anterior.
+        """
+        return PedidoRepository._listar(
+            ["usuario_id = ?"], [usuario_id], status, limit, cursor=cursor)
+
+    @staticmethod
+    def listar_todos(status=None, limit=None, offset=0, cursor=None):
+        """Lista todos os pedidos, opcionalmente filtrando por status.
+
+        Com `cursor` a paginação é por chave (criado_em, id) e `offset` é
+        ignorado; o offset continua aceito por compatibilidade.
+        """
+        return PedidoRepository._listar([], [], status, limit, offset, cursor)
+
+    @staticmethod
+    def listar_projetado(campos, usuario_id=None, status=None, limit=None,
+                         offset=0, cursor=None):
+        """Lista pedidos como dicionários só com os `campos` pedidos.
+
+        Mesma ordenação e filtros de listar_todos/buscar_por_usuario, mas as
+        linhas viram dicionários direto do SQLite, sem criar objetos Pedido.
+        """
+        condicoes, params = [], []
+        if usuario_id is not None:
+            condicoes.append("usuario_id = ?")
+            params.append(usuario_id)
+
+        query, params = PedidoRepository._consulta_listagem(
+            colunas_sql(campos, PedidoRepository.CAMPOS_PROJECAO),
+            condicoes, params, status, limit, offset, cursor)
+
         conn = get_connection()
-        cursor = conn.cursor()
+        try:
+            return consultar_dicts(conn, query, params)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _consulta_listagem(colunas, condicoes, params, status=None, limit=None,
+                           offset=0, cursor=None):
+        """Monta a consulta de listagem, ordenada por (criado_em, id) DESC"""
+        condicoes = list(condicoes)
+        params = list(params)
 
         if status:
-            cursor.execute("""
-                SELECT id, usuario_id, status, total, observacoes, criado_em, atualizado_em
-                FROM pedidos
-                WHERE usuario_id = ? AND status = ?
-                ORDER BY criado_em DESC
-            """, (usuario_id, status))
-        else:
-            cursor.execute("""
-                SELECT id, usuario_id, status, total, observacoes, criado_em, atualizado_em
-                FROM pedidos
-                WHERE usuario_id = ?
-                ORDER BY criado_em DESC
-            """, (usuario_id,))
+            condicoes.append("status = ?")
+            params.append(status)
 
-        rows = cursor.fetchall()
+        if cursor:
+            condicoes.append("(criado_em, id) < (?, ?)")
+            params.extend(cursor)
+
+        query = f"""
+            SELECT {colunas}
+            FROM pedidos
+        """
+
+        if condicoes:
+            query += " WHERE " + " AND ".join(condicoes)
+
+        query += " ORDER BY criado_em DESC, id DESC"
+
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+            if offset and not cursor:
+                query += " OFFSET ?"
+                params.append(offset)
+
+        return query, params
+
+    @staticmethod
+    def _listar(condicoes, params, status=None, limit=None, offset=0, cursor=None):
+        """Consulta de listagem compartilhada, ordenada por (criado_em, id) DESC"""
+        query, params = PedidoRepository._consulta_listagem(
+            "id, usuario_id, status, total, observacoes, criado_em, atualizado_em",
+            condicoes, params, status, limit, offset, cursor)
+
+        conn = get_connection()
+        cursor_db = conn.cursor()
+        cursor_db.execute(query, params)
+        rows = cursor_db.fetchall()
         conn.close()
 
         pedidos = []
@@ -92,43 +224,125 @@ class PedidoRepository:
         return pedidos
 
     @staticmethod
-    def listar_todos(status=None, limit=None, offset=0):
-        """Lista todos os pedidos, opcionalmente filtrando por status"""
-        conn = get_connection()
-        cursor = conn.cursor()
+    def exportar(status=None, desde=None, antes_de=None):
+        """Percorre os pedidos com seus itens em ordem cronológica.
 
-        query = """
-            SELECT id, usuario_id, status, total, observacoes, criado_em, atualizado_em
-            FROM pedidos
+        É um gerador que entrega um dicionário por pedido (como to_dict, com
+        'itens'). O cursor é lido em lotes com fetchmany, então a memória não
+        cresce com o tamanho do histórico. `desde` (inclusive) e `antes_de`
+        (exclusive) limitam criado_em.
         """
-        params = []
-
+        condicoes, params = [], []
         if status:
-            query += " WHERE status = ?"
+            condicoes.append("pe.status = ?")
             params.append(status)
+        if desde:
+            condicoes.append("pe.criado_em >= ?")
+            params.append(desde)
+        if antes_de:
+            condicoes.append("pe.criado_em < ?")
+            params.append(antes_de)
+
+        # Percorre o índice de criado_em: sem ordenação temporária no SQLite
+        query = """
+            SELECT pe.id, pe.usuario_id, pe.status, pe.total, pe.observacoes,
+                   pe.criado_em, pe.atualizado_em,
+                   ip.id, ip.pedido_id, ip.produto_id, ip.quantidade,
+                   ip.preco_unitario, ip.criado_em, p.nome, p.imagem, p.categoria
+            FROM pedidos pe
+            LEFT JOIN itens_pedido ip ON ip.pedido_id = pe.id
+            LEFT JOIN produtos p ON p.id = ip.produto_id
+        """
+        if condicoes:
+            query += " WHERE " + " AND ".join(condicoes)
+        query += " ORDER BY pe.criado_em, pe.id, ip.id"
 
-        query += " ORDER BY criado_em DESC"
+        conn = get_connection()
+        cursor = conn.cursor()
 
-        if limit:
-            query += " LIMIT ? OFFSET ?"
-            params.extend([limit, offset])
+        try:
+            cursor.execute(query, params)
+            pedido = None
+            while True:
+                rows = cursor.fetchmany(PedidoRepository.TAMANHO_LOTE_EXPORTACAO)
+                if not rows:
+                    break
+
+                for row in rows:
+                    if pedido is None or pedido['id'] != row[0]:
+                        if pedido is not None:
+                            yield pedido
+                        pedido = Pedido(
+                            id=row[0],
+                            usuario_id=row[1],
+                            status=row[2],
+                            total=row[3],
+                            observacoes=row[4],
+                            criado_em=row[5],
+                            atualizado_em=row[6]
+                        ).to_dict()
+                        pedido['itens'] = []
+
+                    # Pedido sem itens: colunas do LEFT JOIN vêm nulas
+                    if row[7] is not None:
+                        pedido['itens'].append(
+                            ItemPedidoRepository._item_com_produto(row[7:]))
+
+            if pedido is not None:
+                yield pedido
+        finally:
+            conn.close()
 
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+    @staticmethod
+    def ler_versao():
+        """Geração atual dos pedidos (tabela pedidos_versao)"""
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT geracao FROM pedidos_versao WHERE id = 1")
+        row = cursor.fetchone()
         conn.close()
+        return row[0] if row else 0
+
+    @staticmethod
+    def listar_fila(status):
+        """Pedidos nos `status` dados em ordem de chegada, com itens resumidos.
+
+        Cada item traz só produto_id, nome e quantidade, o que a fila da
+        cozinha precisa. Pedidos e itens vêm em uma única consulta.
+        """
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        marcadores = ", ".join("?" * len(status))
+        cursor.execute(f"""
+            SELECT pe.id, pe.usuario_id, pe.status, pe.total, pe.observacoes,
+                   pe.criado_em, pe.atualizado_em, ip.produto_id, p.nome, ip.quantidade
+            FROM pedidos pe
+            LEFT JOIN itens_pedido ip ON ip.pedido_id = pe.id
+            LEFT JOIN produtos p ON p.id = ip.produto_id
+            WHERE pe.status IN ({marcadores})
+            ORDER BY pe.status, pe.id, ip.id
+        """, list(status))
 
         pedidos = []
-        for row in rows:
-            pedidos.append(Pedido(
-                id=row[0],
-                usuario_id=row[1],
-                status=row[2],
-                total=row[3],
-                observacoes=row[4],
-                criado_em=row[5],
-                atualizado_em=row[6]
-            ))
+        atual = None
+        for row in cursor.fetchall():
+            if atual is None or atual['id'] != row[0]:
+                atual = Pedido(
+                    id=row[0],
+                    usuario_id=row[1],
+                    status=row[2],
+                    total=row[3],
+                    observacoes=row[4],
+                    criado_em=row[5],
+                    atualizado_em=row[6]
+                ).to_dict()
+                atual['itens'] = []
+                pedidos.append(atual)
+            if row[7] is not None:
+                atual['itens'].append({'produto_id': row[7], 'nome': row[8], 'quantidade': row[9]})
 
+        conn.close()
         return pedidos
 
     @staticmethod
@@ -173,6 +387,43 @@ class PedidoRepository:
         finally:
             conn.close()
 
+    @staticmethod
+    def atualizar_status_se(pedido_id, status_esperado, novo_status):
+        """Troca o status só se o pedido ainda estiver em `status_esperado`.
+
+        Compare-and-swap em um único UPDATE condicional: retorna o pedido
+        atualizado, ou None se o pedido não existe ou o status já mudou.
+        """
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("""
+                UPDATE pedidos
+                SET status = ?, atualizado_em = CURRENT_TIMESTAMP
+                WHERE id = ? AND status = ?
+                RETURNING id, usuario_id, status, total, observacoes, criado_em, atualizado_em
+            """, (novo_status, pedido_id, status_esperado))
+            row = cursor.fetchone()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        if row is None:
+            return None
+        return Pedido(
+            id=row[0],
+            usuario_id=row[1],
+            status=row[2],
+            total=row[3],
+            observacoes=row[4],
+            criado_em=row[5],
+            atualizado_em=row[6]
+        )
+
     @staticmethod
     def deletar(pedido_id):
         """Remove um pedido (soft delete - marca como cancelado)"""
@@ -213,37 +464,125 @@ class PedidoRepository:
 
     @staticmethod
     def obter_estatisticas():
-        """Obtém estatísticas dos pedidos"""
+        """Obtém estatísticas dos pedidos (lidas da tabela mantida por triggers)"""
         conn = get_connection()
         cursor = conn.cursor()
 
-        # Contar por status
         cursor.execute("""
-            SELECT status, COUNT(*) as total
-            FROM pedidos
-            GROUP BY status
+            SELECT status, quantidade, CAST(total AS REAL)
+            FROM pedidos_estatisticas_status
+            WHERE quantidade > 0
         """)
+        rows = cursor.fetchall()
+        conn.close()
 
-        status_counts = {row[0]: row[1] for row in cursor.fetchall()}
+        status_counts = {row[0]: row[1] for row in rows}
 
         # Total de pedidos
         total_pedidos = sum(status_counts.values())
 
         # Receita total (somente pedidos finalizados)
-        cursor.execute("""
-            SELECT SUM(total) FROM pedidos WHERE status = ?
-        """, (StatusPedido.FINALIZADO.value,))
-
-        receita_total = cursor.fetchone()[0] or 0.0
-
-        conn.close()
+        receita_total = next((row[2] for row in rows
+                              if row[0] == StatusPedido.FINALIZADO.value), 0.0)
 
         return {
             'total_pedidos': total_pedidos,
             'pedidos_por_status': status_counts,
-            'receita_total': receita_total
+            'receita_total': round(receita_total, 2)
         }
 
+    @staticmethod
+    def obter_estatisticas_diarias(desde):
+        """Obtém quantidade e total de pedidos por dia e status a partir de `desde` (YYYY-MM-DD)"""
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT dia, status, quantidade, CAST(total AS REAL)
+            FROM pedidos_estatisticas_diarias
+            WHERE dia >= ? AND quantidade > 0
+            ORDER BY dia
+        """, (desde,))
+        rows = cursor.fetchall()
+        conn.close()
+
+        por_dia = {}
+        for dia, status, quantidade, total in rows:
+            por_dia.setdefault(dia, {})[status] = {
+                'quantidade': quantidade,
+                'total': round(total, 2)
+            }
+        return por_dia
+
+    # Agregações completas sobre pedidos, usadas para reconstruir as estatísticas
+    _AGREGADO_STATUS = """
+        SELECT status, COUNT(*), COALESCE(SUM(total), 0)
+        FROM pedidos
+        GROUP BY status
+    """
+    _AGREGADO_DIARIO = """
+        SELECT date(criado_em), status, COUNT(*), COALESCE(SUM(total), 0)
+        FROM pedidos
+        GROUP BY date(criado_em), status
+    """
+
+    @staticmethod
+    def reconstruir_estatisticas(apenas_verificar=False):
+        """Recalcula as tabelas de estatísticas a partir de pedidos.
+
+        Retorna a lista de divergências encontradas entre os valores mantidos
+        pelos triggers e o recálculo. Com apenas_verificar=True nada é gravado.
+        """
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        def carregar(query):
+            cursor.execute(query)
+            return {tuple(row[:-2]): (row[-2], round(row[-1], 2))
+                    for row in cursor.fetchall() if row[-2] > 0}
+
+        try:
+            # Leitura consistente; ao regravar, BEGIN IMMEDIATE impede que algum
+            # pedido mude entre a comparação e a regravação
+            cursor.execute("BEGIN" if apenas_verificar else "BEGIN IMMEDIATE")
+
+            divergencias = []
+            for tabela, chave, agregado in (
+                    ('pedidos_estatisticas_status', 'status',
+                     PedidoRepository._AGREGADO_STATUS),
+                    ('pedidos_estatisticas_diarias', 'dia, status',
+                     PedidoRepository._AGREGADO_DIARIO)):
+                esperado = carregar(agregado)
+                atual = carregar(f"SELECT {chave}, quantidade, total FROM {tabela}")
+
+                for item in sorted(set(esperado) | set(atual)):
+                    if esperado.get(item) != atual.get(item):
+                        divergencias.append({
+                            'tabela': tabela,
+                            'chave': list(item),
+                            'mantido': atual.get(item),
+                            'recalculado': esperado.get(item)
+                        })
+
+                if not apenas_verificar:
+                    cursor.execute(f"DELETE FROM {tabela}")
+                    cursor.execute(f"""
+                        INSERT INTO {tabela} ({chave}, quantidade, total)
+                        {agregado}
+                    """)
+
+            if apenas_verificar:
+                conn.rollback()
+            else:
+                conn.commit()
+
+            return divergencias
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
 
 class ItemPedidoRepository:
     """Repository para operações CRUD de itens de pedido"""
@@ -268,6 +607,30 @@ class ItemPedidoRepository:
         finally:
             conn.close()
 
+    # Limite de parâmetros por consulta IN (...) (SQLITE_MAX_VARIABLE_NUMBER antigo)
+    TAMANHO_LOTE_IN = 500
+
+    @staticmethod
+    def _item_com_produto(row):
+        """Monta o dicionário do item com os dados do produto"""
+        item = ItemPedido(
+            id=row[0],
+            pedido_id=row[1],
+            produto_id=row[2],
+            quantidade=row[3],
+            preco_unitario=row[4],
+            criado_em=row[5]
+        )
+        # Adicionar dados do produto ao item
+        item_dict = item.to_dict()
+        item_dict['produto'] = {
+            'id': row[2],
+            'nome': row[6],
+            'imagem': row[7],
+            'categoria': row[8]
+        }
+        return item_dict
+
     @staticmethod
     def buscar_por_pedido(pedido_id):
         """Busca todos os itens de um pedido com dados do produto"""
@@ -280,33 +643,49 @@ class ItemPedidoRepository:
             FROM itens_pedido ip
             JOIN produtos p ON ip.produto_id = p.id
             WHERE ip.pedido_id = ?
-            ORDER BY ip.criado_em
+            ORDER BY ip.id
         """, (pedido_id,))
 
         rows = cursor.fetchall()
         conn.close()
 
-        itens = []
-        for row in rows:
-            item = ItemPedido(
-                id=row[0],
-                pedido_id=row[1],
-                produto_id=row[2],
-                quantidade=row[3],
-                preco_unitario=row[4],
-                criado_em=row[5]
-            )
-            # Adicionar dados do produto ao item
-            item_dict = item.to_dict()
-            item_dict['produto'] = {
-                'id': row[2],
-                'nome': row[6],
-                'imagem': row[7],
-                'categoria': row[8]
-            }
-            itens.append(item_dict)
+        return [ItemPedidoRepository._item_com_produto(row) for row in rows]
+
+    @staticmethod
+    def buscar_por_pedidos(pedido_ids):
+        """Busca os itens de vários pedidos de uma vez, agrupados por pedido.
+
+        Retorna um dicionário {pedido_id: [itens]} com uma entrada (possivelmente
+        vazia) para cada ID informado.
+        """
+        itens_por_pedido = {pedido_id: [] for pedido_id in pedido_ids}
+        if not itens_por_pedido:
+            return itens_por_pedido
+
+        conn = get_connection()
+        cursor = conn.cursor()
+        ids = list(itens_por_pedido)
+
+        try:
+            for inicio in range(0, len(ids), ItemPedidoRepository.TAMANHO_LOTE_IN):
+                lote = ids[inicio:inicio + ItemPedidoRepository.TAMANHO_LOTE_IN]
+                marcadores = ", ".join("?" * len(lote))
+                cursor.execute(f"""
+                    SELECT ip.id, ip.pedido_id, ip.produto_id, ip.quantidade, ip.preco_unitario, ip.criado_em,
+                           p.nome, p.imagem, p.categoria
+                    FROM itens_pedido ip
+                    JOIN produtos p ON ip.produto_id = p.id
+                    WHERE ip.pedido_id IN ({marcadores})
+                    ORDER BY ip.pedido_id, ip.id
+                """, lote)
+
+                for row in cursor.fetchall():
+                    itens_por_pedido[row[1]].append(
+                        ItemPedidoRepository._item_com_produto(row))
+        finally:
+            conn.close()
 
-        return itens
+        return itens_por_pedido
 
     @staticmethod
     def buscar_por_id(item_id):
@@ -1,12 +1,29 @@
 from app.models.db import get_connection
 from app.models.produto import Produto
+from app.repositories.catalogo_cache import obter_catalogo_cache
+from app.utils.projecao import colunas_sql, consultar_dicts
+import re
 import sqlite3
-from datetime import datetime
 
 
 class ProdutoRepository:
     """Repository para operações CRUD de produtos no banco de dados"""
 
+    # Campos aceitos em listar_projetado e a expressão que os gera no formato
+    # de Produto.to_dict (datas "AAAA-MM-DD HH:MM:SS" viram ISO 8601; preço
+    # DECIMAL guardado como inteiro volta como float)
+    CAMPOS_PROJECAO = {
+        'id': 'id',
+        'nome': 'nome',
+        'preco': 'CAST(preco AS REAL)',
+        'categoria': 'categoria',
+        'disponivel': 'disponivel',
+        'imagem': 'imagem',
+        'descricao': 'descricao',
+        'criado_em': "replace(criado_em, ' ', 'T')",
+        'atualizado_em': "replace(atualizado_em, ' ', 'T')"
+    }
+
     @staticmethod
     def criar(produto):
         """Cria um novo produto no banco"""
@@ -23,44 +40,15 @@ class ProdutoRepository:
 
             produto.id = cursor.lastrowid
             conn.commit()
+            obter_catalogo_cache().invalidar()
 
             return produto
         finally:
             conn.close()
 
     @staticmethod
-    def buscar_por_id(produto_id):
-        """Busca produto por ID"""
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT id, nome, preco, categoria, disponivel, imagem, descricao,
-                   criado_em, atualizado_em
-            FROM produtos
-            WHERE id = ?
-        """, (produto_id,))
-
-        row = cursor.fetchone()
-        conn.close()
-
-        if row:
-            return Produto(
-                id=row[0],
-                nome=row[1],
-                preco=float(row[2]),
-                categoria=row[3],
-                disponivel=bool(row[4]),
-                imagem=row[5],
-                descricao=row[6],
-                criado_em=datetime.fromisoformat(row[7]) if row[7] else None,
-                atualizado_em=datetime.fromisoformat(row[8]) if row[8] else None
-            )
-        return None
-
-    @staticmethod
-    def buscar_por_categoria(categoria):
-        """Busca produtos por categoria"""
+    def _carregar_catalogo():
+        """Carrega todos os produtos do banco (usado para preencher o cache)"""
         conn = get_connection()
         cursor = conn.cursor()
 
@@ -68,9 +56,8 @@ class ProdutoRepository:
             SELECT id, nome, preco, categoria, disponivel, imagem, descricao,
                    criado_em, atualizado_em
             FROM produtos
-            WHERE categoria = ? AND disponivel = 1
             ORDER BY nome
-        """, (categoria,))
+        """)
 
         rows = cursor.fetchall()
         conn.close()
@@ -83,43 +70,59 @@ class ProdutoRepository:
             disponivel=bool(row[4]),
             imagem=row[5],
             descricao=row[6],
-            criado_em=datetime.fromisoformat(row[7]) if row[7] else None,
-            atualizado_em=datetime.fromisoformat(row[8]) if row[8] else None
+            criado_em=row[7],
+            atualizado_em=row[8]
         ) for row in rows]
 
+    @staticmethod
+    def buscar_por_id(produto_id):
+        """Busca produto por ID"""
+        return obter_catalogo_cache().por_id(
+            produto_id, ProdutoRepository._carregar_catalogo)
+
+    @staticmethod
+    def buscar_por_ids(produto_ids):
+        """Busca vários produtos de uma vez, retornando {id: Produto}"""
+        return obter_catalogo_cache().por_ids(
+            produto_ids, ProdutoRepository._carregar_catalogo)
+
+    @staticmethod
+    def buscar_por_categoria(categoria):
+        """Busca produtos disponíveis por categoria"""
+        return obter_catalogo_cache().por_categoria(
+            categoria, ProdutoRepository._carregar_catalogo)
+
     @staticmethod
     def listar_todos(disponiveis_apenas=False):
         """Lista todos os produtos"""
-        conn = get_connection()
-        cursor = conn.cursor()
+        return obter_catalogo_cache().listar(
+            disponiveis_apenas, ProdutoRepository._carregar_catalogo)
 
-        query = """
-            SELECT id, nome, preco, categoria, disponivel, imagem, descricao,
-                   criado_em, atualizado_em
-            FROM produtos
-        """
-        params = []
-
-        if disponiveis_apenas:
-            query += " WHERE disponivel = 1"
+    @staticmethod
+    def listar_projetado(campos, disponiveis_apenas=False, categoria=None):
+        """Lista produtos como dicionários só com os `campos` pedidos.
 
+        Mesma ordem e filtros de listar_todos/buscar_por_categoria, lidos
+        direto do banco em dicionários, sem criar objetos Produto.
+        """
+        condicoes, params = [], []
+        if disponiveis_apenas or categoria:
+            condicoes.append("disponivel = 1")
+        if categoria:
+            condicoes.append("categoria = ?")
+            params.append(categoria)
+
+        query = (f"SELECT {colunas_sql(campos, ProdutoRepository.CAMPOS_PROJECAO)} "
+                 "FROM produtos")
+        if condicoes:
+            query += " WHERE " + " AND ".join(condicoes)
         query += " ORDER BY nome"
 
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
-
-        return [Produto(
-            id=row[0],
-            nome=row[1],
-            preco=float(row[2]),
-            categoria=row[3],
-            disponivel=bool(row[4]),
-            imagem=row[5],
-            descricao=row[6],
-            criado_em=datetime.fromisoformat(row[7]) if row[7] else None,
-            atualizado_em=datetime.fromisoformat(row[8]) if row[8] else None
-        ) for row in rows]
+        conn = get_connection()
+        try:
+            return consultar_dicts(conn, query, params, booleanos=('disponivel',))
+        finally:
+            conn.close()
 
     @staticmethod
     def atualizar(produto_id, **campos):
@@ -157,6 +160,7 @@ class ProdutoRepository:
 
         conn.commit()
         conn.close()
+        obter_catalogo_cache().invalidar()
 
         # Retornar produto atualizado
         return ProdutoRepository.buscar_por_id(produto_id)
@@ -179,6 +183,7 @@ class ProdutoRepository:
 
         conn.commit()
         conn.close()
+        obter_catalogo_cache().invalidar()
 
         return True
 
@@ -196,6 +201,7 @@ class ProdutoRepository:
 
         conn.commit()
         conn.close()
+        obter_catalogo_cache().invalidar()
 
         return True
 
@@ -211,31 +217,39 @@ class ProdutoRepository:
 
         return count
 
+    # Peso do nome e da descrição no ranking bm25 da busca textual
+    PESOS_BUSCA = (10.0, 1.0)
+
+    @staticmethod
+    def _consulta_fts(termo):
+        """Converte o termo digitado em uma consulta FTS5 de prefixos.
+
+        Cada palavra vira um prefixo entre aspas ("pao"*), combinadas com AND;
+        pontuação e operadores do FTS5 digitados pelo usuário são ignorados.
+        """
+        palavras = re.findall(r'\w+', termo or '')
+        return " ".join(f'"{palavra}"*' for palavra in palavras)
+
     @staticmethod
-    def buscar_por_nome_parcial(termo):
-        """Busca produtos por nome parcial"""
+    def buscar_por_texto(termo):
+        """Busca produtos disponíveis por nome ou descrição (FTS5, ordenado por relevância)"""
+        consulta = ProdutoRepository._consulta_fts(termo)
+        if not consulta:
+            return []
+
         conn = get_connection()
         cursor = conn.cursor()
 
         cursor.execute("""
-            SELECT id, nome, preco, categoria, disponivel, imagem, descricao,
-                   criado_em, atualizado_em
-            FROM produtos
-            WHERE nome LIKE ? AND disponivel = 1
-            ORDER BY nome
-        """, (f"%{termo}%",))
+            SELECT rowid
+            FROM produtos_fts
+            WHERE produtos_fts MATCH ?
+            ORDER BY bm25(produtos_fts, ?, ?)
+        """, (consulta, *ProdutoRepository.PESOS_BUSCA))
 
-        rows = cursor.fetchall()
+        ids = [row[0] for row in cursor.fetchall()]
         conn.close()
 
-        return [Produto(
-            id=row[0],
-            nome=row[1],
-            preco=float(row[2]),
-            categoria=row[3],
-            disponivel=bool(row[4]),
-            imagem=row[5],
-            descricao=row[6],
-            criado_em=datetime.fromisoformat(row[7]) if row[7] else None,
-            atualizado_em=datetime.fromisoformat(row[8]) if row[8] else None
-        ) for row in rows]
+        produtos = ProdutoRepository.buscar_por_ids(ids)
+        return [produtos[produto_id] for produto_id in ids
+                if produto_id in produtos and produtos[produto_id].disponivel]
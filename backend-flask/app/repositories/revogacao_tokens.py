@@ -0,0 +1,99 @@
+import threading
+import time
+from flask import current_app
+from app.models.db import get_connection
+
+
+class ListaRevogacao:
+    """Conjunto em memória dos jti revogados, espelho da tabela tokens_revogados.
+
+    A consulta `revogado(jti)` é um lookup num dicionário. Para enxergar
+    revogações feitas por outros workers, a lista busca no banco só as linhas
+    com id maior que o último lido, no máximo uma vez a cada
+    `intervalo_verificacao` segundos (0 consulta o banco a cada verificação).
+    Entradas com exp no passado são descartadas na memória e no banco: um
+    token expirado já é rejeitado pelo próprio JWT.
+    """
+
+    def __init__(self, intervalo_verificacao=1.0):
+        self.intervalo_verificacao = intervalo_verificacao
+        self._lock = threading.Lock()
+        self._revogados = {}  # jti -> expira_em
+        self._ultimo_id = 0
+        self._lido_em = None
+
+    @staticmethod
+    def _ler_desde(ultimo_id):
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, jti, expira_em FROM tokens_revogados
+            WHERE id > ? AND expira_em > ?
+            ORDER BY id
+        """, (ultimo_id, int(time.time())))
+        rows = cursor.fetchall()
+        conn.close()
+        return rows
+
+    def _sincronizar(self):
+        agora = time.monotonic()
+        if self._lido_em is not None and agora - self._lido_em < self.intervalo_verificacao:
+            return
+
+        with self._lock:
+            if self._lido_em is not None and agora - self._lido_em < self.intervalo_verificacao:
+                return
+
+            for registro_id, jti, expira_em in self._ler_desde(self._ultimo_id):
+                self._revogados[jti] = expira_em
+                self._ultimo_id = registro_id
+            self._descartar_expirados()
+            self._lido_em = agora
+
+    def _descartar_expirados(self):
+        agora = time.time()
+        for jti in [jti for jti, expira_em in self._revogados.items() if expira_em <= agora]:
+            del self._revogados[jti]
+
+    def revogado(self, jti):
+        self._sincronizar()
+        expira_em = self._revogados.get(jti)
+        return expira_em is not None and expira_em > time.time()
+
+    def revogar(self, jti, expira_em):
+        """Grava a revogação (visível a todos os workers) e poda as expiradas"""
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "INSERT OR IGNORE INTO tokens_revogados (jti, expira_em) VALUES (?, ?)",
+                (jti, int(expira_em)))
+            cursor.execute("DELETE FROM tokens_revogados WHERE expira_em <= ?",
+                           (int(time.time()),))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        with self._lock:
+            self._revogados[jti] = int(expira_em)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'revogados': len(self._revogados),
+                'ultimo_id': self._ultimo_id,
+                'intervalo_verificacao': self.intervalo_verificacao
+            }
+
+
+def obter_lista_revogacao():
+    """Retorna a lista de revogação da aplicação atual, criando-a se preciso"""
+    lista = current_app.extensions.get('revogacao_tokens')
+    if lista is None:
+        lista = current_app.extensions.setdefault(
+            'revogacao_tokens',
+            ListaRevogacao(current_app.config.get('JWT_REVOGACAO_VERIFICACAO', 1.0)))
+    return lista
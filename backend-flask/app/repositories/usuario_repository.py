@@ -1,12 +1,25 @@
 from app.models.db import get_connection
 from app.models.usuario import Usuario
+from app.utils.projecao import colunas_sql, consultar_dicts
 import sqlite3
-from datetime import datetime
 
 
 class UsuarioRepository:
     """Repository para operações CRUD de usuários no banco de dados"""
 
+    # Campos aceitos em listar_projetado (a senha nunca é exposta)
+    CAMPOS_PROJECAO = {
+        'id': 'id',
+        'nome': 'nome',
+        'email': 'email',
+        'telefone': 'telefone',
+        'role': 'role',
+        'is_admin': 'is_admin',
+        'ativo': 'ativo',
+        'criado_em': "replace(criado_em, ' ', 'T')",
+        'atualizado_em': "replace(atualizado_em, ' ', 'T')"
+    }
+
     @staticmethod
     def criar(usuario):
         """Cria um novo usuário no banco"""
@@ -57,8 +70,8 @@ class UsuarioRepository:
                 role=row[4],
                 is_admin=bool(row[5]),
                 ativo=bool(row[6]),
-                criado_em=datetime.fromisoformat(row[7]) if row[7] else None,
-                atualizado_em=datetime.fromisoformat(row[8]) if row[8] else None
+                criado_em=row[7],
+                atualizado_em=row[8]
             )
         return None
 
@@ -88,8 +101,8 @@ class UsuarioRepository:
                 role=row[5],
                 is_admin=bool(row[6]),
                 ativo=bool(row[7]),
-                criado_em=datetime.fromisoformat(row[8]) if row[8] else None,
-                atualizado_em=datetime.fromisoformat(row[9]) if row[9] else None
+                criado_em=row[8],
+                atualizado_em=row[9]
             )
         return None
 
@@ -111,10 +124,49 @@ class UsuarioRepository:
 
         return [Usuario(id=row[0], nome=row[1], email=row[2], telefone=row[3],
                         role=row[4], is_admin=bool(row[5]),
-                        criado_em=(datetime.fromisoformat(row[6])
-                                   if row[6] else None))
+                        criado_em=row[6])
                 for row in rows]
 
+    @staticmethod
+    def listar_projetado(campos):
+        """Lista usuários ativos como dicionários só com os `campos` pedidos"""
+        query = f"""
+            SELECT {colunas_sql(campos, UsuarioRepository.CAMPOS_PROJECAO)}
+            FROM usuarios
+            WHERE ativo = 1
+            ORDER BY criado_em DESC
+        """
+
+        conn = get_connection()
+        try:
+            return consultar_dicts(conn, query,
+                                   booleanos=('is_admin', 'ativo'))
+        finally:
+            conn.close()
+
+    @staticmethod
+    def atualizar_senha(usuario_id, senha_hash, senha_anterior):
+        """Troca o hash da senha, desde que ainda seja `senha_anterior`.
+
+        Usado no rehash durante o login: se a senha mudou nesse meio tempo,
+        nada é alterado. Retorna True se a linha foi atualizada.
+        """
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("""
+                UPDATE usuarios SET senha = ?, atualizado_em = CURRENT_TIMESTAMP
+                WHERE id = ? AND senha = ?
+            """, (senha_hash, usuario_id, senha_anterior))
+            conn.commit()
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
+
     @staticmethod
     def atualizar(usuario_id, **campos):
         """Atualiza campos específicos de um usuário"""
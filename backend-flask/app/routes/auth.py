@@ -1,11 +1,15 @@
 from flask import Blueprint, request, jsonify
 from app.service.usuario_service import UsuarioService
-from app.utils.jwt_utils import generate_token, token_required
+from app.utils.limite_taxa import limite_login
+from app.utils.senhas import SobrecargaSenhasError, resposta_sobrecarga
+from app.utils.jwt_utils import generate_token, get_token_from_request, revoke_token, token_required
 
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
+
 @auth_bp.route('/login', methods=['POST'])
+@limite_login
 def login():
     """
     Realiza login do usuário
@@ -47,6 +51,10 @@ def login():
         description: Credenciais inválidas
       400:
         description: Dados inválidos
+      429:
+        description: Limite de tentativas por IP ou email atingido (ver Retry-After)
+      503:
+        description: Muitos logins simultâneos; tente de novo (ver Retry-After)
     """
     try:
         dados = request.get_json()
@@ -96,6 +104,8 @@ def login():
             'token': token
         }), 200
 
+    except SobrecargaSenhasError:
+        return resposta_sobrecarga()
     except Exception:
         return jsonify({'erro': 'Erro interno do servidor'}), 500
 
@@ -107,12 +117,16 @@ def logout():
     ---
     tags:
       - Autenticação
+    security:
+      - Bearer: []
     responses:
       200:
-        description: Logout realizado com sucesso
+        description: Logout realizado com sucesso (o token enviado deixa de valer)
     """
     try:
-        # Em produção, invalidar token aqui
+        token = get_token_from_request()
+        if token:
+            revoke_token(token)
         return jsonify({'mensagem': 'Logout realizado com sucesso'}), 200
 
     except Exception as e:
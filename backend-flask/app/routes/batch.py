@@ -0,0 +1,127 @@
+from flask import Blueprint, current_app, request, jsonify
+from werkzeug.test import EnvironBuilder
+
+batch_bp = Blueprint('batch', __name__)
+
+# Máximo de sub-requisições aceitas em um único batch
+MAXIMO_SUBREQUISICOES = 20
+# Apenas leituras: uma falha no meio do batch não deixa escrita pela metade
+METODOS_PERMITIDOS = ('GET',)
+# Rotas que não terminam (SSE), respondem em streaming ou aninhariam batches
+ENDPOINTS_NAO_PERMITIDOS = {
+    'batch.executar_batch',
+    'pedidos.stream_pedidos',
+    'pedidos.exportar_pedidos',
+}
+
+
+def _validar_subrequisicoes(dados):
+    """Valida o corpo do batch e devolve a lista de sub-requisições"""
+    if not isinstance(dados, dict) or not isinstance(dados.get('requisicoes'), list):
+        raise ValueError("O corpo deve conter a lista 'requisicoes'")
+
+    requisicoes = dados['requisicoes']
+    if not requisicoes:
+        raise ValueError("Lista de requisições vazia")
+    if len(requisicoes) > MAXIMO_SUBREQUISICOES:
+        raise ValueError(f"Máximo de {MAXIMO_SUBREQUISICOES} requisições por batch")
+
+    for indice, sub in enumerate(requisicoes):
+        if not isinstance(sub, dict) or not isinstance(sub.get('url'), str):
+            raise ValueError(f"Requisição {indice}: 'url' é obrigatória")
+        if not sub['url'].startswith('/api/'):
+            raise ValueError(f"Requisição {indice}: 'url' deve começar com /api/")
+        if sub.get('metodo', 'GET').upper() not in METODOS_PERMITIDOS:
+            raise ValueError(f"Requisição {indice}: apenas GET é permitido no batch")
+
+    return requisicoes
+
+
+def _executar_subrequisicao(url, metodo, headers):
+    """Despacha uma sub-requisição pelos blueprints no app context atual.
+
+    O request context da sub-requisição reaproveita o app context do batch,
+    então `g` (com a conexão do pool e o token já verificado) é compartilhado.
+    """
+    ambiente = EnvironBuilder(
+        path=url, method=metodo, headers=headers,
+        environ_base={'REMOTE_ADDR': request.remote_addr}).get_environ()
+
+    with current_app.request_context(ambiente):
+        if request.url_rule is not None and request.url_rule.endpoint in ENDPOINTS_NAO_PERMITIDOS:
+            return jsonify({'erro': 'Rota não permitida no batch'}), 400
+        return current_app.full_dispatch_request()
+
+
+def _corpo_json(resposta, dumps):
+    """Corpo da sub-resposta já em JSON, sem decodificar e serializar de novo"""
+    if resposta.is_json:
+        return resposta.get_data(as_text=True).rstrip('\n') or 'null'
+    # Erros do Flask (404, 405...) vêm em HTML; devolve só o status como erro
+    if resposta.status_code >= 400:
+        return dumps({'erro': resposta.status})
+    return dumps(resposta.get_data(as_text=True)) if resposta.get_data() else 'null'
+
+
+@batch_bp.route('/api/batch', methods=['POST'])
+def executar_batch():
+    """
+    Executa várias requisições GET da API em uma só chamada
+    ---
+    tags:
+      - Batch
+    parameters:
+      - in: body
+        name: batch
+        schema:
+          type: object
+          required:
+            - requisicoes
+          properties:
+            requisicoes:
+              type: array
+              items:
+                type: object
+                required:
+                  - url
+                properties:
+                  id:
+                    type: string
+                    description: Identificador devolvido junto com a resposta
+                  metodo:
+                    type: string
+                    enum: [GET]
+                  url:
+                    type: string
+                    example: /api/produtos/?disponiveis_apenas=true
+    responses:
+      200:
+        description: Lista "respostas" com id, status e corpo de cada requisição, na ordem enviada
+      400:
+        description: Batch inválido
+    """
+    try:
+        requisicoes = _validar_subrequisicoes(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+
+    headers = {}
+    if request.headers.get('Authorization'):
+        headers['Authorization'] = request.headers['Authorization']
+
+    dumps = current_app.json.dumps
+    partes = []
+    for indice, sub in enumerate(requisicoes):
+        try:
+            resposta = current_app.make_response(_executar_subrequisicao(
+                sub['url'], sub.get('metodo', 'GET').upper(), headers))
+            status, corpo = resposta.status_code, _corpo_json(resposta, dumps)
+        except Exception:
+            status, corpo = 500, dumps({'erro': 'Erro interno do servidor'})
+
+        partes.append(
+            f'{{"id":{dumps(sub.get("id", indice))},"status":{status},"corpo":{corpo}}}')
+
+    return current_app.response_class(
+        '{"respostas":[' + ','.join(partes) + ']}',
+        mimetype='application/json')
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from app.service.categoria_service import CategoriaService
+from app.utils.http_cache import etag_catalogo
 
 categorias_bp = Blueprint('categorias', __name__, url_prefix='/api/categorias')
 
@@ -54,6 +55,7 @@ def criar_categoria():
 
 
 @categorias_bp.route('/', methods=['GET'])
+@etag_catalogo
 def listar_categorias():
     """
     Lista todas as categorias ativas
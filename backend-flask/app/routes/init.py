@@ -1,7 +1,76 @@
-from flask import Blueprint
+from flask import Blueprint, current_app, request, jsonify
+from app.models.db import diagnostico_banco
+from app.repositories.revogacao_tokens import obter_lista_revogacao
+from app.utils.jwt_utils import obter_cache_tokens, token_required
 
 init_bp = Blueprint('init', __name__)
 
 @init_bp.route('/')
 def home():
-    return "Aplicação rodando! Banco de dados inicializado automaticamente."
\ No newline at end of file
+    return "Aplicação rodando! Banco de dados inicializado automaticamente."
+
+
+@init_bp.route('/api/diagnostico/banco', methods=['GET'])
+@token_required
+def diagnostico():
+    """
+    Configuração efetiva do SQLite, do pool de conexões, dos checkpoints do WAL
+    e da gravação de pedidos em lote
+    ---
+    tags:
+      - Diagnóstico
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: Pragmas efetivos, estado do pool, último checkpoint e gravador de pedidos
+      401:
+        description: Não autorizado
+      403:
+        description: Acesso negado
+    """
+    try:
+        user_data = request.user
+
+        # Apenas funcionários podem ver o diagnóstico
+        if user_data['role'] not in ['manager', 'attendant'] and not user_data.get('is_admin', False):
+            return jsonify({'erro': 'Acesso negado'}), 403
+
+        estado = diagnostico_banco()
+        gravador = current_app.extensions.get('gravador_pedidos')
+        estado['gravador_pedidos'] = gravador.stats() if gravador else None
+        return jsonify(estado), 200
+    except Exception:
+        return jsonify({'erro': 'Erro interno do servidor'}), 500
+
+
+@init_bp.route('/api/diagnostico/tokens', methods=['GET'])
+@token_required
+def diagnostico_tokens():
+    """
+    Estado do cache de tokens verificados e da lista de revogação
+    ---
+    tags:
+      - Diagnóstico
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: Contadores e tamanho do cache de tokens
+      401:
+        description: Não autorizado
+      403:
+        description: Acesso negado
+    """
+    try:
+        user_data = request.user
+
+        # Apenas funcionários podem ver o diagnóstico
+        if user_data['role'] not in ['manager', 'attendant'] and not user_data.get('is_admin', False):
+            return jsonify({'erro': 'Acesso negado'}), 403
+
+        estado = obter_cache_tokens().stats()
+        estado['revogacao'] = obter_lista_revogacao().stats()
+        return jsonify(estado), 200
+    except Exception:
+        return jsonify({'erro': 'Erro interno do servidor'}), 500
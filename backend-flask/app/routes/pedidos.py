@@ -1,12 +1,22 @@
-from flask import Blueprint, request, jsonify
-from app.service.pedido_service import PedidoService
-from app.utils.jwt_utils import token_required
+import json
+import queue
+import time
+from datetime import date
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from app.service.pedido_service import ConflitoStatusError, PedidoNaoEncontradoError, PedidoService
+from app.service.eventos_pedidos import obter_hub_pedidos
+from app.service.gravador_pedidos import FilaPedidosCheiaError, resposta_fila_cheia
+from app.utils.jwt_utils import token_required, get_token_from_request, verify_token_cached
+from app.utils.idempotencia import idempotente
+from app.utils.paginacao import decodificar_cursor
+from app.utils.projecao import interpretar_campos
 from app.models.pedido import StatusPedido
 
 pedidos_bp = Blueprint('pedidos', __name__, url_prefix='/api/pedidos')
 
 @pedidos_bp.route('/', methods=['POST'])
 @token_required
+@idempotente
 def criar_pedido():
     """
     Cria um novo pedido
@@ -16,6 +26,11 @@ def criar_pedido():
     security:
       - Bearer: []
     parameters:
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Chave única da operação; repetições devolvem a resposta gravada
       - in: body
         name: pedido
         description: Dados do pedido
@@ -42,6 +57,12 @@ def criar_pedido():
         description: Dados inválidos
       401:
         description: Não autorizado
+      409:
+        description: Requisição com a mesma Idempotency-Key em andamento
+      422:
+        description: Idempotency-Key reaproveitada com outro conteúdo
+      503:
+        description: Fila de gravação de pedidos cheia
     """
     try:
         dados = request.get_json()
@@ -63,6 +84,8 @@ def criar_pedido():
             'pedido': pedido
         }), 201
 
+    except FilaPedidosCheiaError:
+        return resposta_fila_cheia()
     except ValueError as e:
         return jsonify({'erro': str(e)}), 400
     except Exception:
@@ -87,14 +110,24 @@ def listar_pedidos():
       - name: limit
         in: query
         type: integer
-        description: Limite de resultados
+        description: Limite de resultados (padrão 50, máximo 200)
+      - name: cursor
+        in: query
+        type: string
+        description: Valor de next_cursor da página anterior
       - name: offset
         in: query
         type: integer
-        description: Offset para paginação
+        description: Offset para paginação (obsoleto, prefira cursor)
+      - name: fields
+        in: query
+        type: string
+        description: Campos retornados, separados por vírgula (ex. id,status,total,itens)
     responses:
       200:
-        description: Lista de pedidos
+        description: Lista de pedidos com next_cursor (null na última página)
+      400:
+        description: Cursor ou campo de fields inválido
       401:
         description: Não autorizado
     """
@@ -103,12 +136,27 @@ def listar_pedidos():
         limit = request.args.get('limit', type=int)
         offset = request.args.get('offset', 0, type=int)
 
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                cursor = decodificar_cursor(cursor)
+            except ValueError as e:
+                return jsonify({'erro': str(e)}), 400
+
+        try:
+            campos = interpretar_campos(request.args.get('fields'),
+                                        PedidoService.CAMPOS_LISTAGEM)
+        except ValueError as e:
+            return jsonify({'erro': str(e)}), 400
+
         user_data = request.user
         # Admin/manager vê todos os pedidos, usuário comum vê apenas os seus
         if user_data['role'] in ['manager', 'attendant'] or user_data.get('is_admin', False):
-            resultado = PedidoService.listar_todos_pedidos(status, limit, offset)
+            resultado = PedidoService.listar_todos_pedidos(
+                status, limit, offset, cursor, campos)
         else:
-            resultado = PedidoService.listar_pedidos_usuario(user_data['user_id'], status)
+            resultado = PedidoService.listar_pedidos_usuario(
+                user_data['user_id'], status, limit, cursor, campos)
 
         return jsonify(resultado), 200
 
@@ -184,6 +232,9 @@ def atualizar_status_pedido(pedido_id):
             status:
               type: string
               enum: [em_andamento, preparando, pronto, finalizado, cancelado]
+            status_atual:
+              type: string
+              description: Status que o cliente viu; a troca só acontece se o pedido ainda estiver nele
     responses:
       200:
         description: Status atualizado
@@ -195,6 +246,8 @@ def atualizar_status_pedido(pedido_id):
         description: Acesso negado
       404:
         description: Pedido não encontrado
+      409:
+        description: O status mudou antes desta requisição; retorna o pedido atual
     """
     try:
         dados = request.get_json()
@@ -217,13 +270,18 @@ def atualizar_status_pedido(pedido_id):
                 self.is_admin = user_data.get('is_admin', False)
 
         mock_user = MockUser(user_data)
-        pedido = PedidoService.atualizar_status_pedido(pedido_id, novo_status, mock_user)
+        pedido = PedidoService.atualizar_status_pedido(
+            pedido_id, novo_status, mock_user, dados.get('status_atual'))
 
         return jsonify({
             'mensagem': 'Status do pedido atualizado com sucesso',
             'pedido': pedido
         }), 200
 
+    except ConflitoStatusError as e:
+        return jsonify({'erro': str(e), 'pedido': e.pedido}), 409
+    except PedidoNaoEncontradoError as e:
+        return jsonify({'erro': str(e)}), 404
     except ValueError as e:
         return jsonify({'erro': str(e)}), 400
     except Exception:
@@ -256,6 +314,8 @@ def cancelar_pedido(pedido_id):
         description: Acesso negado
       404:
         description: Pedido não encontrado
+      409:
+        description: O status mudou durante o cancelamento; retorna o pedido atual
     """
     try:
         user_data = request.user
@@ -266,6 +326,10 @@ def cancelar_pedido(pedido_id):
             'pedido': pedido
         }), 200
 
+    except ConflitoStatusError as e:
+        return jsonify({'erro': str(e), 'pedido': e.pedido}), 409
+    except PedidoNaoEncontradoError as e:
+        return jsonify({'erro': str(e)}), 404
     except ValueError as e:
         return jsonify({'erro': str(e)}), 400
     except Exception:
@@ -327,6 +391,11 @@ def obter_estatisticas_pedidos():
       - Pedidos
     security:
       - Bearer: []
+    parameters:
+      - name: dias
+        in: query
+        type: integer
+        description: Incluir pedidos_por_dia dos últimos N dias
     responses:
       200:
         description: Estatísticas dos pedidos
@@ -341,13 +410,128 @@ def obter_estatisticas_pedidos():
         if user_data['role'] not in ['manager', 'attendant'] and not user_data.get('is_admin', False):
             return jsonify({'erro': 'Acesso negado'}), 403
 
-        estatisticas = PedidoService.obter_estatisticas()
+        dias = request.args.get('dias', type=int)
+        estatisticas = PedidoService.obter_estatisticas(dias)
         return jsonify(estatisticas), 200
 
     except Exception as e:
         return jsonify({'erro': 'Erro interno do servidor'}), 500
 
 
+@pedidos_bp.route('/fila', methods=['GET'])
+@token_required
+def fila_cozinha():
+    """
+    Fila da cozinha: pedidos ativos por status e itens a preparar (apenas para funcionários)
+    ---
+    tags:
+      - Pedidos
+    security:
+      - Bearer: []
+    parameters:
+      - name: status
+        in: query
+        type: string
+        enum: [em_andamento, preparando, pronto]
+        description: Retornar só um dos status da fila
+    responses:
+      200:
+        description: Pedidos em ordem de chegada por status e soma das quantidades por produto ainda não preparadas
+      400:
+        description: Status inválido
+      401:
+        description: Não autorizado
+      403:
+        description: Acesso negado
+    """
+    try:
+        user_data = request.user
+        # Apenas funcionários podem ver a fila da cozinha
+        if user_data['role'] not in ['manager', 'attendant'] and not user_data.get('is_admin', False):
+            return jsonify({'erro': 'Acesso negado'}), 403
+
+        fila = PedidoService.fila_cozinha(request.args.get('status'))
+        return jsonify(fila), 200
+
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    except Exception:
+        return jsonify({'erro': 'Erro interno do servidor'}), 500
+
+
+@pedidos_bp.route('/export', methods=['GET'])
+@token_required
+def exportar_pedidos():
+    """
+    Exporta o histórico de pedidos com itens (apenas para funcionários)
+    ---
+    tags:
+      - Pedidos
+    security:
+      - Bearer: []
+    parameters:
+      - name: formato
+        in: query
+        type: string
+        enum: [ndjson, csv]
+        description: ndjson (padrão, um pedido por linha) ou csv (uma linha por item)
+      - name: status
+        in: query
+        type: string
+        description: Filtrar por status
+      - name: desde
+        in: query
+        type: string
+        description: Data inicial AAAA-MM-DD (inclusive)
+      - name: ate
+        in: query
+        type: string
+        description: Data final AAAA-MM-DD (inclusive)
+    responses:
+      200:
+        description: Arquivo enviado em streaming, em ordem de criação
+      400:
+        description: Parâmetros inválidos
+      401:
+        description: Não autorizado
+      403:
+        description: Acesso negado
+    """
+    user_data = request.user
+    if user_data['role'] not in ['manager', 'attendant'] and not user_data.get('is_admin', False):
+        return jsonify({'erro': 'Acesso negado'}), 403
+
+    formato = request.args.get('formato', 'ndjson').lower()
+    status = request.args.get('status')
+
+    try:
+        if status and status not in [s.value for s in StatusPedido]:
+            raise ValueError(f"Status inválido: {status}")
+
+        datas = {}
+        for nome in ('desde', 'ate'):
+            valor = request.args.get(nome)
+            try:
+                datas[nome] = date.fromisoformat(valor) if valor else None
+            except ValueError:
+                raise ValueError(f"Data inválida em {nome}: use AAAA-MM-DD")
+
+        if datas['desde'] and datas['ate'] and datas['desde'] > datas['ate']:
+            raise ValueError("'desde' deve ser anterior ou igual a 'ate'")
+
+        blocos = PedidoService.exportar_pedidos(
+            formato, status, datas['desde'], datas['ate'], current_app.json.dumps)
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+
+    mimetype = 'text/csv' if formato == 'csv' else 'application/x-ndjson'
+    # stream_with_context mantém o app context (e a conexão) durante o envio
+    return Response(stream_with_context(blocos), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename=pedidos.{formato}',
+        'X-Accel-Buffering': 'no'
+    })
+
+
 @pedidos_bp.route('/status', methods=['GET'])
 def listar_status_pedidos():
     """
@@ -368,3 +552,109 @@ def listar_status_pedidos():
 
     except Exception as e:
         return jsonify({'erro': 'Erro interno do servidor'}), 500
+
+
+# Intervalo (segundos) entre comentários de keep-alive no stream SSE
+INTERVALO_KEEPALIVE = 15
+# Intervalo sugerido ao EventSource para reconectar após queda
+INTERVALO_RECONEXAO_MS = 3000
+
+
+def _formatar_evento_sse(evento_id, tipo, dados, dumps=json.dumps):
+    return f"id: {evento_id}\nevent: {tipo}\ndata: {dumps(dados)}\n\n"
+
+
+@pedidos_bp.route('/stream', methods=['GET'])
+def stream_pedidos():
+    """
+    Stream (Server-Sent Events) de criação e mudança de status de pedidos
+    ---
+    tags:
+      - Pedidos
+    parameters:
+      - name: token
+        in: query
+        type: string
+        description: Token JWT (EventSource não permite enviar o header Authorization)
+      - name: Last-Event-ID
+        in: header
+        type: string
+        description: Último evento recebido, para retomar após reconexão
+    responses:
+      200:
+        description: Stream text/event-stream. Funcionários recebem todos os
+                     pedidos; clientes apenas os seus. O evento "resync" indica
+                     que não foi possível retomar e a lista deve ser recarregada.
+                     O stream é encerrado quando o token expira ou é revogado,
+                     ou quando o cliente fica para trás (reconectar com
+                     Last-Event-ID recebe os eventos que faltam).
+      401:
+        description: Não autorizado
+    """
+    token = get_token_from_request() or request.args.get('token')
+    user_data = verify_token_cached(token) if token else None
+    if not user_data:
+        return jsonify({'erro': 'Token inválido ou expirado'}), 401
+
+    ve_todos = (user_data['role'] in ['manager', 'attendant'] or
+                user_data.get('is_admin', False))
+    usuario_id = user_data['user_id']
+
+    def visivel(evento):
+        return ve_todos or evento['usuario_id'] == usuario_id
+
+    ultimo_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    hub = obter_hub_pedidos()
+    fila, perdidos, retomado = hub.assinar(ultimo_id)
+    # O gerador roda fora do app context; guarda o serializador e a aplicação
+    dumps = current_app.json.dumps
+    app = current_app._get_current_object()
+
+    def token_valido():
+        # Expiração (exp) e revogação (logout, jti) desde a conexão
+        with app.app_context():
+            return verify_token_cached(token) is not None
+
+    def gerar():
+        try:
+            # Envia os headers de imediato e define o intervalo de reconexão
+            yield f"retry: {INTERVALO_RECONEXAO_MS}\n\n"
+
+            if not retomado:
+                yield _formatar_evento_sse(f"{hub.instancia}:0", 'resync', {})
+            for evento in perdidos:
+                if visivel(evento):
+                    yield _formatar_evento_sse(evento['id'], evento['tipo'], evento['dados'], dumps)
+
+            verificar_em = time.monotonic() + INTERVALO_KEEPALIVE
+            while True:
+                if fila.empty() and hub.atrasado(fila):
+                    # Ficou para trás e já recebeu tudo que coube na fila:
+                    # encerra para o cliente reconectar com Last-Event-ID
+                    return
+
+                try:
+                    evento = fila.get(timeout=max(0.0, verificar_em - time.monotonic()))
+                except queue.Empty:
+                    evento = None
+
+                # A cada intervalo, mesmo com eventos chegando, o token é
+                # conferido de novo; inválido, o stream é encerrado
+                if time.monotonic() >= verificar_em:
+                    if not token_valido():
+                        return
+                    verificar_em = time.monotonic() + INTERVALO_KEEPALIVE
+
+                if evento is None:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                if visivel(evento):
+                    yield _formatar_evento_sse(evento['id'], evento['tipo'], evento['dados'], dumps)
+        finally:
+            hub.cancelar(fila)
+
+    return Response(gerar(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
@@ -1,5 +1,7 @@
 from flask import Blueprint, request, jsonify
 from app.service.produto_service import ProdutoService
+from app.utils.http_cache import etag_catalogo
+from app.utils.projecao import interpretar_campos
 
 produtos_bp = Blueprint('produtos', __name__, url_prefix='/api/produtos')
 
@@ -93,6 +95,7 @@ def criar_produto():
 
 
 @produtos_bp.route('/', methods=['GET'])
+@etag_catalogo
 def listar_produtos():
     """
     Lista produtos com filtros opcionais
@@ -112,6 +115,10 @@ def listar_produtos():
         in: query
         type: string
         description: Buscar por nome parcial
+      - name: fields
+        in: query
+        type: string
+        description: Campos retornados, separados por vírgula (ex. id,nome,preco)
     responses:
       200:
         description: Lista de produtos
@@ -124,8 +131,16 @@ def listar_produtos():
                 type: object
             total:
               type: integer
+      400:
+        description: Campo inválido em fields
     """
     try:
+        try:
+            campos = interpretar_campos(request.args.get('fields'),
+                                        ProdutoService.CAMPOS_LISTAGEM)
+        except ValueError as e:
+            return jsonify({'erro': str(e)}), 400
+
         disponiveis_apenas = (request.args.get('disponiveis_apenas', 'false')
                                .lower() == 'true')
         categoria = request.args.get('categoria')
@@ -134,7 +149,8 @@ def listar_produtos():
         resultado = ProdutoService.listar_produtos(
             disponiveis_apenas=disponiveis_apenas,
             categoria=categoria,
-            busca=busca
+            busca=busca,
+            campos=campos
         )
 
         return jsonify(resultado), 200
@@ -144,6 +160,7 @@ def listar_produtos():
 
 
 @produtos_bp.route('/<int:produto_id>', methods=['GET'])
+@etag_catalogo
 def obter_produto(produto_id):
     """
     Obtém um produto específico
@@ -311,6 +328,7 @@ def obter_estatisticas_produtos():
 
 
 @produtos_bp.route('/categorias', methods=['GET'])
+@etag_catalogo
 def listar_categorias():
     """
     Lista todas as categorias disponíveis
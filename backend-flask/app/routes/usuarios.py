@@ -1,5 +1,7 @@
 from flask import Blueprint, request, jsonify
 from app.service.usuario_service import UsuarioService
+from app.utils.projecao import interpretar_campos
+from app.utils.senhas import SobrecargaSenhasError, resposta_sobrecarga
 
 usuarios_bp = Blueprint('usuarios', __name__, url_prefix='/api/usuarios')
 
@@ -45,6 +47,8 @@ def criar_usuario():
         description: Usuário criado com sucesso
       400:
         description: Dados inválidos
+      503:
+        description: Pool de hash de senhas ocupado; tente de novo (ver Retry-After)
     """
     try:
         dados = request.get_json()
@@ -59,6 +63,8 @@ def criar_usuario():
             'usuario': usuario
         }), 201
 
+    except SobrecargaSenhasError:
+        return resposta_sobrecarga()
     except ValueError as e:
         return jsonify({'erro': str(e)}), 400
     except Exception as e:
@@ -72,6 +78,11 @@ def listar_usuarios():
     ---
     tags:
       - Usuários
+    parameters:
+      - name: fields
+        in: query
+        type: string
+        description: Campos retornados, separados por vírgula (ex. id,nome,email)
     responses:
       200:
         description: Lista de usuários
@@ -84,9 +95,17 @@ def listar_usuarios():
                 type: object
             total:
               type: integer
+      400:
+        description: Campo inválido em fields
     """
     try:
-        resultado = UsuarioService.listar_usuarios()
+        try:
+            campos = interpretar_campos(request.args.get('fields'),
+                                        UsuarioService.CAMPOS_LISTAGEM)
+        except ValueError as e:
+            return jsonify({'erro': str(e)}), 400
+
+        resultado = UsuarioService.listar_usuarios(campos)
         return jsonify(resultado), 200
 
     except Exception as e:
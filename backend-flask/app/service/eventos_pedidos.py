@@ -0,0 +1,104 @@
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+from flask import current_app
+
+
+class HubEventosPedidos:
+    """Pub/sub em processo para eventos de pedidos (criação e mudança de status).
+
+    Cada assinante recebe uma fila própria. Os últimos eventos ficam em um
+    buffer circular para que clientes reconectando com Last-Event-ID recebam
+    o que perderam. Os IDs carregam um prefixo da instância do hub: um ID de
+    outra instância (outro worker ou antes de um restart) não pode ser
+    retomado e o cliente deve recarregar a lista.
+
+    Um assinante cuja fila enche fica marcado como atrasado e não recebe mais
+    eventos: o stream dele termina ao esvaziar a fila e o cliente reconecta
+    com Last-Event-ID, recebendo pelo buffer o que não coube na fila.
+    """
+
+    def __init__(self, tamanho_buffer=1000, tamanho_fila=256):
+        self.instancia = format(int(time.time() * 1000), 'x')
+        self.tamanho_fila = tamanho_fila
+        self._sequencia = itertools.count(1)
+        self._buffer = deque(maxlen=tamanho_buffer)
+        self._assinantes = set()
+        self._atrasados = set()
+        self._lock = threading.Lock()
+
+    def publicar(self, tipo, pedido, **extras):
+        """Publica um evento para todos os assinantes"""
+        with self._lock:
+            seq = next(self._sequencia)
+            evento = {
+                'id': f"{self.instancia}:{seq}",
+                'seq': seq,
+                'tipo': tipo,
+                'usuario_id': pedido.get('usuario_id'),
+                'dados': dict(extras, pedido=pedido)
+            }
+            self._buffer.append(evento)
+
+            # Sob o lock: um assinante marcado como atrasado não recebe nenhum
+            # evento depois do que ficou de fora (o Last-Event-ID dele não
+            # pode passar do buraco)
+            for fila in list(self._assinantes):
+                try:
+                    fila.put_nowait(evento)
+                except queue.Full:
+                    # Assinante lento: não trava quem publica nem perde o evento
+                    # em silêncio; o stream dele termina e ele retoma pelo buffer
+                    self._assinantes.discard(fila)
+                    self._atrasados.add(fila)
+
+        return evento
+
+    def assinar(self, ultimo_id=None):
+        """Registra um assinante.
+
+        Retorna (fila, eventos_perdidos, retomado); `retomado` é False quando
+        `ultimo_id` não pode ser retomado por este hub.
+        """
+        fila = queue.Queue(maxsize=self.tamanho_fila)
+        with self._lock:
+            self._assinantes.add(fila)
+            perdidos, retomado = self._eventos_depois(ultimo_id)
+        return fila, perdidos, retomado
+
+    def cancelar(self, fila):
+        with self._lock:
+            self._assinantes.discard(fila)
+            self._atrasados.discard(fila)
+
+    def atrasado(self, fila):
+        """True se a fila encheu e o assinante deixou de receber eventos"""
+        with self._lock:
+            return fila in self._atrasados
+
+    def _eventos_depois(self, ultimo_id):
+        if not ultimo_id:
+            return [], True
+
+        instancia, _, seq = ultimo_id.partition(':')
+        if instancia != self.instancia or not seq.isdigit():
+            return [], False
+
+        seq = int(seq)
+        if self._buffer and self._buffer[0]['seq'] > seq + 1:
+            # Parte dos eventos já saiu do buffer
+            return [], False
+
+        return [evento for evento in self._buffer if evento['seq'] > seq], True
+
+
+def obter_hub_pedidos():
+    """Retorna o hub de eventos de pedidos da aplicação atual"""
+    hub = current_app.extensions.get('eventos_pedidos')
+    if hub is None:
+        hub = current_app.extensions.setdefault(
+            'eventos_pedidos',
+            HubEventosPedidos(current_app.config.get('EVENTOS_BUFFER', 1000)))
+    return hub
@@ -0,0 +1,178 @@
+import bisect
+import threading
+import time
+from flask import current_app
+from app.models.pedido import StatusPedido
+from app.repositories.pedido_repository import PedidoRepository
+
+# Status que aparecem na fila da cozinha, na ordem do preparo
+STATUS_ATIVOS = (StatusPedido.EM_ANDAMENTO.value, StatusPedido.PREPARANDO.value,
+                 StatusPedido.PRONTO.value)
+# Status cujos itens ainda precisam ser preparados
+STATUS_A_PREPARAR = (StatusPedido.EM_ANDAMENTO.value, StatusPedido.PREPARANDO.value)
+
+
+class FilaCozinha:
+    """Índice em memória dos pedidos ativos, separado por status.
+
+    Cada status guarda seus pedidos (com itens resumidos) em ordem de
+    chegada, e a soma das quantidades por produto dos pedidos ainda não
+    preparados é mantida a cada mudança. O índice é carregado do banco na
+    inicialização e atualizado pelo PedidoService a cada criação e
+    transição feitas por este processo.
+
+    Para enxergar escritas de outros workers, a fila compara sua geração com
+    a da tabela pedidos_versao (incrementada por triggers a cada escrita em
+    pedidos) no máximo a cada `intervalo_verificacao` segundos e recarrega
+    tudo se ela andou. Cada alteração aplicada aqui corresponde a uma escrita
+    deste processo e avança a geração local em um.
+
+    Os dicionários retornados são compartilhados e não devem ser alterados.
+    """
+
+    def __init__(self, intervalo_verificacao=1.0):
+        self.intervalo_verificacao = intervalo_verificacao
+        self._lock = threading.Lock()
+        self._pedidos = {status: {} for status in STATUS_ATIVOS}  # status -> {id: pedido}
+        self._ordem = {status: [] for status in STATUS_ATIVOS}    # status -> ids em ordem
+        self._status_de = {}                                      # id -> status
+        self._a_preparar = {}                                     # produto_id -> item somado
+        # Geração do banco refletida pelo índice e quando ela foi conferida
+        self._geracao = None
+        self._verificado_em = 0.0
+        self.recargas = 0
+
+    def carregar(self):
+        """(Re)carrega o índice a partir do banco"""
+        with self._lock:
+            self._recarregar()
+
+    def _recarregar(self):
+        # A geração é lida antes dos pedidos: se houver escrita no meio, o
+        # índice fica com uma geração antiga e será recarregado de novo
+        geracao = PedidoRepository.ler_versao()
+        pedidos = PedidoRepository.listar_fila(STATUS_ATIVOS)
+
+        self._pedidos = {status: {} for status in STATUS_ATIVOS}
+        self._ordem = {status: [] for status in STATUS_ATIVOS}
+        self._status_de = {}
+        self._a_preparar = {}
+        for pedido in pedidos:
+            self._inserir(pedido)
+
+        self._geracao = geracao
+        self._verificado_em = time.monotonic()
+        self.recargas += 1
+
+    def _garantir_atual(self):
+        if (self._geracao is not None and
+                time.monotonic() - self._verificado_em < self.intervalo_verificacao):
+            return
+
+        with self._lock:
+            agora = time.monotonic()
+            if (self._geracao is not None and
+                    agora - self._verificado_em < self.intervalo_verificacao):
+                return
+            if self._geracao is None or PedidoRepository.ler_versao() != self._geracao:
+                self._recarregar()
+            else:
+                self._verificado_em = agora
+
+    def _somar(self, itens, sinal):
+        for item in itens:
+            somado = self._a_preparar.get(item['produto_id'])
+            if somado is None:
+                somado = self._a_preparar[item['produto_id']] = {
+                    'produto_id': item['produto_id'], 'nome': item['nome'], 'quantidade': 0}
+            somado['quantidade'] += sinal * item['quantidade']
+            if somado['quantidade'] <= 0:
+                del self._a_preparar[item['produto_id']]
+
+    def _inserir(self, pedido):
+        status = pedido['status']
+        if status not in self._pedidos:
+            return
+        self._pedidos[status][pedido['id']] = pedido
+        bisect.insort(self._ordem[status], pedido['id'])
+        self._status_de[pedido['id']] = status
+        if status in STATUS_A_PREPARAR:
+            self._somar(pedido['itens'], 1)
+
+    def _retirar(self, pedido_id):
+        status = self._status_de.pop(pedido_id, None)
+        if status is None:
+            return None
+        pedido = self._pedidos[status].pop(pedido_id)
+        ordem = self._ordem[status]
+        del ordem[bisect.bisect_left(ordem, pedido_id)]
+        if status in STATUS_A_PREPARAR:
+            self._somar(pedido['itens'], -1)
+        return pedido
+
+    def registrar(self, pedido, itens=None):
+        """Aplica a criação ou a mudança de status de um pedido.
+
+        `itens` é a lista resumida (produto_id, nome, quantidade); sem ela,
+        os itens já indexados do pedido são mantidos.
+        """
+        with self._lock:
+            if self._geracao is None:
+                return
+            anterior = self._retirar(pedido['id'])
+            if itens is None and anterior is not None:
+                itens = anterior['itens']
+
+            if pedido['status'] in STATUS_ATIVOS and itens is None:
+                # Pedido ativo que o índice não conhecia e sem itens: recarrega
+                self._geracao = None
+                return
+
+            entrada = {chave: valor for chave, valor in pedido.items() if chave != 'itens'}
+            entrada['itens'] = itens or []
+            self._inserir(entrada)
+            self._geracao += 1
+
+    def remover(self, pedido_id):
+        """Tira do índice um pedido excluído do banco"""
+        with self._lock:
+            if self._geracao is None:
+                return
+            self._retirar(pedido_id)
+            self._geracao += 1
+
+    def listar(self, status=None):
+        """Pedidos ativos por status, em ordem de chegada, e itens a preparar"""
+        self._garantir_atual()
+        with self._lock:
+            pedidos = {s: [self._pedidos[s][pedido_id] for pedido_id in self._ordem[s]]
+                       for s in STATUS_ATIVOS if status is None or s == status}
+            a_preparar = sorted((dict(item) for item in self._a_preparar.values()),
+                                key=lambda item: (-item['quantidade'], item['nome'] or ''))
+            geracao = self._geracao
+
+        return {
+            'pedidos': pedidos,
+            'a_preparar': a_preparar,
+            'total': sum(len(lista) for lista in pedidos.values()),
+            'geracao': geracao
+        }
+
+    def stats(self):
+        with self._lock:
+            return {
+                'geracao': self._geracao,
+                'pedidos': {status: len(self._ordem[status]) for status in STATUS_ATIVOS},
+                'produtos_a_preparar': len(self._a_preparar),
+                'recargas': self.recargas
+            }
+
+
+def obter_fila_cozinha():
+    """Retorna a fila da cozinha da aplicação atual"""
+    fila = current_app.extensions.get('fila_cozinha')
+    if fila is None:
+        fila = current_app.extensions.setdefault(
+            'fila_cozinha',
+            FilaCozinha(current_app.config.get('FILA_COZINHA_VERIFICACAO', 1.0)))
+    return fila
@@ -0,0 +1,216 @@
+"""Gravação de pedidos em lote (group commit) para picos de criação.
+
+Com PEDIDOS_GRAVACAO='fila', PedidoService.criar_pedido valida o pedido na
+thread da requisição e o entrega a uma fila em processo. Uma única thread
+gravadora drena a fila: junta até PEDIDOS_LOTE_MAXIMO pedidos, esperando no
+máximo PEDIDOS_LOTE_ESPERA segundos pelos seguintes, e grava todos em uma
+transação com um só commit. Em vez de cada requisição disputar a trava de
+escrita e pagar o próprio fsync, o custo é dividido pelo lote.
+
+Cada pedido do lote roda em um SAVEPOINT: um pedido inválido falha sozinho
+sem derrubar os outros. A requisição espera o futuro do seu pedido, então a
+resposta 201 só sai depois do commit — nada é confirmado ao cliente antes de
+estar no banco. Com a fila cheia, o pedido é recusado na hora
+(FilaPedidosCheiaError, 503).
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+from flask import current_app, jsonify
+from app.models.db import conectar, pragmas_da_config
+from app.repositories.pedido_repository import PedidoRepository
+
+CONFIG_PADRAO = {
+    'PEDIDOS_GRAVACAO': 'direta',  # direta | fila
+    # Pedidos gravados por transação
+    'PEDIDOS_LOTE_MAXIMO': 64,
+    # Segundos que o gravador espera por mais pedidos antes de gravar o lote
+    'PEDIDOS_LOTE_ESPERA': 0.002,
+    # Pedidos aguardando gravação; acima disso, recusa
+    'PEDIDOS_FILA_MAXIMA': 2000,
+    # Segundos que uma requisição espera o commit do seu pedido
+    'PEDIDOS_FILA_TIMEOUT': 10.0,
+}
+
+
+class FilaPedidosCheiaError(Exception):
+    """Fila de gravação cheia: o pedido foi recusado sem ser enfileirado"""
+
+
+class FilaPedidosAtrasadaError(FilaPedidosCheiaError):
+    """O pedido esperou mais que o timeout e saiu da fila sem ser gravado"""
+
+
+def resposta_fila_cheia():
+    """Resposta 503 das rotas quando a fila de gravação recusa o pedido"""
+    resposta = jsonify({'erro': 'Muitos pedidos no momento, tente novamente em instantes'})
+    resposta.headers['Retry-After'] = '1'
+    return resposta, 503
+
+
+class GravadorPedidos:
+    """Fila de pedidos drenada por uma thread que grava em lotes"""
+
+    def __init__(self, db_path, tamanho_lote=64, espera_maxima=0.002,
+                 tamanho_fila=2000, timeout=10.0, pragmas=()):
+        self.db_path = db_path
+        self.tamanho_lote = tamanho_lote
+        self.espera_maxima = espera_maxima
+        self.timeout = timeout
+        self.pragmas = pragmas
+        self._fila = queue.Queue(maxsize=tamanho_fila)
+        self._parar = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.lotes = 0
+        self.gravados = 0
+        self.falhas = 0
+        self.recusados = 0
+        self.expirados = 0
+        self.maior_lote = 0
+
+    def iniciar(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._parar.clear()
+                self._thread = threading.Thread(
+                    target=self._executar, name='gravador-pedidos', daemon=True)
+                self._thread.start()
+
+    def parar(self):
+        """Grava o que já está na fila e encerra a thread"""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def enviar(self, pedido, itens):
+        """Enfileira o pedido; o futuro resolve com o pedido gravado (com id)"""
+        self.iniciar()
+        futuro = Future()
+        try:
+            self._fila.put_nowait((pedido, itens, futuro))
+        except queue.Full:
+            with self._lock:
+                self.recusados += 1
+            raise FilaPedidosCheiaError("Fila de gravação de pedidos cheia")
+        return futuro
+
+    def gravar(self, pedido, itens):
+        """Enfileira e espera o commit; retorna o pedido com id"""
+        futuro = self.enviar(pedido, itens)
+        try:
+            return futuro.result(timeout=self.timeout)
+        except FuturesTimeoutError:
+            if futuro.cancel():
+                # Ainda na fila: o gravador vai descartá-lo, nada foi gravado
+                with self._lock:
+                    self.expirados += 1
+                raise FilaPedidosAtrasadaError("Pedido não foi gravado dentro do timeout")
+            # Já está em um lote: o resultado (commit ou erro) sai com ele
+            return futuro.result()
+
+    def _proximo_lote(self):
+        try:
+            lote = [self._fila.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+
+        limite = time.monotonic() + self.espera_maxima
+        while len(lote) < self.tamanho_lote:
+            restante = limite - time.monotonic()
+            try:
+                if restante > 0:
+                    lote.append(self._fila.get(timeout=restante))
+                else:
+                    lote.append(self._fila.get_nowait())
+            except queue.Empty:
+                break
+        return lote
+
+    def _executar(self):
+        conn = conectar(self.db_path, self.pragmas)
+        try:
+            while not (self._parar.is_set() and self._fila.empty()):
+                lote = self._proximo_lote()
+                if lote:
+                    self._gravar(conn, lote)
+        finally:
+            conn.close()
+
+    def _gravar(self, conn, lote):
+        # Marca os pedidos como em execução (não podem mais ser cancelados) e
+        # descarta os que a requisição desistiu de esperar
+        lote = [entrada for entrada in lote if entrada[2].set_running_or_notify_cancel()]
+        if not lote:
+            return
+
+        cursor = conn.cursor()
+        gravados = []
+        falhas = 0
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for pedido, itens, futuro in lote:
+                cursor.execute("SAVEPOINT pedido")
+                try:
+                    PedidoRepository.inserir_com_itens(cursor, pedido, itens)
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO pedido")
+                    cursor.execute("RELEASE pedido")
+                    futuro.set_exception(e)
+                    falhas += 1
+                    continue
+                cursor.execute("RELEASE pedido")
+                gravados.append((pedido, futuro))
+            conn.commit()
+        except Exception as e:
+            # Falha do lote inteiro (trava, disco): ninguém foi gravado
+            if conn.in_transaction:
+                conn.rollback()
+            for _, _, futuro in lote:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            with self._lock:
+                self.lotes += 1
+                self.falhas += len(lote)
+            return
+
+        for pedido, futuro in gravados:
+            futuro.set_result(pedido)
+        with self._lock:
+            self.lotes += 1
+            self.gravados += len(gravados)
+            self.falhas += falhas
+            self.maior_lote = max(self.maior_lote, len(lote))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'lote_maximo': self.tamanho_lote,
+                'espera_maxima': self.espera_maxima,
+                'na_fila': self._fila.qsize(),
+                'lotes': self.lotes,
+                'gravados': self.gravados,
+                'falhas': self.falhas,
+                'recusados': self.recusados,
+                'expirados': self.expirados,
+                'maior_lote': self.maior_lote,
+                'media_por_lote': round(self.gravados / self.lotes, 2) if self.lotes else 0.0
+            }
+
+
+def obter_gravador_pedidos():
+    """Retorna o gravador em lote da aplicação atual, criando-o se preciso"""
+    gravador = current_app.extensions.get('gravador_pedidos')
+    if gravador is None:
+        config = current_app.config
+        gravador = GravadorPedidos(
+            config['DB_PATH'],
+            config['PEDIDOS_LOTE_MAXIMO'],
+            config['PEDIDOS_LOTE_ESPERA'],
+            config['PEDIDOS_FILA_MAXIMA'],
+            config['PEDIDOS_FILA_TIMEOUT'],
+            pragmas_da_config(config))
+        gravador = current_app.extensions.setdefault('gravador_pedidos', gravador)
+    return gravador
@@ -2,12 +2,48 @@ from app.models.pedido import Pedido, ItemPedido, StatusPedido
 from app.repositories.pedido_repository import PedidoRepository, ItemPedidoRepository
 from app.repositories.usuario_repository import UsuarioRepository
 from app.repositories.produto_repository import ProdutoRepository
-from datetime import datetime
+from app.utils.paginacao import codificar_cursor, normalizar_limite
+from app.service.eventos_pedidos import obter_hub_pedidos
+from app.service.fila_cozinha import STATUS_ATIVOS, obter_fila_cozinha
+from app.service.gravador_pedidos import FilaPedidosCheiaError, obter_gravador_pedidos
+from flask import current_app
+from datetime import datetime, timedelta
+import csv
+import io
+import json
+
+
+class ConflitoStatusError(Exception):
+    """O status do pedido mudou entre a leitura e a transição pedida"""
+
+    def __init__(self, pedido):
+        super().__init__("O status do pedido foi alterado por outra requisição")
+        self.pedido = pedido
+
+
+class PedidoNaoEncontradoError(ValueError):
+    """O pedido não existe (ou foi removido durante a operação)"""
+
+    def __init__(self):
+        super().__init__("Pedido não encontrado")
 
 
 class PedidoService:
     """Serviço de lógica de negócio para pedidos"""
 
+    FORMATOS_EXPORTACAO = ('ndjson', 'csv')
+    # Pedidos acumulados antes de enviar um bloco da exportação
+    PEDIDOS_POR_BLOCO_EXPORTACAO = 200
+    # Cabeçalho do CSV de exportação (uma linha por item do pedido)
+    COLUNAS_EXPORTACAO_CSV = [
+        'pedido_id', 'usuario_id', 'status', 'total', 'observacoes',
+        'criado_em', 'atualizado_em', 'item_id', 'produto_id', 'produto_nome',
+        'quantidade', 'preco_unitario', 'total_item'
+    ]
+
+    # Campos aceitos no parâmetro `fields` das listagens ('itens' anexa os itens)
+    CAMPOS_LISTAGEM = list(PedidoRepository.CAMPOS_PROJECAO) + ['itens']
+
     @staticmethod
     def criar_pedido(dados, itens_carrinho):
         """Cria um novo pedido com seus itens"""
@@ -17,12 +53,16 @@ class PedidoService:
             if not usuario:
                 raise ValueError("Usuário não encontrado")
 
+            # Resolver todos os produtos do carrinho em uma única consulta
+            produtos = ProdutoRepository.buscar_por_ids(
+                [item_cart['produto_id'] for item_cart in itens_carrinho])
+
             # Calcular total
             total = 0.0
             itens_validos = []
 
             for item_cart in itens_carrinho:
-                produto = ProdutoRepository.buscar_por_id(item_cart['produto_id'])
+                produto = produtos.get(item_cart['produto_id'])
                 if not produto:
                     raise ValueError(f"Produto {item_cart['produto_id']} não encontrado")
 
@@ -33,11 +73,11 @@ class PedidoService:
                 quantidade = item_cart['quantidade']
                 total += preco_unitario * quantidade
 
-                itens_validos.append({
-                    'produto_id': produto.id,
-                    'quantidade': quantidade,
-                    'preco_unitario': preco_unitario
-                })
+                itens_validos.append(ItemPedido(
+                    produto_id=produto.id,
+                    quantidade=quantidade,
+                    preco_unitario=preco_unitario
+                ))
 
             # Criar pedido
             pedido = Pedido(
@@ -48,21 +88,34 @@ class PedidoService:
             )
 
             pedido.validar()
-            pedido_criado = PedidoRepository.criar(pedido)
 
-            # Criar itens do pedido
-            for item_data in itens_validos:
-                item_pedido = ItemPedido(
-                    pedido_id=pedido_criado.id,
-                    produto_id=item_data['produto_id'],
-                    quantidade=item_data['quantidade'],
-                    preco_unitario=item_data['preco_unitario']
-                )
-                item_pedido.validar()
-                ItemPedidoRepository.criar(item_pedido)
+            # Pedido e itens são gravados juntos, com um único commit; no modo
+            # fila, o commit é compartilhado com os outros pedidos do lote
+            if current_app.config.get('PEDIDOS_GRAVACAO') == 'fila':
+                pedido_criado = obter_gravador_pedidos().gravar(pedido, itens_validos)
+            else:
+                pedido_criado = PedidoRepository.criar_com_itens(pedido, itens_validos)
+            pedido_dict = pedido_criado.to_dict()
+
+            obter_fila_cozinha().registrar(pedido_dict, [
+                {'produto_id': item.produto_id, 'nome': produtos[item.produto_id].nome,
+                 'quantidade': item.quantidade}
+                for item in itens_validos])
+            # O evento leva os itens no formato da listagem, para quem assina
+            # o stream montar o pedido sem buscá-lo de novo
+            itens_evento = []
+            for item in itens_validos:
+                produto = produtos[item.produto_id]
+                item_dict = item.to_dict()
+                item_dict['produto'] = {'id': produto.id, 'nome': produto.nome,
+                                        'imagem': produto.imagem, 'categoria': produto.categoria}
+                itens_evento.append(item_dict)
+            obter_hub_pedidos().publicar('pedido_criado', dict(pedido_dict, itens=itens_evento))
 
-            return pedido_criado.to_dict()
+            return pedido_dict
 
+        except FilaPedidosCheiaError:
+            raise
         except ValueError as e:
             raise ValueError(f"Erro de validação: {str(e)}")
         except Exception as e:
@@ -87,102 +140,190 @@ class PedidoService:
             raise Exception(f"Erro ao buscar pedido: {str(e)}")
 
     @staticmethod
-    def listar_pedidos_usuario(usuario_id, status=None):
-        """Lista pedidos de um usuário"""
-        try:
-            pedidos = PedidoRepository.buscar_por_usuario(usuario_id, status)
-            pedidos_com_itens = []
+    def _anexar_itens(pedidos):
+        """Converte pedidos em dicionários com itens, carregados em uma única consulta"""
+        itens_por_pedido = ItemPedidoRepository.buscar_por_pedidos(
+            [pedido.id for pedido in pedidos])
 
+        pedidos_com_itens = []
+        for pedido in pedidos:
+            pedido_dict = pedido.to_dict()
+            pedido_dict['itens'] = itens_por_pedido[pedido.id]
+            pedidos_com_itens.append(pedido_dict)
+
+        return pedidos_com_itens
+
+    @staticmethod
+    def _pagina(pedidos, limit):
+        """Monta a resposta paginada a partir de até limit + 1 pedidos"""
+        tem_mais = len(pedidos) > limit
+        pedidos = pedidos[:limit]
+
+        next_cursor = None
+        if tem_mais:
+            ultimo = pedidos[-1]
+            next_cursor = codificar_cursor(ultimo.criado_em, ultimo.id)
+
+        pedidos_com_itens = PedidoService._anexar_itens(pedidos)
+        return {
+            'pedidos': pedidos_com_itens,
+            'total': len(pedidos_com_itens),
+            'next_cursor': next_cursor
+        }
+
+    @staticmethod
+    def _pagina_projetada(campos, limit, **filtros):
+        """Como _pagina, mas com dicionários lidos direto do banco só com `campos`"""
+        colunas = [campo for campo in campos if campo != 'itens']
+        # id e criado_em formam o cursor (e o id liga os itens), mesmo se não pedidos
+        extras = [campo for campo in ('id', 'criado_em') if campo not in colunas]
+
+        pedidos = PedidoRepository.listar_projetado(
+            colunas + extras, limit=limit + 1, **filtros)
+        tem_mais = len(pedidos) > limit
+        pedidos = pedidos[:limit]
+
+        next_cursor = None
+        if tem_mais:
+            ultimo = pedidos[-1]
+            next_cursor = codificar_cursor(ultimo['criado_em'], ultimo['id'])
+
+        if 'itens' in campos:
+            itens_por_pedido = ItemPedidoRepository.buscar_por_pedidos(
+                [pedido['id'] for pedido in pedidos])
             for pedido in pedidos:
-                itens = ItemPedidoRepository.buscar_por_pedido(pedido.id)
-                pedido_dict = pedido.to_dict()
-                pedido_dict['itens'] = itens
-                pedidos_com_itens.append(pedido_dict)
-
-            return {
-                'pedidos': pedidos_com_itens,
-                'total': len(pedidos_com_itens)
-            }
+                pedido['itens'] = itens_por_pedido[pedido['id']]
+
+        for pedido in pedidos:
+            for campo in extras:
+                del pedido[campo]
+
+        return {
+            'pedidos': pedidos,
+            'total': len(pedidos),
+            'next_cursor': next_cursor
+        }
+
+    @staticmethod
+    def listar_pedidos_usuario(usuario_id, status=None, limit=None, cursor=None,
+                               campos=None):
+        """Lista pedidos de um usuário (paginado por cursor)"""
+        try:
+            limit = normalizar_limite(limit)
+            if campos:
+                return PedidoService._pagina_projetada(
+                    campos, limit, usuario_id=usuario_id, status=status,
+                    cursor=cursor)
+            # Um pedido a mais indica se existe próxima página
+            pedidos = PedidoRepository.buscar_por_usuario(
+                usuario_id, status, limit + 1, cursor)
+            return PedidoService._pagina(pedidos, limit)
         except Exception as e:
             raise Exception(f"Erro ao listar pedidos: {str(e)}")
 
     @staticmethod
-    def listar_todos_pedidos(status=None, limit=50, offset=0):
-        """Lista todos os pedidos (para admin/attendant)"""
+    def listar_todos_pedidos(status=None, limit=50, offset=0, cursor=None,
+                             campos=None):
+        """Lista todos os pedidos (para admin/attendant), paginado por cursor"""
         try:
-            pedidos = PedidoRepository.listar_todos(status, limit, offset)
-            pedidos_com_itens = []
-
-            for pedido in pedidos:
-                itens = ItemPedidoRepository.buscar_por_pedido(pedido.id)
-                pedido_dict = pedido.to_dict()
-                pedido_dict['itens'] = itens
-                pedidos_com_itens.append(pedido_dict)
-
-            return {
-                'pedidos': pedidos_com_itens,
-                'total': len(pedidos_com_itens)
-            }
+            limit = normalizar_limite(limit)
+            if campos:
+                return PedidoService._pagina_projetada(
+                    campos, limit, status=status, offset=offset, cursor=cursor)
+            pedidos = PedidoRepository.listar_todos(
+                status, limit + 1, offset, cursor)
+            return PedidoService._pagina(pedidos, limit)
         except Exception as e:
             raise Exception(f"Erro ao listar pedidos: {str(e)}")
 
     @staticmethod
-    def atualizar_status_pedido(pedido_id, novo_status, usuario_atual):
-        """Atualiza o status de um pedido"""
+    def atualizar_status_pedido(pedido_id, novo_status, usuario_atual, status_atual=None):
+        """Atualiza o status de um pedido.
+
+        `status_atual` é o status que o cliente viu; com ele a transição é
+        validada sem ler o pedido. Sem ele, o status é lido do banco. Em
+        ambos os casos a gravação só acontece se o pedido ainda estiver nesse
+        status; se outra requisição mudou antes, levanta ConflitoStatusError
+        com o pedido atual.
+        """
         try:
             # Verificar se o status é válido
             if novo_status not in [s.value for s in StatusPedido]:
                 raise ValueError(f"Status inválido: {novo_status}")
 
-            # Buscar pedido atual
-            pedido_atual = PedidoRepository.buscar_por_id(pedido_id)
-            if not pedido_atual:
-                raise ValueError("Pedido não encontrado")
+            if status_atual is None:
+                pedido_atual = PedidoRepository.buscar_por_id(pedido_id)
+                if not pedido_atual:
+                    raise PedidoNaoEncontradoError()
+                status_atual = pedido_atual.status
+            elif status_atual not in [s.value for s in StatusPedido]:
+                raise ValueError(f"Status inválido: {status_atual}")
+
+            PedidoService._validar_transicao(status_atual, novo_status, usuario_atual)
+
+            # Compare-and-swap: só grava se ninguém mudou o status nesse meio tempo
+            pedido_atualizado = PedidoRepository.atualizar_status_se(
+                pedido_id, status_atual, novo_status)
+            if pedido_atualizado is None:
+                pedido_atual = PedidoRepository.buscar_por_id(pedido_id)
+                if not pedido_atual:
+                    raise PedidoNaoEncontradoError()
+                raise ConflitoStatusError(pedido_atual.to_dict())
 
-            # Regras de transição de status
-            # Managers podem finalizar ou cancelar pedidos de qualquer status
-            if hasattr(usuario_atual, 'role') and usuario_atual.role == 'manager':
-                # Managers têm permissões especiais
-                if novo_status not in [StatusPedido.FINALIZADO.value, StatusPedido.CANCELADO.value]:
-                    raise ValueError("Managers podem apenas finalizar ou cancelar pedidos")
-                # Managers podem fazer essas transições de qualquer status (exceto já finalizados/cancelados)
-                if pedido_atual.status in [StatusPedido.FINALIZADO.value, StatusPedido.CANCELADO.value]:
-                    raise ValueError("Não é possível alterar pedidos já finalizados ou cancelados")
-            else:
-                # Regras normais para attendants
-                transicoes_permitidas = {
-                    StatusPedido.EM_ANDAMENTO.value: [StatusPedido.PREPARANDO.value, StatusPedido.CANCELADO.value],
-                    StatusPedido.PREPARANDO.value: [StatusPedido.PRONTO.value, StatusPedido.CANCELADO.value],
-                    StatusPedido.PRONTO.value: [StatusPedido.FINALIZADO.value],
-                    StatusPedido.FINALIZADO.value: [],  # Status final
-                    StatusPedido.CANCELADO.value: []   # Status final
-                }
-
-                if novo_status not in transicoes_permitidas.get(pedido_atual.status, []):
-                    if pedido_atual.status != novo_status:  # Permitir manter o mesmo status
-                        raise ValueError(f"Transição de '{pedido_atual.status}' para '{novo_status}' não permitida")
-
-            pedido_atualizado = PedidoRepository.atualizar(pedido_id, status=novo_status)
             pedido_dict = pedido_atualizado.to_dict()
 
             # Incluir itens com dados do produto
             itens = ItemPedidoRepository.buscar_por_pedido(pedido_id)
             pedido_dict['itens'] = itens
 
+            obter_fila_cozinha().registrar(pedido_dict, [
+                {'produto_id': item['produto_id'], 'nome': item['produto']['nome'],
+                 'quantidade': item['quantidade']}
+                for item in itens])
+            obter_hub_pedidos().publicar('status_atualizado', pedido_dict,
+                                         status_anterior=status_atual)
+
             return pedido_dict
 
+        except (ConflitoStatusError, PedidoNaoEncontradoError):
+            raise
         except ValueError as e:
             raise ValueError(f"Erro de validação: {str(e)}")
         except Exception as e:
             raise Exception(f"Erro ao atualizar pedido: {str(e)}")
 
+    @staticmethod
+    def _validar_transicao(status_atual, novo_status, usuario_atual):
+        """Regras de transição de status; levanta ValueError se não permitida"""
+        # Managers podem finalizar ou cancelar pedidos de qualquer status
+        if hasattr(usuario_atual, 'role') and usuario_atual.role == 'manager':
+            # Managers têm permissões especiais
+            if novo_status not in [StatusPedido.FINALIZADO.value, StatusPedido.CANCELADO.value]:
+                raise ValueError("Managers podem apenas finalizar ou cancelar pedidos")
+            # Managers podem fazer essas transições de qualquer status (exceto já finalizados/cancelados)
+            if status_atual in [StatusPedido.FINALIZADO.value, StatusPedido.CANCELADO.value]:
+                raise ValueError("Não é possível alterar pedidos já finalizados ou cancelados")
+        else:
+            # Regras normais para attendants
+            transicoes_permitidas = {
+                StatusPedido.EM_ANDAMENTO.value: [StatusPedido.PREPARANDO.value, StatusPedido.CANCELADO.value],
+                StatusPedido.PREPARANDO.value: [StatusPedido.PRONTO.value, StatusPedido.CANCELADO.value],
+                StatusPedido.PRONTO.value: [StatusPedido.FINALIZADO.value],
+                StatusPedido.FINALIZADO.value: [],  # Status final
+                StatusPedido.CANCELADO.value: []   # Status final
+            }
+
+            if novo_status not in transicoes_permitidas.get(status_atual, []):
+                if status_atual != novo_status:  # Permitir manter o mesmo status
+                    raise ValueError(f"Transição de '{status_atual}' para '{novo_status}' não permitida")
+
     @staticmethod
     def cancelar_pedido(pedido_id, usuario_id):
         """Cancela um pedido (apenas pelo próprio usuário ou admin)"""
         try:
             pedido = PedidoRepository.buscar_por_id(pedido_id)
             if not pedido:
-                raise ValueError("Pedido não encontrado")
+                raise PedidoNaoEncontradoError()
 
             # Verificar se o usuário pode cancelar
             usuario = UsuarioRepository.buscar_por_id(usuario_id)
@@ -197,18 +338,105 @@ class PedidoService:
             if pedido.status not in [StatusPedido.EM_ANDAMENTO.value, StatusPedido.PREPARANDO.value]:
                 raise ValueError("Este pedido não pode mais ser cancelado")
 
-            return PedidoService.atualizar_status_pedido(pedido_id, StatusPedido.CANCELADO.value, usuario)
+            return PedidoService.atualizar_status_pedido(
+                pedido_id, StatusPedido.CANCELADO.value, usuario, status_atual=pedido.status)
 
+        except (ConflitoStatusError, PedidoNaoEncontradoError):
+            raise
         except ValueError as e:
             raise ValueError(f"Erro de validação: {str(e)}")
         except Exception as e:
             raise Exception(f"Erro ao cancelar pedido: {str(e)}")
 
     @staticmethod
-    def obter_estatisticas():
-        """Obtém estatísticas dos pedidos"""
+    def exportar_pedidos(formato='ndjson', status=None, desde=None, ate=None,
+                         dumps=json.dumps):
+        """Exportação dos pedidos com itens, como um gerador de blocos de texto.
+
+        `formato` é 'ndjson' (um pedido por linha) ou 'csv' (uma linha por
+        item). `desde` e `ate` são datas (inclusive). Nada é lido do banco
+        até o gerador ser consumido; cada bloco reúne até
+        PEDIDOS_POR_BLOCO_EXPORTACAO pedidos.
+        """
+        if formato not in PedidoService.FORMATOS_EXPORTACAO:
+            raise ValueError(f"Formato inválido: {formato}")
+
+        pedidos = PedidoRepository.exportar(
+            status,
+            desde.isoformat() if desde else None,
+            (ate + timedelta(days=1)).isoformat() if ate else None)
+
+        if formato == 'csv':
+            linhas = PedidoService._linhas_csv(pedidos)
+        else:
+            linhas = (dumps(pedido) + "\n" for pedido in pedidos)
+
+        return PedidoService._em_blocos(linhas)
+
+    @staticmethod
+    def _em_blocos(linhas):
+        """Agrupa as linhas da exportação em blocos de texto"""
+        bloco = []
+        for linha in linhas:
+            bloco.append(linha)
+            if len(bloco) >= PedidoService.PEDIDOS_POR_BLOCO_EXPORTACAO:
+                yield "".join(bloco)
+                bloco = []
+        if bloco:
+            yield "".join(bloco)
+
+    @staticmethod
+    def _linhas_csv(pedidos):
+        """Converte cada pedido nas suas linhas de CSV (cabeçalho primeiro)"""
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+
+        def consumir():
+            texto = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return texto
+
+        escritor.writerow(PedidoService.COLUNAS_EXPORTACAO_CSV)
+        yield consumir()
+
+        for pedido in pedidos:
+            colunas_pedido = [pedido['id'], pedido['usuario_id'], pedido['status'],
+                              pedido['total'], pedido['observacoes'],
+                              pedido['criado_em'], pedido['atualizado_em']]
+            if not pedido['itens']:
+                escritor.writerow(colunas_pedido + [None] * 6)
+            for item in pedido['itens']:
+                escritor.writerow(colunas_pedido + [
+                    item['id'], item['produto_id'], item['produto']['nome'],
+                    item['quantidade'], item['preco_unitario'], item['total_item']])
+            yield consumir()
+
+    @staticmethod
+    def fila_cozinha(status=None):
+        """Pedidos ativos por status em ordem de chegada e itens a preparar"""
+        try:
+            if status is not None and status not in STATUS_ATIVOS:
+                raise ValueError(f"Status fora da fila da cozinha: {status}")
+            return obter_fila_cozinha().listar(status)
+        except ValueError as e:
+            raise ValueError(f"Erro de validação: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Erro ao obter fila da cozinha: {str(e)}")
+
+    @staticmethod
+    def obter_estatisticas(dias=None):
+        """Obtém estatísticas dos pedidos, opcionalmente com os últimos `dias` dias"""
         try:
-            return PedidoRepository.obter_estatisticas()
+            estatisticas = PedidoRepository.obter_estatisticas()
+
+            if dias:
+                # criado_em é gravado em UTC (CURRENT_TIMESTAMP)
+                desde = (datetime.utcnow().date() - timedelta(days=dias - 1)).isoformat()
+                estatisticas['pedidos_por_dia'] = \
+                    PedidoRepository.obter_estatisticas_diarias(desde)
+
+            return estatisticas
         except Exception as e:
             raise Exception(f"Erro ao obter estatísticas: {str(e)}")
 
@@ -218,10 +446,14 @@ class PedidoService:
         try:
             if permanente:
                 PedidoRepository.deletar_permanentemente(pedido_id)
+                obter_fila_cozinha().remover(pedido_id)
                 return {"mensagem": "Pedido removido permanentemente"}
             else:
                 pedido_atualizado = PedidoRepository.deletar(pedido_id)
-                return {"mensagem": "Pedido cancelado", "pedido": pedido_atualizado.to_dict()}
+                pedido_dict = pedido_atualizado.to_dict()
+                obter_fila_cozinha().registrar(pedido_dict)
+                obter_hub_pedidos().publicar('status_atualizado', pedido_dict)
+                return {"mensagem": "Pedido cancelado", "pedido": pedido_dict}
         except ValueError as e:
             raise ValueError(str(e))
         except Exception as e:
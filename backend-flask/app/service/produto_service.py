@@ -9,6 +9,9 @@ import uuid
 class ProdutoService:
     """Serviço de lógica de negócio para produtos"""
 
+    # Campos aceitos no parâmetro `fields` da listagem
+    CAMPOS_LISTAGEM = list(ProdutoRepository.CAMPOS_PROJECAO)
+
     @staticmethod
     def criar_produto(dados):
         """Cria um novo produto com validações de negócio"""
@@ -62,21 +65,39 @@ class ProdutoService:
             raise Exception(f"Erro ao buscar produto: {str(e)}")
 
     @staticmethod
-    def listar_produtos(disponiveis_apenas=False, categoria=None, busca=None):
-        """Lista produtos com filtros opcionais"""
+    def listar_produtos(disponiveis_apenas=False, categoria=None, busca=None,
+                        campos=None):
+        """Lista produtos com filtros opcionais.
+
+        Com `campos`, cada produto traz só esses campos; sem busca textual as
+        linhas vêm direto do banco (ProdutoRepository.listar_projetado).
+        """
         try:
+            if campos and not busca:
+                produtos = ProdutoRepository.listar_projetado(
+                    campos, disponiveis_apenas, categoria)
+                return {
+                    'produtos': produtos,
+                    'total': len(produtos)
+                }
+
             if categoria:
                 # Buscar por categoria específica
                 produtos = ProdutoRepository.buscar_por_categoria(categoria)
             elif busca:
-                # Buscar por termo
-                produtos = ProdutoRepository.buscar_por_nome_parcial(busca)
+                # Busca textual em nome e descrição, por relevância
+                produtos = ProdutoRepository.buscar_por_texto(busca)
             else:
                 # Listar todos
                 produtos = ProdutoRepository.listar_todos(disponiveis_apenas)
 
+            produtos_dict = [produto.to_dict() for produto in produtos]
+            if campos:
+                produtos_dict = [{campo: produto[campo] for campo in campos}
+                                 for produto in produtos_dict]
+
             return {
-                'produtos': [produto.to_dict() for produto in produtos],
+                'produtos': produtos_dict,
                 'total': len(produtos)
             }
         except Exception as e:
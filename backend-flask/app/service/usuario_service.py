@@ -1,9 +1,13 @@
 from app.models.usuario import Usuario
 from app.repositories.usuario_repository import UsuarioRepository
+from app.utils.senhas import SobrecargaSenhasError, obter_hasher
 
 class UsuarioService:
     """Serviço de lógica de negócio para usuários"""
 
+    # Campos aceitos no parâmetro `fields` da listagem
+    CAMPOS_LISTAGEM = list(UsuarioRepository.CAMPOS_PROJECAO)
+
     @staticmethod
     def criar_usuario(dados):
         """Cria um novo usuário com validações de negócio"""
@@ -26,8 +30,8 @@ class UsuarioService:
             if usuario_existente:
                 raise ValueError("Email já cadastrado")
 
-            # Em produção, aqui seria feito o hash da senha
-            # usuario.senha = hash_senha(usuario.senha)
+            # Guardar apenas o hash da senha (calculado no pool de hash)
+            usuario.senha = obter_hasher().hash(usuario.senha)
 
             # Salvar no banco
             usuario_criado = UsuarioRepository.criar(usuario)
@@ -43,6 +47,8 @@ class UsuarioService:
                 'criado_em': usuario_criado.criado_em.isoformat() if usuario_criado.criado_em else None
             }
 
+        except SobrecargaSenhasError:
+            raise
         except ValueError as e:
             raise ValueError(f"Erro de validação: {str(e)}")
         except Exception as e:
@@ -73,9 +79,16 @@ class UsuarioService:
             raise Exception(f"Erro ao buscar usuário por email: {str(e)}")
 
     @staticmethod
-    def listar_usuarios():
-        """Lista todos os usuários"""
+    def listar_usuarios(campos=None):
+        """Lista todos os usuários (só com `campos`, se informados)"""
         try:
+            if campos:
+                usuarios = UsuarioRepository.listar_projetado(campos)
+                return {
+                    'usuarios': usuarios,
+                    'total': len(usuarios)
+                }
+
             usuarios = UsuarioRepository.listar_todos()
             return {
                 'usuarios': [usuario.to_dict() for usuario in usuarios],
@@ -149,6 +162,19 @@ class UsuarioService:
         except Exception as e:
             raise Exception(f"Erro ao obter estatísticas: {str(e)}")
 
+    @staticmethod
+    def _conferir_senha(usuario, senha):
+        """Confere a senha no pool de hash e refaz o hash se os parâmetros mudaram.
+
+        Senhas antigas em texto puro também conferem e são convertidas aqui.
+        """
+        hasher = obter_hasher()
+        confere, precisa_rehash = hasher.verificar(senha, usuario.senha)
+        if confere and precisa_rehash:
+            UsuarioRepository.atualizar_senha(
+                usuario.id, hasher.hash(senha), usuario.senha)
+        return confere
+
     @staticmethod
     def validar_credenciais(email, senha, role=None):
         """Valida credenciais para login"""
@@ -157,12 +183,7 @@ class UsuarioService:
             if not usuario:
                 return None
 
-            # Em produção, comparar hash da senha
-            # if not verificar_senha(senha, usuario.senha):
-            #     return None
-
-            # Por enquanto, comparação simples (NÃO FAZER ISSO EM PRODUÇÃO)
-            if usuario.senha != senha:
+            if not UsuarioService._conferir_senha(usuario, senha):
                 return None
 
             # Validar role se especificado
@@ -170,6 +191,8 @@ class UsuarioService:
                 return None
 
             return usuario.to_dict()
+        except SobrecargaSenhasError:
+            raise
         except Exception as e:
             raise Exception(f"Erro ao validar credenciais: {str(e)}")
 
@@ -182,7 +205,7 @@ class UsuarioService:
                 return None
 
             # Verificar senha
-            if usuario.senha != senha:
+            if not UsuarioService._conferir_senha(usuario, senha):
                 return None
 
             # Verificar se o role do usuário corresponde ao esperado
@@ -190,5 +213,7 @@ class UsuarioService:
                 return None
 
             return usuario.to_dict()
+        except SobrecargaSenhasError:
+            raise
         except Exception as e:
             raise Exception(f"Erro ao validar credenciais por role: {str(e)}")
@@ -0,0 +1,28 @@
+from functools import wraps
+from flask import request, make_response
+from app.repositories.catalogo_cache import obter_catalogo_cache
+
+
+def etag_catalogo(f):
+    """Decorator de GET condicional para rotas que só dependem do catálogo.
+
+    O ETag vem da geração do catálogo (produtos e categorias). Se o cliente
+    enviar If-None-Match com o ETag atual, responde 304 sem executar a rota.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        etag = f"catalogo-{obter_catalogo_cache().versao()}"
+
+        if request.if_none_match.contains(etag):
+            resposta = make_response('', 304)
+            resposta.set_etag(etag)
+            resposta.headers['Cache-Control'] = 'no-cache'
+            return resposta
+
+        resposta = make_response(f(*args, **kwargs))
+        if resposta.status_code == 200:
+            resposta.set_etag(etag)
+            resposta.headers['Cache-Control'] = 'no-cache'
+        return resposta
+
+    return decorated_function
@@ -0,0 +1,201 @@
+"""Chaves de idempotência para rotas de criação (Idempotency-Key).
+
+O cliente envia o mesmo cabeçalho Idempotency-Key em todas as tentativas de
+uma mesma operação. A primeira tentativa reserva a chave na tabela
+chaves_idempotencia e, se der certo (2xx), grava a resposta; as seguintes
+devolvem essa resposta direto, sem chamar a rota — nada de validar o carrinho
+de novo nem tocar em produtos.
+
+- Chave ainda reservada (a primeira tentativa não terminou): 409 com Retry-After.
+- Mesma chave com outro corpo: 422, a chave não pode ser reaproveitada.
+- Resposta de erro: a reserva é desfeita e a próxima tentativa roda de novo.
+- Falha ao gravar a resposta (banco travado) depois que a rota já gravou o
+  pedido: o cliente recebe a resposta 2xx real e a chave continua reservada
+  (409 nas repetições até IDEMPOTENCIA_RESERVA), nunca liberada para criar
+  outro pedido.
+
+Com PEDIDOS_GRAVACAO=fila, um 503 da fila só sai quando o pedido certamente
+não foi gravado (ver gravador_pedidos), então liberar a chave nesse caso é
+seguro.
+
+As chaves valem por usuário e expiram em IDEMPOTENCIA_TTL segundos; reservas
+abandonadas (processo caiu no meio) expiram em IDEMPOTENCIA_RESERVA.
+"""
+
+import hashlib
+import time
+from functools import wraps
+from flask import current_app, request, jsonify
+from app.models.db import get_connection
+
+CABECALHO = 'Idempotency-Key'
+TAMANHO_MAXIMO_CHAVE = 255
+
+CONFIG_PADRAO = {
+    # Segundos que uma resposta gravada continua sendo repetida
+    'IDEMPOTENCIA_TTL': 24 * 60 * 60.0,
+    # Segundos que uma chave fica reservada enquanto a requisição roda
+    'IDEMPOTENCIA_RESERVA': 60.0,
+}
+
+# Segundos entre podas das chaves expiradas
+INTERVALO_LIMPEZA = 60.0
+
+# Tentativas de gravar a resposta e espera (segundos) entre elas
+TENTATIVAS_CONCLUIR = 3
+ESPERA_CONCLUIR = 0.05
+
+
+def _buscar(cursor, usuario_id, chave, agora):
+    cursor.execute("""
+        SELECT hash_corpo, status_http, resposta FROM chaves_idempotencia
+        WHERE usuario_id = ? AND chave = ? AND expira_em > ?
+    """, (usuario_id, chave, agora))
+    return cursor.fetchone()
+
+
+def reservar(usuario_id, chave, hash_corpo):
+    """Reserva a chave para esta requisição.
+
+    Retorna None se a reserva foi feita (a rota deve rodar) ou a linha já
+    existente (hash_corpo, status_http, resposta).
+    """
+    agora = time.time()
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        # Caminho das repetições: uma leitura, sem trava de escrita
+        existente = _buscar(cursor, usuario_id, chave, agora)
+        if existente is not None:
+            return existente
+
+        cursor.execute("BEGIN IMMEDIATE")
+        existente = _buscar(cursor, usuario_id, chave, agora)
+        if existente is None:
+            cursor.execute("""
+                INSERT INTO chaves_idempotencia (usuario_id, chave, hash_corpo, expira_em)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (usuario_id, chave) DO UPDATE SET
+                    hash_corpo = excluded.hash_corpo, status_http = NULL,
+                    resposta = NULL, expira_em = excluded.expira_em
+            """, (usuario_id, chave, hash_corpo,
+                  agora + current_app.config['IDEMPOTENCIA_RESERVA']))
+
+            extensoes = current_app.extensions
+            if agora - extensoes.get('idempotencia_limpa_em', 0.0) >= INTERVALO_LIMPEZA:
+                cursor.execute("DELETE FROM chaves_idempotencia WHERE expira_em <= ?", (agora,))
+                extensoes['idempotencia_limpa_em'] = agora
+
+        conn.commit()
+        return existente
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def concluir(usuario_id, chave, status_http, resposta):
+    """Grava a resposta da chave reservada, válida por IDEMPOTENCIA_TTL"""
+    conn = get_connection()
+    try:
+        conn.execute("""
+            UPDATE chaves_idempotencia SET status_http = ?, resposta = ?, expira_em = ?
+            WHERE usuario_id = ? AND chave = ?
+        """, (status_http, resposta, time.time() + current_app.config['IDEMPOTENCIA_TTL'],
+              usuario_id, chave))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def liberar(usuario_id, chave):
+    """Desfaz a reserva para que a próxima tentativa rode a rota de novo"""
+    conn = get_connection()
+    try:
+        conn.execute("""
+            DELETE FROM chaves_idempotencia
+            WHERE usuario_id = ? AND chave = ? AND status_http IS NULL
+        """, (usuario_id, chave))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _concluir_ou_manter(usuario_id, chave, resposta):
+    """Grava a resposta de sucesso; se não conseguir, mantém a chave reservada.
+
+    A rota já gravou o pedido: um erro aqui não pode virar 500 nem liberar a
+    chave, senão a próxima tentativa criaria o pedido de novo.
+    """
+    corpo = resposta.get_data(as_text=True)
+    for tentativa in range(TENTATIVAS_CONCLUIR):
+        try:
+            concluir(usuario_id, chave, resposta.status_code, corpo)
+            return
+        except Exception:
+            if tentativa + 1 == TENTATIVAS_CONCLUIR:
+                current_app.logger.exception(
+                    "Resposta da chave de idempotência %r não gravada; a chave segue reservada",
+                    chave)
+            else:
+                time.sleep(ESPERA_CONCLUIR * (tentativa + 1))
+
+
+def idempotente(f):
+    """Decorator que repete a resposta gravada para o Idempotency-Key.
+
+    Deve vir depois de @token_required (usa request.user). Sem o cabeçalho,
+    a rota roda normalmente.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        chave = request.headers.get(CABECALHO)
+        if chave is None:
+            return f(*args, **kwargs)
+
+        chave = chave.strip()
+        if not chave or len(chave) > TAMANHO_MAXIMO_CHAVE:
+            return jsonify({
+                'erro': f'{CABECALHO} deve ter entre 1 e {TAMANHO_MAXIMO_CHAVE} caracteres'
+            }), 400
+
+        usuario_id = request.user['user_id']
+        hash_corpo = hashlib.sha256(request.get_data()).hexdigest()
+
+        existente = reservar(usuario_id, chave, hash_corpo)
+        if existente is not None:
+            hash_salvo, status_http, corpo = existente
+            if hash_salvo != hash_corpo:
+                return jsonify({
+                    'erro': f'{CABECALHO} já usado em uma requisição com outro conteúdo'
+                }), 422
+            if status_http is None:
+                resposta = jsonify({'erro': 'Requisição com esta chave ainda em andamento'})
+                resposta.headers['Retry-After'] = '1'
+                return resposta, 409
+
+            resposta = current_app.response_class(corpo, status=status_http,
+                                                  mimetype='application/json')
+            resposta.headers['Idempotent-Replayed'] = 'true'
+            return resposta
+
+        try:
+            resposta = current_app.make_response(f(*args, **kwargs))
+        except Exception:
+            liberar(usuario_id, chave)
+            raise
+
+        if 200 <= resposta.status_code < 300:
+            _concluir_ou_manter(usuario_id, chave, resposta)
+        else:
+            liberar(usuario_id, chave)
+        return resposta
+
+    return decorated_function
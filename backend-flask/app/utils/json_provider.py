@@ -0,0 +1,55 @@
+from datetime import date, datetime
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional; sem ele usamos o json da stdlib
+    orjson = None
+
+
+class JSONProviderRapido(DefaultJSONProvider):
+    """Provider JSON que usa orjson quando instalado.
+
+    Datas e horas são serializadas em ISO 8601 (como os to_dict() dos
+    modelos), tanto pelo orjson quanto no fallback para a stdlib.
+    """
+
+    usa_orjson = orjson is not None
+
+    @staticmethod
+    def default(obj):
+        if isinstance(obj, (datetime, date)):
+            return obj.isoformat()
+        return DefaultJSONProvider.default(obj)
+
+    def _opcoes_orjson(self, indent=False):
+        opcoes = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        if self.sort_keys:
+            opcoes |= orjson.OPT_SORT_KEYS
+        if indent:
+            opcoes |= orjson.OPT_INDENT_2
+        return opcoes
+
+    def _dumps_bytes(self, obj, indent=False):
+        return orjson.dumps(obj, default=self.default,
+                            option=self._opcoes_orjson(indent))
+
+    def dumps(self, obj, **kwargs):
+        # Argumentos específicos do json da stdlib só são atendidos por ele
+        if not self.usa_orjson or set(kwargs) - {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+        return self._dumps_bytes(obj, bool(kwargs.get('indent'))).decode('utf-8').rstrip('\n')
+
+    def loads(self, s, **kwargs):
+        if not self.usa_orjson or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if not self.usa_orjson:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self._dumps_bytes(obj, indent), mimetype=self.mimetype)
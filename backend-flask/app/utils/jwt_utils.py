@@ -1,8 +1,14 @@
 import jwt
 import datetime
+import hashlib
 import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from functools import wraps
-from flask import request, jsonify
+from flask import current_app, g, request, jsonify
+from app.repositories.revogacao_tokens import obter_lista_revogacao
 
 # Chave secreta para JWT (em produção, deve vir de variável de ambiente)
 JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'sua-chave-secreta-super-segura-aqui')
@@ -17,7 +23,8 @@ def generate_token(user_data):
         'role': user_data['role'],
         'is_admin': user_data.get('is_admin', False),
         'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=JWT_EXPIRATION_HOURS),
-        'iat': datetime.datetime.utcnow()
+        'iat': datetime.datetime.utcnow(),
+        'jti': uuid.uuid4().hex  # identifica o token na revogação (logout)
     }
 
     token = jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
@@ -33,6 +40,124 @@ def verify_token(token):
     except jwt.InvalidTokenError:
         return None  # Token inválido
 
+class CacheTokens:
+    """Cache LRU com TTL de tokens já verificados.
+
+    A chave é o SHA-256 do token (o token em si não fica em memória) e cada
+    entrada vence no que ocorrer primeiro: `ttl` segundos ou o `exp` do token.
+    A revogação é conferida fora do cache, em verify_token_cached.
+    """
+
+    def __init__(self, tamanho_maximo=1024, ttl=300.0):
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl = ttl
+        self._entradas = OrderedDict()  # chave -> (payload, vence_em)
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    @staticmethod
+    def chave(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def obter(self, chave):
+        """Payload em cache ou None (entrada ausente ou vencida)"""
+        agora = time.time()
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None and entrada[1] > agora:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return entrada[0]
+
+            if entrada is not None:
+                del self._entradas[chave]
+            self.falhas += 1
+            return None
+
+    def guardar(self, chave, payload):
+        vence_em = min(time.time() + self.ttl, payload.get('exp', 0))
+        with self._lock:
+            self._entradas[chave] = (payload, vence_em)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.tamanho_maximo:
+                self._entradas.popitem(last=False)
+
+    def remover(self, chave):
+        with self._lock:
+            self._entradas.pop(chave, None)
+
+    def stats(self):
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                'tamanho': len(self._entradas),
+                'tamanho_maximo': self.tamanho_maximo,
+                'ttl': self.ttl,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': round(self.acertos / consultas, 4) if consultas else None
+            }
+
+
+def obter_cache_tokens():
+    """Retorna o cache de tokens da aplicação atual, criando-o se preciso"""
+    cache = current_app.extensions.get('jwt_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault('jwt_cache', CacheTokens(
+            current_app.config.get('JWT_CACHE_TAMANHO', 1024),
+            current_app.config.get('JWT_CACHE_TTL', 300.0)))
+    return cache
+
+
+def _identificador(token, payload):
+    """jti do token; tokens emitidos antes do jti usam o hash do próprio token"""
+    return payload.get('jti') or CacheTokens.chave(token)
+
+
+def verify_token_cached(token):
+    """verify_token passando pelo cache de tokens verificados da aplicação.
+
+    A revogação é conferida em toda chamada, na lista em memória (sem ida ao
+    banco por requisição).
+    """
+    cache = obter_cache_tokens()
+    chave = CacheTokens.chave(token)
+
+    payload = cache.obter(chave)
+    if payload is None:
+        payload = verify_token(token)
+        if not payload:
+            return None
+        cache.guardar(chave, payload)
+
+    if obter_lista_revogacao().revogado(_identificador(token, payload)):
+        cache.remover(chave)
+        return None
+    return payload
+
+
+def revoke_token(token):
+    """Revoga um token válido (logout). Retorna False se ele já era inválido"""
+    payload = verify_token(token)
+    if not payload:
+        return False
+    obter_lista_revogacao().revogar(_identificador(token, payload), payload['exp'])
+    obter_cache_tokens().remover(CacheTokens.chave(token))
+    return True
+
+
+def verify_token_once(token):
+    """verify_token_cached memorizado no app context atual.
+
+    Em uma requisição comum não muda nada; no /api/batch as sub-requisições
+    compartilham o app context e o mesmo token é verificado uma única vez.
+    """
+    verificados = g.setdefault('_tokens_verificados', {})
+    if token not in verificados:
+        verificados[token] = verify_token_cached(token)
+    return verificados[token]
+
 def get_token_from_request():
     """Extrai o token do header Authorization"""
     auth_header = request.headers.get('Authorization')
@@ -49,7 +174,7 @@ def token_required(f):
         if not token:
             return jsonify({'erro': 'Token de acesso não fornecido'}), 401
 
-        payload = verify_token(token)
+        payload = verify_token_once(token)
         if not payload:
             return jsonify({'erro': 'Token inválido ou expirado'}), 401
 
@@ -68,7 +193,7 @@ def admin_required(f):
         if not token:
             return jsonify({'erro': 'Token de acesso não fornecido'}), 401
 
-        payload = verify_token(token)
+        payload = verify_token_once(token)
         if not payload:
             return jsonify({'erro': 'Token inválido ou expirado'}), 401
 
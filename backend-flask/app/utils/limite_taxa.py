@@ -0,0 +1,256 @@
+"""Limite de taxa por token bucket para o login.
+
+Cada chave (IP ou email normalizado) tem um balde de `capacidade` fichas que
+se recarrega a `por_minuto` fichas por minuto; cada tentativa gasta uma ficha
+de cada balde envolvido. Sem ficha, a rota responde 429 com Retry-After antes
+de qualquer consulta de usuário ou cálculo de senha.
+
+Um login bem-sucedido devolve a ficha do IP: atrás de um NAT (Wi-Fi do
+campus) ou proxy, centenas de alunos entrando na troca de aula não esgotam o
+balde do endereço compartilhado, que só é gasto por tentativas que falham.
+O IP é request.remote_addr; atrás de proxy reverso, configure
+PROXIES_CONFIAVEIS para que ele seja o do cliente.
+
+Dois backends:
+- memória (padrão): por processo, um dicionário chave -> (fichas, instante).
+  Baldes que já estariam cheios de novo são descartados periodicamente e
+  tentativas recusadas não criam baldes, então a memória só guarda quem
+  conseguiu tentar há pouco.
+- sqlite: tabela limites_taxa compartilhada entre os workers.
+"""
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import wraps
+from flask import current_app, request, jsonify
+from app.models.db import get_connection
+
+CONFIG_PADRAO = {
+    'LOGIN_LIMITE_BACKEND': 'memoria',  # memoria | sqlite
+    'LOGIN_LIMITE_IP_RAJADA': 60,
+    'LOGIN_LIMITE_IP_POR_MINUTO': 60.0,
+    'LOGIN_LIMITE_EMAIL_RAJADA': 5,
+    'LOGIN_LIMITE_EMAIL_POR_MINUTO': 5.0,
+}
+
+# Segundos entre varreduras de baldes ociosos
+INTERVALO_LIMPEZA = 60.0
+
+
+class LimitadorBase(ABC):
+    """Regras por tipo de chave: {tipo: (capacidade, fichas por segundo)}"""
+
+    def __init__(self, regras):
+        for tipo, (capacidade, taxa) in regras.items():
+            # Com taxa 0 o balde nunca se recarrega e a espera seria infinita
+            if capacidade < 1 or taxa <= 0:
+                raise ValueError(
+                    f"Limite '{tipo}' inválido: rajada deve ser >= 1 e a taxa maior que zero "
+                    f"(recebido {capacidade}, {taxa}/s)")
+        self.regras = regras
+
+    def _recarregar(self, tipo, fichas, atualizado_em, agora):
+        capacidade, taxa = self.regras[tipo]
+        return min(capacidade, fichas + (agora - atualizado_em) * taxa)
+
+    def _espera(self, tipo, fichas):
+        """Segundos até o balde ter uma ficha"""
+        return (1 - fichas) / self.regras[tipo][1]
+
+    @abstractmethod
+    def consumir(self, chaves):
+        """Gasta uma ficha de cada balde em `chaves` [(tipo, valor), ...].
+
+        Só gasta se todos tiverem ficha. Retorna (permitido, retry_after).
+        """
+
+    @abstractmethod
+    def devolver(self, chaves):
+        """Devolve a ficha gasta em cada balde de `chaves` (sem passar da capacidade)"""
+
+
+class LimitadorMemoria(LimitadorBase):
+
+    def __init__(self, regras):
+        super().__init__(regras)
+        self._baldes = {}  # (tipo, valor) -> (fichas, atualizado_em)
+        self._lock = threading.Lock()
+        self._limpo_em = time.monotonic()
+
+    def consumir(self, chaves):
+        agora = time.monotonic()
+        with self._lock:
+            if agora - self._limpo_em >= INTERVALO_LIMPEZA:
+                self._limpar(agora)
+
+            atuais = {}
+            for chave in chaves:
+                capacidade = self.regras[chave[0]][0]
+                fichas, atualizado_em = self._baldes.get(chave, (capacidade, agora))
+                atuais[chave] = self._recarregar(chave[0], fichas, atualizado_em, agora)
+
+            faltando = [chave for chave, fichas in atuais.items() if fichas < 1]
+            if faltando:
+                # Nada foi gasto: os baldes salvos continuam valendo (a recarga
+                # é calculada a partir deles) e chaves novas, cheias, não são
+                # guardadas. Tentativas recusadas não aumentam a memória.
+                return False, max(self._espera(c[0], atuais[c]) for c in faltando)
+
+            for chave, fichas in atuais.items():
+                self._baldes[chave] = (fichas - 1, agora)
+            return True, 0.0
+
+    def devolver(self, chaves):
+        agora = time.monotonic()
+        with self._lock:
+            for chave in chaves:
+                salvo = self._baldes.get(chave)
+                if salvo is None:
+                    continue
+                capacidade = self.regras[chave[0]][0]
+                fichas = self._recarregar(chave[0], salvo[0], salvo[1], agora) + 1
+                if fichas >= capacidade:
+                    # Cheio de novo: igual a não ter balde
+                    del self._baldes[chave]
+                else:
+                    self._baldes[chave] = (fichas, agora)
+
+    def _limpar(self, agora):
+        """Descarta baldes que já teriam se recarregado por completo"""
+        cheios = [chave for chave, (fichas, atualizado_em) in self._baldes.items()
+                  if self._recarregar(chave[0], fichas, atualizado_em, agora)
+                  >= self.regras[chave[0]][0]]
+        for chave in cheios:
+            del self._baldes[chave]
+        self._limpo_em = agora
+
+    def stats(self):
+        with self._lock:
+            return {'backend': 'memoria', 'baldes': len(self._baldes)}
+
+
+class LimitadorSQLite(LimitadorBase):
+    """Baldes na tabela limites_taxa, atualizados em uma transação IMMEDIATE"""
+
+    def __init__(self, regras):
+        super().__init__(regras)
+        self._limpo_em = time.time()
+
+    def consumir(self, chaves):
+        agora = time.time()
+        nomes = [f"{tipo}:{valor}" for tipo, valor in chaves]
+
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            marcadores = ", ".join("?" * len(nomes))
+            cursor.execute(
+                f"SELECT chave, fichas, atualizado_em FROM limites_taxa WHERE chave IN ({marcadores})",
+                nomes)
+            salvos = {chave: (fichas, atualizado_em)
+                      for chave, fichas, atualizado_em in cursor.fetchall()}
+
+            atuais = {}
+            for (tipo, _), nome in zip(chaves, nomes):
+                fichas, atualizado_em = salvos.get(nome, (self.regras[tipo][0], agora))
+                atuais[nome] = (tipo, self._recarregar(tipo, fichas, atualizado_em, agora))
+
+            faltando = [(tipo, fichas) for tipo, fichas in atuais.values() if fichas < 1]
+            # Recusada, nada é gasto nem gravado (como no backend em memória)
+            if not faltando:
+                cursor.executemany("""
+                    INSERT INTO limites_taxa (chave, fichas, atualizado_em) VALUES (?, ?, ?)
+                    ON CONFLICT (chave) DO UPDATE SET
+                        fichas = excluded.fichas, atualizado_em = excluded.atualizado_em
+                """, [(nome, fichas - 1, agora) for nome, (_, fichas) in atuais.items()])
+
+            if agora - self._limpo_em >= INTERVALO_LIMPEZA:
+                # Um balde parado por mais que o maior tempo de recarga está cheio
+                janela = max(capacidade / taxa for capacidade, taxa in self.regras.values())
+                cursor.execute("DELETE FROM limites_taxa WHERE atualizado_em < ?",
+                               (agora - janela,))
+                self._limpo_em = agora
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        if faltando:
+            return False, max(self._espera(tipo, fichas) for tipo, fichas in faltando)
+        return True, 0.0
+
+    def devolver(self, chaves):
+        agora = time.time()
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            for tipo, valor in chaves:
+                capacidade, taxa = self.regras[tipo]
+                cursor.execute("""
+                    UPDATE limites_taxa
+                    SET fichas = MIN(?, fichas + (? - atualizado_em) * ? + 1), atualizado_em = ?
+                    WHERE chave = ?
+                """, (capacidade, agora, taxa, agora, f"{tipo}:{valor}"))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def stats(self):
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM limites_taxa")
+        baldes = cursor.fetchone()[0]
+        conn.close()
+        return {'backend': 'sqlite', 'baldes': baldes}
+
+
+def obter_limitador_login():
+    """Retorna o limitador de login da aplicação atual, criando-o se preciso"""
+    limitador = current_app.extensions.get('limitador_login')
+    if limitador is None:
+        config = current_app.config
+        regras = {
+            'ip': (config['LOGIN_LIMITE_IP_RAJADA'],
+                   config['LOGIN_LIMITE_IP_POR_MINUTO'] / 60.0),
+            'email': (config['LOGIN_LIMITE_EMAIL_RAJADA'],
+                      config['LOGIN_LIMITE_EMAIL_POR_MINUTO'] / 60.0),
+        }
+        classe = LimitadorSQLite if config['LOGIN_LIMITE_BACKEND'] == 'sqlite' else LimitadorMemoria
+        limitador = current_app.extensions.setdefault('limitador_login', classe(regras))
+    return limitador
+
+
+def limite_login(f):
+    """Decorator que aplica o token bucket por IP e por email antes da rota"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        chave_ip = ('ip', request.remote_addr or 'desconhecido')
+        chaves = [chave_ip]
+
+        dados = request.get_json(silent=True)
+        email = dados.get('email') if isinstance(dados, dict) else None
+        if isinstance(email, str) and email.strip():
+            chaves.append(('email', email.strip().lower()))
+
+        permitido, espera = obter_limitador_login().consumir(chaves)
+        if not permitido:
+            resposta = jsonify({'erro': 'Muitas tentativas de login. Tente novamente mais tarde'})
+            resposta.headers['Retry-After'] = str(max(1, math.ceil(espera)))
+            return resposta, 429
+
+        resposta = current_app.make_response(f(*args, **kwargs))
+        if 200 <= resposta.status_code < 300:
+            # Só tentativas que falham gastam o balde do IP
+            obter_limitador_login().devolver([chave_ip])
+        return resposta
+
+    return decorated_function
@@ -0,0 +1,35 @@
+import base64
+import json
+
+# Tamanho de página usado quando o cliente não informa `limit`
+LIMITE_PADRAO = 50
+# Maior página aceita em uma única requisição
+LIMITE_MAXIMO = 200
+
+
+def codificar_cursor(criado_em, registro_id):
+    """Gera um cursor opaco a partir da chave de ordenação (criado_em, id)"""
+    bruto = json.dumps([criado_em, registro_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(bruto.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """Recupera a tupla (criado_em, id) de um cursor gerado por codificar_cursor"""
+    try:
+        preenchimento = '=' * (-len(cursor) % 4)
+        bruto = base64.urlsafe_b64decode(cursor + preenchimento)
+        criado_em, registro_id = json.loads(bruto)
+    except (ValueError, TypeError):
+        raise ValueError("Cursor de paginação inválido")
+
+    if not isinstance(criado_em, str) or not isinstance(registro_id, int):
+        raise ValueError("Cursor de paginação inválido")
+
+    return criado_em, registro_id
+
+
+def normalizar_limite(limit):
+    """Aplica o limite padrão e o teto de itens por página"""
+    if not limit or limit < 1:
+        return LIMITE_PADRAO
+    return min(limit, LIMITE_MAXIMO)
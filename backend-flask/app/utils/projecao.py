@@ -0,0 +1,70 @@
+"""Projeção de linhas do SQLite direto para dicionários (listagens somente leitura).
+
+Cada repositório descreve os campos que expõe como {nome: expressão SQL}; a
+expressão já entrega o valor no formato de to_dict (ex.: datas em ISO), de
+modo que a linha vira o dicionário de saída sem passar pelo modelo.
+"""
+
+
+def interpretar_campos(valor, permitidos):
+    """Converte o parâmetro `fields` ("id,nome") na lista de campos pedidos.
+
+    Retorna None quando o parâmetro não foi informado (resposta completa).
+    """
+    if valor is None:
+        return None
+
+    campos = []
+    for campo in valor.split(','):
+        campo = campo.strip()
+        if campo and campo not in campos:
+            campos.append(campo)
+
+    if not campos:
+        raise ValueError("Parâmetro fields vazio")
+
+    invalidos = [campo for campo in campos if campo not in permitidos]
+    if invalidos:
+        raise ValueError(
+            f"Campos inválidos: {', '.join(invalidos)}. "
+            f"Disponíveis: {', '.join(permitidos)}")
+
+    return campos
+
+
+def colunas_sql(campos, mapa):
+    """Monta a lista do SELECT ("expr AS campo, ...") para os campos pedidos"""
+    return ", ".join(
+        campo if mapa[campo] == campo else f"{mapa[campo]} AS {campo}"
+        for campo in campos)
+
+
+def fabrica_dict(booleanos=()):
+    """row_factory que monta um dicionário por linha.
+
+    Os nomes das colunas são lidos uma única vez por consulta; colunas em
+    `booleanos` (0/1 no SQLite) viram bool como em to_dict.
+    """
+    estado = {}
+
+    def fabrica(cursor, row):
+        nomes = estado.get('nomes')
+        if nomes is None:
+            nomes = estado['nomes'] = [coluna[0] for coluna in cursor.description]
+            estado['booleanos'] = [nome for nome in nomes if nome in booleanos]
+
+        linha = dict(zip(nomes, row))
+        for nome in estado['booleanos']:
+            if linha[nome] is not None:
+                linha[nome] = bool(linha[nome])
+        return linha
+
+    return fabrica
+
+
+def consultar_dicts(conn, query, params=(), booleanos=()):
+    """Executa a consulta e devolve as linhas já como dicionários"""
+    cursor = conn.cursor()
+    cursor.row_factory = fabrica_dict(booleanos)
+    cursor.execute(query, params)
+    return cursor.fetchall()
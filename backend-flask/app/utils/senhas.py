@@ -0,0 +1,182 @@
+"""Hash de senhas com scrypt em um pool de threads limitado.
+
+O scrypt custa dezenas a centenas de ms de CPU por chamada. hashlib.scrypt
+libera o GIL durante o cálculo, então um pool de threads pequeno roda os
+hashes em paralelo sem travar as outras requisições do worker. A admissão é
+limitada: com o pool e a fila cheios, novas operações são recusadas na hora
+(SobrecargaSenhasError) em vez de acumular threads esperando.
+
+Cada operação admitida prende uma thread do servidor enquanto espera o
+resultado, então o total admitido (rodando + esperando) também nunca passa
+de metade de SERVIDOR_THREADS: uma rajada de logins não ocupa todas as
+threads e as rotas de pedidos continuam sendo atendidas. Passado
+SENHA_TIMEOUT, a operação também vira SobrecargaSenhasError (503).
+
+Formato armazenado: scrypt$<n>$<r>$<p>$<salt base64>$<hash base64>
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from flask import current_app, jsonify
+
+PREFIXO = 'scrypt'
+TAMANHO_SALT = 16
+TAMANHO_HASH = 32
+
+# Parâmetros padrão (sobrescritos por SENHA_SCRYPT_N/R/P na configuração)
+CONFIG_PADRAO = {
+    'SENHA_SCRYPT_N': 2 ** 14,
+    'SENHA_SCRYPT_R': 8,
+    'SENHA_SCRYPT_P': 1,
+    # Threads calculando hashes ao mesmo tempo
+    'SENHA_WORKERS': min(4, os.cpu_count() or 1),
+    # Operações aceitas além das que estão rodando; acima disso, recusa
+    'SENHA_FILA_MAXIMA': 16,
+    # Segundos que uma requisição espera pelo resultado do hash
+    'SENHA_TIMEOUT': 10.0,
+    # Threads que atendem requisições em cada worker (gunicorn --threads);
+    # operações de senha ocupam no máximo metade delas (0: sem esse limite)
+    'SERVIDOR_THREADS': 8,
+}
+
+
+class SobrecargaSenhasError(Exception):
+    """Pool de hash de senhas cheio: a operação foi recusada sem ser enfileirada"""
+
+
+def resposta_sobrecarga():
+    """Resposta 503 das rotas quando o pool recusa a operação"""
+    resposta = jsonify({'erro': 'Servidor ocupado, tente novamente em instantes'})
+    resposta.headers['Retry-After'] = '1'
+    return resposta, 503
+
+
+def _scrypt(senha, salt, n, r, p):
+    return hashlib.scrypt(senha.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * r * n, dklen=TAMANHO_HASH)
+
+
+def gerar_hash(senha, n, r, p):
+    """Calcula o hash no formato armazenado (chamada bloqueante)"""
+    salt = os.urandom(TAMANHO_SALT)
+    digest = _scrypt(senha, salt, n, r, p)
+    return "$".join([PREFIXO, str(n), str(r), str(p),
+                     base64.b64encode(salt).decode('ascii'),
+                     base64.b64encode(digest).decode('ascii')])
+
+
+def conferir_hash(senha, armazenado, n, r, p):
+    """Confere a senha (chamada bloqueante).
+
+    Retorna (confere, precisa_rehash). Valores sem o prefixo scrypt$ são
+    senhas antigas em texto puro: conferem por comparação direta e sempre
+    pedem rehash. Um registro scrypt$ malformado nunca confere.
+    """
+    if not armazenado:
+        return False, False
+
+    if not armazenado.startswith(PREFIXO + '$'):
+        confere = hmac.compare_digest(senha.encode('utf-8'), armazenado.encode('utf-8'))
+        return confere, confere
+
+    partes = armazenado.split('$')
+    if len(partes) != 6:
+        return False, False
+
+    try:
+        n_hash, r_hash, p_hash = int(partes[1]), int(partes[2]), int(partes[3])
+        salt = base64.b64decode(partes[4], validate=True)
+        esperado = base64.b64decode(partes[5], validate=True)
+        # Parâmetros inválidos (n que não é potência de 2, grande demais)
+        # também falham aqui
+        digest = _scrypt(senha, salt, n_hash, r_hash, p_hash)
+    except (ValueError, OverflowError, MemoryError):
+        return False, False
+
+    confere = hmac.compare_digest(digest, esperado)
+    return confere, confere and (n_hash, r_hash, p_hash) != (n, r, p)
+
+
+class HasherSenhas:
+    """Executa gerar_hash/conferir_hash no pool, com admissão limitada"""
+
+    def __init__(self, n, r, p, workers=2, fila_maxima=16, timeout=10.0, threads_servidor=0):
+        self.n, self.r, self.p = n, r, p
+        self.workers = workers
+        self.fila_maxima = fila_maxima
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers,
+                                            thread_name_prefix='hash-senhas')
+        # Vagas = rodando + esperando; liberadas quando o cálculo termina. Cada
+        # uma prende uma thread do servidor, então deixa ao menos metade livre
+        self.admissao = workers + fila_maxima
+        if threads_servidor > 0:
+            self.admissao = min(self.admissao, max(1, threads_servidor // 2))
+        self._vagas = threading.BoundedSemaphore(self.admissao)
+        self._lock = threading.Lock()
+        self.recusadas = 0
+        self.executadas = 0
+
+    def _executar(self, funcao, *args):
+        if not self._vagas.acquire(blocking=False):
+            with self._lock:
+                self.recusadas += 1
+            raise SobrecargaSenhasError("Muitas operações de senha simultâneas")
+
+        try:
+            futuro = self._executor.submit(funcao, *args)
+        except Exception:
+            self._vagas.release()
+            raise
+        futuro.add_done_callback(lambda _: self._vagas.release())
+
+        try:
+            resultado = futuro.result(timeout=self.timeout)
+        except FuturesTimeoutError:
+            # Se ainda não começou, sai do pool; a vaga volta no callback
+            futuro.cancel()
+            with self._lock:
+                self.recusadas += 1
+            raise SobrecargaSenhasError("Operação de senha não terminou a tempo")
+        with self._lock:
+            self.executadas += 1
+        return resultado
+
+    def hash(self, senha):
+        return self._executar(gerar_hash, senha, self.n, self.r, self.p)
+
+    def verificar(self, senha, armazenado):
+        """Retorna (confere, precisa_rehash); ver conferir_hash"""
+        return self._executar(conferir_hash, senha, armazenado, self.n, self.r, self.p)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'scrypt': {'n': self.n, 'r': self.r, 'p': self.p},
+                'workers': self.workers,
+                'fila_maxima': self.fila_maxima,
+                'admissao': self.admissao,
+                'executadas': self.executadas,
+                'recusadas': self.recusadas
+            }
+
+
+def obter_hasher():
+    """Retorna o hasher de senhas da aplicação atual, criando-o se preciso"""
+    hasher = current_app.extensions.get('hasher_senhas')
+    if hasher is None:
+        config = current_app.config
+        hasher = HasherSenhas(
+            config.get('SENHA_SCRYPT_N', CONFIG_PADRAO['SENHA_SCRYPT_N']),
+            config.get('SENHA_SCRYPT_R', CONFIG_PADRAO['SENHA_SCRYPT_R']),
+            config.get('SENHA_SCRYPT_P', CONFIG_PADRAO['SENHA_SCRYPT_P']),
+            config.get('SENHA_WORKERS', CONFIG_PADRAO['SENHA_WORKERS']),
+            config.get('SENHA_FILA_MAXIMA', CONFIG_PADRAO['SENHA_FILA_MAXIMA']),
+            config.get('SENHA_TIMEOUT', CONFIG_PADRAO['SENHA_TIMEOUT']),
+            config.get('SERVIDOR_THREADS', CONFIG_PADRAO['SERVIDOR_THREADS']))
+        hasher = current_app.extensions.setdefault('hasher_senhas', hasher)
+    return hasher
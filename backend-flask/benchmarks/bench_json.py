@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Tempo de montagem da resposta JSON de 1k pedidos com itens: stdlib x orjson.
+
+Como usar (a partir de backend-flask/):
+    python -m benchmarks.bench_json
+"""
+
+import timeit
+
+from flask.json.provider import DefaultJSONProvider
+
+from app.models.db import get_connection
+from app.repositories.pedido_repository import PedidoRepository
+from app.service.pedido_service import PedidoService
+from app.utils.json_provider import JSONProviderRapido
+from benchmarks.comum import app_temporaria
+
+PEDIDOS = 1000
+ITENS_POR_PEDIDO = 3
+REPETICOES = 20
+
+
+def popular(conn):
+    conn.execute("INSERT INTO usuarios (nome, email, senha) "
+                 "VALUES ('Bench', 'bench@email.com', '123456')")
+    conn.executemany(
+        "INSERT INTO pedidos (usuario_id, status, total) VALUES (1, 'pronto', 12.5)",
+        [()] * PEDIDOS)
+    conn.executemany(
+        "INSERT INTO itens_pedido (pedido_id, produto_id, quantidade, preco_unitario) "
+        "VALUES (?, ?, 2, 4.5)",
+        [(pedido_id, produto_id)
+         for pedido_id in range(1, PEDIDOS + 1)
+         for produto_id in range(1, ITENS_POR_PEDIDO + 1)])
+    conn.commit()
+
+
+def main():
+    with app_temporaria() as app:
+        with app.app_context():
+            popular(get_connection())
+            pedidos = PedidoRepository.listar_todos(limit=PEDIDOS)
+            resultado = {
+                'pedidos': PedidoService._anexar_itens(pedidos),
+                'total': len(pedidos)
+            }
+
+            providers = {
+                'stdlib (json)': DefaultJSONProvider(app),
+                'JSONProviderRapido': JSONProviderRapido(app),
+            }
+            if not JSONProviderRapido.usa_orjson:
+                print("⚠️  orjson não instalado: JSONProviderRapido usa a stdlib")
+
+            tempos = {}
+            for nome, provider in providers.items():
+                tempo = timeit.timeit(lambda: provider.response(resultado).get_data(),
+                                      number=REPETICOES) / REPETICOES
+                tempos[nome] = tempo
+                tamanho = len(provider.response(resultado).get_data())
+                print(f"{nome:<22}{tempo * 1000:>10.2f} ms{tamanho / 1024:>10.0f} KiB")
+
+            base = tempos['stdlib (json)']
+            print(f"ganho: {base / tempos['JSONProviderRapido']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Vazão de login com scrypt e efeito da admissão limitada nas rotas de pedidos.
+
+Simula um servidor com THREADS_SERVIDOR threads (como gunicorn gthread):
+uma rajada de logins disputa essas threads com clientes consultando
+/api/pedidos/. Sem limite de admissão os logins ficam presos esperando o pool
+de hash e ocupam o servidor; com o limite, o excedente recebe 503 na hora.
+
+Como usar (a partir de backend-flask/):
+    python -m benchmarks.bench_login
+"""
+
+import statistics
+import threading
+import time
+
+from app.models.db import get_connection
+from app.utils.jwt_utils import generate_token
+from app.utils.senhas import CONFIG_PADRAO, gerar_hash
+from benchmarks.comum import app_temporaria
+
+THREADS_SERVIDOR = 8
+THREADS_LOGIN = 24
+THREADS_PEDIDOS = 2
+DURACAO = 3.0
+USUARIOS = 20
+SENHA = 'senha-do-bench'
+
+
+def limitar_threads(app, threads):
+    """Cada requisição precisa de uma das `threads` vagas do "servidor" """
+    vagas = threading.Semaphore(threads)
+    wsgi_app = app.wsgi_app
+
+    def wsgi_limitado(environ, start_response):
+        with vagas:
+            return wsgi_app(environ, start_response)
+
+    app.wsgi_app = wsgi_limitado
+
+
+def popular(app):
+    senha_hash = gerar_hash(SENHA, CONFIG_PADRAO['SENHA_SCRYPT_N'],
+                            CONFIG_PADRAO['SENHA_SCRYPT_R'], CONFIG_PADRAO['SENHA_SCRYPT_P'])
+    with app.app_context():
+        conn = get_connection()
+        conn.executemany(
+            "INSERT INTO usuarios (nome, email, senha, role) VALUES (?, ?, ?, ?)",
+            [(f'Bench {i}', f'bench{i}@email.com', senha_hash, 'client')
+             for i in range(USUARIOS)] +
+            [('Gerente', 'gerente@email.com', senha_hash, 'manager')])
+        conn.commit()
+        return generate_token({'user_id': USUARIOS + 1, 'email': 'gerente@email.com',
+                               'role': 'manager', 'is_admin': False})
+
+
+def rodar(config):
+    with app_temporaria(config) as app:
+        token = popular(app)
+        limitar_threads(app, THREADS_SERVIDOR)
+
+        fim = time.perf_counter() + DURACAO
+        logins = {'ok': 0, 'recusados': 0}
+        latencias_pedidos = []
+        lock = threading.Lock()
+
+        def logar(indice):
+            cliente = app.test_client()
+            dados = {'email': f'bench{indice % USUARIOS}@email.com',
+                     'senha': SENHA, 'role': 'client'}
+            while time.perf_counter() < fim:
+                status = cliente.post('/api/auth/login', json=dados).status_code
+                with lock:
+                    logins['ok' if status == 200 else 'recusados'] += 1
+                if status == 503:
+                    time.sleep(0.05)
+
+        def consultar_pedidos():
+            cliente = app.test_client()
+            headers = {'Authorization': f'Bearer {token}'}
+            while time.perf_counter() < fim:
+                inicio = time.perf_counter()
+                assert cliente.get('/api/pedidos/?limit=20', headers=headers).status_code == 200
+                with lock:
+                    latencias_pedidos.append(time.perf_counter() - inicio)
+                time.sleep(0.01)
+
+        threads = ([threading.Thread(target=logar, args=(i,)) for i in range(THREADS_LOGIN)] +
+                   [threading.Thread(target=consultar_pedidos) for _ in range(THREADS_PEDIDOS)])
+        inicio = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        duracao = time.perf_counter() - inicio
+
+        latencias = sorted(latencias_pedidos)
+        p95 = latencias[min(len(latencias) - 1, int(len(latencias) * 0.95))] if latencias else 0.0
+        return {
+            'logins_s': logins['ok'] / duracao,
+            'recusados_s': logins['recusados'] / duracao,
+            'pedidos_p50_ms': statistics.median(latencias) * 1000 if latencias else 0.0,
+            'pedidos_p95_ms': p95 * 1000,
+            'pedidos': len(latencias)
+        }
+
+
+def main():
+    cenarios = {
+        'sem limite de admissão': {'SENHA_FILA_MAXIMA': 10_000, 'SERVIDOR_THREADS': 0},
+        'admissão (fila 4)': {'SENHA_FILA_MAXIMA': 4, 'SERVIDOR_THREADS': 0},
+        'admissão (threads / 2)': {'SERVIDOR_THREADS': THREADS_SERVIDOR},
+    }
+    print(f"scrypt n={CONFIG_PADRAO['SENHA_SCRYPT_N']} workers={CONFIG_PADRAO['SENHA_WORKERS']}, "
+          f"{THREADS_SERVIDOR} threads no servidor, {THREADS_LOGIN} clientes logando")
+    print(f"{'cenário':<26}{'logins/s':>10}{'503/s':>10}{'pedidos p50':>14}{'p95':>10}")
+    for nome, config in cenarios.items():
+        r = rodar(config)
+        print(f"{nome:<26}{r['logins_s']:>10.1f}{r['recusados_s']:>10.1f}"
+              f"{r['pedidos_p50_ms']:>11.1f} ms{r['pedidos_p95_ms']:>7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Memória e tempo para carregar 100k pedidos: modelos com __slots__ x dict.
+
+A referência reproduz os modelos antigos (atributos em __dict__ e datas
+convertidas com datetime.fromisoformat na leitura). Os modelos atuais guardam
+o texto do SQLite e só convertem quando a data é lida.
+
+Como usar (a partir de backend-flask/):
+    python -m benchmarks.bench_modelos
+"""
+
+import gc
+import time
+import tracemalloc
+from datetime import datetime
+
+from app.models.db import get_connection
+from app.models.pedido import Pedido
+from app.models.produto import Produto
+from benchmarks.comum import app_temporaria
+
+PEDIDOS = 100_000
+
+
+class PedidoDict:
+    """Pedido como era antes: atributos em __dict__ e datas convertidas"""
+
+    def __init__(self, id=None, usuario_id=None, status=None, total=0.0,
+                 observacoes=None, criado_em=None, atualizado_em=None):
+        self.id = id
+        self.usuario_id = usuario_id
+        self.status = status
+        self.total = total
+        self.observacoes = observacoes
+        self.criado_em = criado_em or datetime.now()
+        self.atualizado_em = atualizado_em or datetime.now()
+
+
+def popular(conn):
+    conn.execute("INSERT INTO usuarios (nome, email, senha) "
+                 "VALUES ('Bench', 'bench@email.com', '123456')")
+    conn.executemany(
+        "INSERT INTO pedidos (usuario_id, status, total) VALUES (1, 'pronto', 12.5)",
+        [()] * PEDIDOS)
+    conn.commit()
+
+
+def carregar_referencia(rows):
+    return [PedidoDict(id=row[0], usuario_id=row[1], status=row[2],
+                       total=row[3], observacoes=row[4],
+                       criado_em=datetime.fromisoformat(row[5]),
+                       atualizado_em=datetime.fromisoformat(row[6]))
+            for row in rows]
+
+
+def carregar_pedidos(rows):
+    return [Pedido(id=row[0], usuario_id=row[1], status=row[2], total=row[3],
+                   observacoes=row[4], criado_em=row[5], atualizado_em=row[6])
+            for row in rows]
+
+
+def carregar_produtos(rows):
+    # Produto converte as datas só no acesso (descritor DataHora)
+    return [Produto(id=row[0], nome='Bench', preco=row[3], categoria=row[2],
+                    criado_em=row[5], atualizado_em=row[6])
+            for row in rows]
+
+
+def medir(carregar, rows):
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    objetos = carregar(rows)
+    tempo = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objetos
+    return tempo, pico
+
+
+def main():
+    with app_temporaria() as app:
+        with app.app_context():
+            conn = get_connection()
+            popular(conn)
+            rows = conn.execute(
+                "SELECT id, usuario_id, status, total, observacoes, "
+                "criado_em, atualizado_em FROM pedidos").fetchall()
+
+    cenarios = {
+        'dict + fromisoformat': carregar_referencia,
+        'Pedido (__slots__)': carregar_pedidos,
+        'Produto (DataHora)': carregar_produtos,
+    }
+
+    print(f"{len(rows)} linhas")
+    resultados = {}
+    for nome, carregar in cenarios.items():
+        tempo, pico = medir(carregar, rows)
+        resultados[nome] = (tempo, pico)
+        print(f"{nome:<24}{tempo * 1000:>10.1f} ms{pico / 1024 / 1024:>10.1f} MiB")
+
+    tempo_base, pico_base = resultados['dict + fromisoformat']
+    tempo, pico = resultados['Pedido (__slots__)']
+    print(f"Pedido: {tempo_base / tempo:.1f}x mais rápido, "
+          f"{pico_base / pico:.1f}x menos memória")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Vazão de criação de pedidos com gravação direta vs fila com group commit.
+
+SUBMISSORES clientes simultâneos enviam PEDIDOS_POR_SUBMISSOR pedidos cada
+um para POST /api/pedidos/. Na gravação direta cada requisição faz o próprio
+commit; na fila, uma thread grava os pedidos em lotes. Os cenários rodam com
+DB_SYNCHRONOUS=NORMAL (padrão) e FULL, em que cada commit faz fsync.
+
+Como usar (a partir de backend-flask/):
+    python -m benchmarks.bench_pedidos_lote
+"""
+
+import statistics
+import threading
+import time
+
+from app.models.db import get_connection
+from app.utils.jwt_utils import generate_token
+from benchmarks.comum import app_temporaria
+
+SUBMISSORES = 500
+PEDIDOS_POR_SUBMISSOR = 4
+
+
+def popular(app):
+    """Um usuário e um token por submissor; retorna (tokens, ids de produtos)"""
+    with app.app_context():
+        conn = get_connection()
+        conn.executemany(
+            "INSERT INTO usuarios (nome, email, senha, role) VALUES (?, ?, ?, ?)",
+            [(f'Aluno {i}', f'aluno{i}@email.com', 'x', 'client') for i in range(SUBMISSORES)])
+        conn.commit()
+        usuarios = [row[0] for row in conn.execute(
+            "SELECT id FROM usuarios WHERE email LIKE 'aluno%' ORDER BY id")]
+        produtos = [row[0] for row in conn.execute(
+            "SELECT id FROM produtos WHERE disponivel = 1 LIMIT 5")]
+        conn.close()
+        tokens = [generate_token({'user_id': usuario_id, 'email': f'aluno{i}@email.com',
+                                  'role': 'client', 'is_admin': False})
+                  for i, usuario_id in enumerate(usuarios)]
+    return tokens, produtos
+
+
+def rodar(config):
+    # Pool do tamanho da rajada: o gargalo medido é a escrita, não a espera por conexão
+    config = dict(config, DB_POOL_SIZE=SUBMISSORES, DB_POOL_TIMEOUT=60.0)
+    with app_temporaria(config) as app:
+        tokens, produtos = popular(app)
+        latencias = []
+        erros = [0]
+        lock = threading.Lock()
+        largada = threading.Barrier(SUBMISSORES + 1)
+
+        def submeter(indice):
+            cliente = app.test_client()
+            headers = {'Authorization': f'Bearer {tokens[indice]}'}
+            corpo = {'itens_carrinho': [
+                {'produto_id': produtos[(indice + j) % len(produtos)], 'quantidade': 1}
+                for j in range(2)]}
+            largada.wait()
+            for _ in range(PEDIDOS_POR_SUBMISSOR):
+                inicio = time.perf_counter()
+                status = cliente.post('/api/pedidos/', json=corpo, headers=headers).status_code
+                with lock:
+                    if status == 201:
+                        latencias.append(time.perf_counter() - inicio)
+                    else:
+                        erros[0] += 1
+
+        threads = [threading.Thread(target=submeter, args=(i,)) for i in range(SUBMISSORES)]
+        for t in threads:
+            t.start()
+        largada.wait()
+        inicio = time.perf_counter()
+        for t in threads:
+            t.join()
+        duracao = time.perf_counter() - inicio
+
+        gravador = app.extensions.get('gravador_pedidos')
+        lotes = None
+        if gravador:
+            lotes = gravador.stats()['media_por_lote']
+            gravador.parar()
+
+        latencias.sort()
+        return {
+            'pedidos_s': len(latencias) / duracao,
+            'p50_ms': statistics.median(latencias) * 1000 if latencias else 0.0,
+            'p95_ms': latencias[min(len(latencias) - 1, int(len(latencias) * 0.95))] * 1000
+                      if latencias else 0.0,
+            'erros': erros[0],
+            'media_por_lote': lotes
+        }
+
+
+def main():
+    print(f"{SUBMISSORES} submissores x {PEDIDOS_POR_SUBMISSOR} pedidos")
+    print(f"{'cenário':<24}{'pedidos/s':>11}{'p50':>11}{'p95':>11}{'erros':>7}{'lote médio':>12}")
+    for sincronizacao in ('NORMAL', 'FULL'):
+        for modo in ('direta', 'fila'):
+            r = rodar({'PEDIDOS_GRAVACAO': modo, 'DB_SYNCHRONOUS': sincronizacao})
+            lote = f"{r['media_por_lote']:.1f}" if r['media_por_lote'] is not None else '-'
+            print(f"{modo + ' / ' + sincronizacao:<24}{r['pedidos_s']:>11.1f}"
+                  f"{r['p50_ms']:>8.1f} ms{r['p95_ms']:>8.1f} ms{r['erros']:>7}{lote:>12}")
+
+
+if __name__ == '__main__':
+    main()
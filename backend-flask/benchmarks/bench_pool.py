@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""Compara requisições por segundo com e sem o pool de conexões.
+
+Como usar (a partir de backend-flask/):
+    python -m benchmarks.bench_pool
+"""
+
+from benchmarks.comum import app_temporaria, medir_requisicoes
+
+URLS = ['/api/produtos/', '/api/categorias/', '/api/produtos/1']
+
+
+def main():
+    resultados = {}
+    for nome, tamanho in (('conexão por chamada', 0), ('pool', 8)):
+        with app_temporaria({'DB_POOL_SIZE': tamanho}) as app:
+            resultados[nome] = {url: medir_requisicoes(app, url)
+                                for url in URLS}
+
+    print(f"{'endpoint':<22}{'sem pool':>14}{'com pool':>14}{'ganho':>10}")
+    for url in URLS:
+        sem = resultados['conexão por chamada'][url]
+        com = resultados['pool'][url]
+        print(f"{url:<22}{sem:>12.0f}/s{com:>12.0f}/s{com / sem:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
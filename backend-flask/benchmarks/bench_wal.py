@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Leituras concorrentes com escritas: journal DELETE (padrão antigo) x WAL.
+
+Escritores criam pedidos sem parar enquanto leitores listam pedidos. Com
+journal DELETE os leitores esperam o lock de cada escrita; em WAL não.
+
+Como usar (a partir de backend-flask/):
+    python -m benchmarks.bench_wal
+"""
+
+import threading
+import time
+
+from app.models.db import get_connection
+from app.service.pedido_service import PedidoService
+from benchmarks.comum import app_temporaria
+
+DURACAO = 3.0
+ESCRITORES = 2
+LEITORES = 6
+
+CONFIGURACOES = {
+    'DELETE': {'DB_JOURNAL_MODE': 'DELETE', 'DB_SYNCHRONOUS': 'FULL'},
+    'WAL': {'DB_JOURNAL_MODE': 'WAL', 'DB_SYNCHRONOUS': 'NORMAL'},
+}
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def executar(config):
+    with app_temporaria(config) as app:
+        with app.app_context():
+            conn = get_connection()
+            conn.execute("INSERT INTO usuarios (nome, email, senha) "
+                         "VALUES ('Bench', 'bench@email.com', '123456')")
+            conn.commit()
+
+        fim = time.perf_counter() + DURACAO
+        escritas, erros, latencias = [0], [0], []
+        lock = threading.Lock()
+
+        def escritor():
+            while time.perf_counter() < fim:
+                with app.app_context():
+                    try:
+                        PedidoService.criar_pedido(
+                            {'usuario_id': 1},
+                            [{'produto_id': 1, 'quantidade': 1},
+                             {'produto_id': 2, 'quantidade': 2}])
+                        with lock:
+                            escritas[0] += 1
+                    except Exception:
+                        with lock:
+                            erros[0] += 1
+
+        def leitor():
+            minhas = []
+            while time.perf_counter() < fim:
+                inicio = time.perf_counter()
+                with app.app_context():
+                    try:
+                        PedidoService.listar_todos_pedidos(limit=20)
+                    except Exception:
+                        with lock:
+                            erros[0] += 1
+                        continue
+                minhas.append(time.perf_counter() - inicio)
+            with lock:
+                latencias.extend(minhas)
+
+        threads = ([threading.Thread(target=escritor) for _ in range(ESCRITORES)] +
+                   [threading.Thread(target=leitor) for _ in range(LEITORES)])
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        return {
+            'leituras/s': len(latencias) / DURACAO,
+            'escritas/s': escritas[0] / DURACAO,
+            'leitura p99 (ms)': percentil(latencias, 0.99) * 1000,
+            'leitura máx (ms)': max(latencias, default=0) * 1000,
+            'erros': erros[0],
+        }
+
+
+def main():
+    resultados = {nome: executar(config) for nome, config in CONFIGURACOES.items()}
+
+    metricas = list(next(iter(resultados.values())))
+    print(f"{'':<20}" + "".join(f"{nome:>12}" for nome in resultados))
+    for metrica in metricas:
+        print(f"{metrica:<20}" + "".join(
+            f"{resultados[nome][metrica]:>12.1f}" for nome in resultados))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Utilitários compartilhados pelos benchmarks"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from app import create_app
+from app.models.db import init_db
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRACOES_PATH = os.path.join(BASE_DIR, 'database', 'migracoes')
+SEED_PATH = os.path.join(BASE_DIR, 'database', 'seed.sql')
+
+
+@contextmanager
+def app_temporaria(config=None):
+    """Cria uma aplicação apontando para um banco temporário já com a seed"""
+    diretorio = tempfile.mkdtemp(prefix='lanchonete-bench-')
+    db_path = os.path.join(diretorio, 'db.sqlite3')
+    try:
+        init_db(db_path, MIGRACOES_PATH, SEED_PATH)
+        dados = {'DB_PATH': db_path}
+        dados.update(config or {})
+        yield create_app(dados)
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+def medir_requisicoes(app, url, threads=8, duracao=3.0, headers=None):
+    """Dispara GETs concorrentes por `duracao` segundos e retorna req/s"""
+    contagens = [0] * threads
+    fim = time.perf_counter() + duracao
+
+    def trabalhador(indice):
+        cliente = app.test_client()
+        while time.perf_counter() < fim:
+            resposta = cliente.get(url, headers=headers)
+            assert resposta.status_code == 200, resposta.status_code
+            contagens[indice] += 1
+
+    workers = [threading.Thread(target=trabalhador, args=(i,))
+               for i in range(threads)]
+    inicio = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return sum(contagens) / (time.perf_counter() - inicio)
@@ -0,0 +1,6 @@
+-- Índices compostos para a paginação por cursor (criado_em, id)
+CREATE INDEX IF NOT EXISTS idx_pedidos_criado_em_id ON pedidos (criado_em, id);
+
+CREATE INDEX IF NOT EXISTS idx_pedidos_status_criado_em_id ON pedidos (status, criado_em, id);
+
+CREATE INDEX IF NOT EXISTS idx_pedidos_usuario_criado_em_id ON pedidos (usuario_id, criado_em, id);
@@ -0,0 +1,26 @@
+-- Geração do catálogo: incrementada a cada escrita em produtos para que
+-- os caches em memória de cada worker detectem cópias desatualizadas
+CREATE TABLE IF NOT EXISTS catalogo_versao (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    geracao INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO catalogo_versao (id, geracao) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_produtos_versao_insert
+AFTER INSERT ON produtos
+BEGIN
+    UPDATE catalogo_versao SET geracao = geracao + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_produtos_versao_update
+AFTER UPDATE ON produtos
+BEGIN
+    UPDATE catalogo_versao SET geracao = geracao + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_produtos_versao_delete
+AFTER DELETE ON produtos
+BEGIN
+    UPDATE catalogo_versao SET geracao = geracao + 1 WHERE id = 1;
+END;
@@ -0,0 +1,37 @@
+-- Busca textual de produtos (nome e descrição), sem acentos: "pao" encontra "Pão"
+CREATE VIRTUAL TABLE IF NOT EXISTS produtos_fts USING fts5(
+    nome,
+    descricao,
+    content = 'produtos',
+    content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_produtos_fts_insert
+AFTER INSERT ON produtos
+BEGIN
+    INSERT INTO produtos_fts (rowid, nome, descricao)
+    VALUES (new.id, new.nome, new.descricao);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_produtos_fts_delete
+AFTER DELETE ON produtos
+BEGIN
+    INSERT INTO produtos_fts (produtos_fts, rowid, nome, descricao)
+    VALUES ('delete', old.id, old.nome, old.descricao);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_produtos_fts_update
+AFTER UPDATE OF nome, descricao ON produtos
+BEGIN
+    INSERT INTO produtos_fts (produtos_fts, rowid, nome, descricao)
+    VALUES ('delete', old.id, old.nome, old.descricao);
+    INSERT INTO produtos_fts (rowid, nome, descricao)
+    VALUES (new.id, new.nome, new.descricao);
+END;
+
+-- Reconstrói o índice quando ele não cobre todos os produtos (ex.: banco
+-- criado antes da busca textual existir)
+INSERT INTO produtos_fts (produtos_fts)
+SELECT 'rebuild'
+WHERE (SELECT COUNT(*) FROM produtos_fts_docsize) <> (SELECT COUNT(*) FROM produtos);
@@ -0,0 +1,19 @@
+-- A geração do catálogo também muda com escritas em categorias, para que os
+-- ETags do cardápio e das categorias acompanhem essas mudanças
+CREATE TRIGGER IF NOT EXISTS trg_categorias_versao_insert
+AFTER INSERT ON categorias
+BEGIN
+    UPDATE catalogo_versao SET geracao = geracao + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_categorias_versao_update
+AFTER UPDATE ON categorias
+BEGIN
+    UPDATE catalogo_versao SET geracao = geracao + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_categorias_versao_delete
+AFTER DELETE ON categorias
+BEGIN
+    UPDATE catalogo_versao SET geracao = geracao + 1 WHERE id = 1;
+END;
@@ -0,0 +1,80 @@
+-- Estatísticas de pedidos mantidas incrementalmente por triggers, para que o
+-- dashboard não precise agregar a tabela pedidos inteira a cada carga
+CREATE TABLE IF NOT EXISTS pedidos_estatisticas_status (
+    status VARCHAR(20) PRIMARY KEY,
+    quantidade INTEGER NOT NULL DEFAULT 0,
+    total DECIMAL(10, 2) NOT NULL DEFAULT 0.00
+);
+
+CREATE TABLE IF NOT EXISTS pedidos_estatisticas_diarias (
+    dia DATE NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    quantidade INTEGER NOT NULL DEFAULT 0,
+    total DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
+    PRIMARY KEY (dia, status)
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_pedidos_estatisticas_insert
+AFTER INSERT ON pedidos
+BEGIN
+    INSERT INTO pedidos_estatisticas_status (status, quantidade, total)
+    VALUES (new.status, 1, new.total)
+    ON CONFLICT (status) DO UPDATE SET
+        quantidade = quantidade + 1,
+        total = total + excluded.total;
+
+    INSERT INTO pedidos_estatisticas_diarias (dia, status, quantidade, total)
+    VALUES (date(new.criado_em), new.status, 1, new.total)
+    ON CONFLICT (dia, status) DO UPDATE SET
+        quantidade = quantidade + 1,
+        total = total + excluded.total;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_pedidos_estatisticas_delete
+AFTER DELETE ON pedidos
+BEGIN
+    UPDATE pedidos_estatisticas_status
+    SET quantidade = quantidade - 1, total = total - old.total
+    WHERE status = old.status;
+
+    UPDATE pedidos_estatisticas_diarias
+    SET quantidade = quantidade - 1, total = total - old.total
+    WHERE dia = date(old.criado_em) AND status = old.status;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_pedidos_estatisticas_update
+AFTER UPDATE OF status, total, criado_em ON pedidos
+BEGIN
+    UPDATE pedidos_estatisticas_status
+    SET quantidade = quantidade - 1, total = total - old.total
+    WHERE status = old.status;
+
+    UPDATE pedidos_estatisticas_diarias
+    SET quantidade = quantidade - 1, total = total - old.total
+    WHERE dia = date(old.criado_em) AND status = old.status;
+
+    INSERT INTO pedidos_estatisticas_status (status, quantidade, total)
+    VALUES (new.status, 1, new.total)
+    ON CONFLICT (status) DO UPDATE SET
+        quantidade = quantidade + 1,
+        total = total + excluded.total;
+
+    INSERT INTO pedidos_estatisticas_diarias (dia, status, quantidade, total)
+    VALUES (date(new.criado_em), new.status, 1, new.total)
+    ON CONFLICT (dia, status) DO UPDATE SET
+        quantidade = quantidade + 1,
+        total = total + excluded.total;
+END;
+
+-- Carga inicial para bancos que já tinham pedidos antes das estatísticas
+INSERT INTO pedidos_estatisticas_status (status, quantidade, total)
+SELECT status, COUNT(*), COALESCE(SUM(total), 0)
+FROM pedidos
+WHERE NOT EXISTS (SELECT 1 FROM pedidos_estatisticas_status)
+GROUP BY status;
+
+INSERT INTO pedidos_estatisticas_diarias (dia, status, quantidade, total)
+SELECT date(criado_em), status, COUNT(*), COALESCE(SUM(total), 0)
+FROM pedidos
+WHERE NOT EXISTS (SELECT 1 FROM pedidos_estatisticas_diarias)
+GROUP BY date(criado_em), status;
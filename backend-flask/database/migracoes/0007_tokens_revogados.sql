@@ -0,0 +1,9 @@
+-- Tokens JWT revogados (logout), identificados pelo jti. O id crescente
+-- permite a cada worker buscar só as revogações novas desde a última leitura.
+CREATE TABLE IF NOT EXISTS tokens_revogados (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    jti VARCHAR(64) NOT NULL UNIQUE,
+    expira_em INTEGER NOT NULL -- exp do token (epoch); depois disso pode ser removido
+);
+
+CREATE INDEX IF NOT EXISTS idx_tokens_revogados_expira_em ON tokens_revogados (expira_em);
@@ -0,0 +1,8 @@
+-- Baldes do limite de taxa de login (backend sqlite, compartilhado entre workers)
+CREATE TABLE IF NOT EXISTS limites_taxa (
+    chave VARCHAR(330) PRIMARY KEY, -- "ip:<endereço>" ou "email:<email normalizado>"
+    fichas REAL NOT NULL,
+    atualizado_em REAL NOT NULL -- epoch em segundos
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_limites_taxa_atualizado_em ON limites_taxa (atualizado_em);
@@ -0,0 +1,14 @@
+-- Respostas de POST /api/pedidos/ por Idempotency-Key, para repetir a mesma
+-- resposta quando o cliente reenvia a requisição. status_http NULL marca uma
+-- chave reservada cuja requisição ainda está em andamento.
+CREATE TABLE IF NOT EXISTS chaves_idempotencia (
+    usuario_id INTEGER NOT NULL,
+    chave VARCHAR(255) NOT NULL,
+    hash_corpo CHAR(64) NOT NULL, -- sha256 do corpo da requisição original
+    status_http INTEGER,
+    resposta TEXT,
+    expira_em REAL NOT NULL, -- epoch em segundos
+    PRIMARY KEY (usuario_id, chave)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_chaves_idempotencia_expira_em ON chaves_idempotencia (expira_em);
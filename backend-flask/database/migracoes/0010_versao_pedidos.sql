@@ -0,0 +1,26 @@
+-- Geração dos pedidos: incrementada a cada escrita em pedidos para que a fila
+-- da cozinha em memória de cada worker detecte mudanças feitas por outros
+CREATE TABLE IF NOT EXISTS pedidos_versao (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    geracao INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO pedidos_versao (id, geracao) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_pedidos_versao_insert
+AFTER INSERT ON pedidos
+BEGIN
+    UPDATE pedidos_versao SET geracao = geracao + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_pedidos_versao_update
+AFTER UPDATE ON pedidos
+BEGIN
+    UPDATE pedidos_versao SET geracao = geracao + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_pedidos_versao_delete
+AFTER DELETE ON pedidos
+BEGIN
+    UPDATE pedidos_versao SET geracao = geracao + 1 WHERE id = 1;
+END;
@@ -0,0 +1,27 @@
+-- Índices ajustados às consultas dos repositórios (ver test_planos_consulta.py)
+
+-- Histórico do cliente filtrado por status: WHERE usuario_id = ? AND status = ?
+-- ORDER BY criado_em DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_pedidos_usuario_status_criado_em ON pedidos (usuario_id, status, criado_em);
+
+-- Parciais: só as linhas que as listagens leem, já na ordem pedida
+CREATE INDEX IF NOT EXISTS idx_produtos_disponiveis_nome ON produtos (nome) WHERE disponivel = 1;
+
+CREATE INDEX IF NOT EXISTS idx_produtos_disponiveis_categoria_nome ON produtos (categoria, nome) WHERE disponivel = 1;
+
+CREATE INDEX IF NOT EXISTS idx_categorias_ativas_nome ON categorias (nome) WHERE ativo = 1;
+
+CREATE INDEX IF NOT EXISTS idx_usuarios_ativos_criado_em ON usuarios (criado_em) WHERE ativo = 1;
+
+-- Redundantes ou sem consulta que os use; só custavam escrita em pedidos e itens.
+-- idx_pedidos_criado_em já ordena por (criado_em, id): todo índice do SQLite
+-- termina no rowid
+DROP INDEX IF EXISTS idx_pedidos_criado_em_id;      -- igual a idx_pedidos_criado_em (+ rowid)
+DROP INDEX IF EXISTS idx_pedidos_usuario_id;        -- prefixo de idx_pedidos_usuario_criado_em_id
+DROP INDEX IF EXISTS idx_pedidos_atualizado_em;     -- nenhuma consulta filtra ou ordena por ele
+DROP INDEX IF EXISTS idx_itens_pedido_criado_em;    -- itens são ordenados por id
+DROP INDEX IF EXISTS idx_usuarios_email;            -- duplica o índice do UNIQUE de email
+-- Booleanos: substituídos pelos parciais acima, que já filtram e ordenam
+DROP INDEX IF EXISTS idx_usuarios_ativo;
+DROP INDEX IF EXISTS idx_categorias_ativo;
+DROP INDEX IF EXISTS idx_produtos_disponivel;
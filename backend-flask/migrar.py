@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Script para aplicar as migrações do schema antes de subir os workers.
+
+A aplicação já migra ao iniciar; rodar este script no deploy deixa o banco
+atualizado antes, e os workers só conferem a versão.
+
+Como usar:
+    python migrar.py             # aplica as migrações pendentes
+    python migrar.py --status    # lista aplicadas e pendentes
+"""
+
+import os
+import sqlite3
+import sys
+
+from app.models.migracoes import listar_migracoes, migrar, pendentes, versoes_aplicadas
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, 'database', 'db.sqlite3')
+MIGRACOES_PATH = os.path.join(BASE_DIR, 'database', 'migracoes')
+
+
+def main():
+    if '--status' in sys.argv[1:]:
+        migracoes = listar_migracoes(MIGRACOES_PATH)
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            aplicadas = versoes_aplicadas(conn)
+        finally:
+            conn.close()
+        faltando = {versao for versao, _, _ in pendentes(migracoes, aplicadas)}
+        for versao, nome, _ in migracoes:
+            print(f"{'⏳' if versao in faltando else '✅'} {versao:04d}_{nome}")
+        return
+
+    aplicadas = migrar(DB_PATH, MIGRACOES_PATH)
+    if not aplicadas:
+        print("✅ Banco já está na última versão")
+        return
+    for versao in aplicadas:
+        print(f"✅ Migração {versao:04d} aplicada")
+
+
+if __name__ == "__main__":
+    main()
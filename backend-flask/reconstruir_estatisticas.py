@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Script para recalcular do zero as estatísticas de pedidos.
+
+As tabelas pedidos_estatisticas_status e pedidos_estatisticas_diarias são
+mantidas por triggers; este script as recompõe a partir da tabela pedidos e
+lista qualquer divergência encontrada.
+
+Como usar:
+    python reconstruir_estatisticas.py              # verifica e regrava
+    python reconstruir_estatisticas.py --verificar  # apenas verifica
+"""
+
+import sys
+
+from app import create_app
+from app.repositories.pedido_repository import PedidoRepository
+
+
+def main():
+    apenas_verificar = '--verificar' in sys.argv[1:]
+
+    app = create_app()
+    with app.app_context():
+        divergencias = PedidoRepository.reconstruir_estatisticas(apenas_verificar)
+
+    if not divergencias:
+        print("✅ Estatísticas consistentes com a tabela de pedidos")
+        return
+
+    for d in divergencias:
+        print(f"❌ {d['tabela']} {d['chave']}: mantido={d['mantido']} "
+              f"recalculado={d['recalculado']}")
+
+    if apenas_verificar:
+        sys.exit(1)
+    print("✅ Estatísticas reconstruídas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Estatísticas de pedidos mantidas por triggers conferem com o recálculo completo"""
+
+import pytest
+
+from app import create_app
+from app.models.db import get_connection
+from app.models.pedido import Pedido, StatusPedido
+from app.models.usuario import Usuario
+from app.repositories.pedido_repository import PedidoRepository
+from app.repositories.usuario_repository import UsuarioRepository
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({'DB_PATH': str(tmp_path / 'db.sqlite3'), 'DB_CHECKPOINT_INTERVALO': 0})
+    with app.app_context():
+        yield app
+
+
+def executar(sql, parametros=()):
+    conn = get_connection()
+    conn.execute(sql, parametros)
+    conn.commit()
+    conn.close()
+
+
+def movimentar_pedidos():
+    """Inserções, trocas de status e total, mudança de dia e exclusões"""
+    usuario = UsuarioRepository.criar(Usuario(nome='Ana', email='ana@email.com',
+                                              senha='x', role='client'))
+    pedidos = [PedidoRepository.criar(Pedido(usuario_id=usuario.id, total=total))
+               for total in (10.0, 12.5, 7.25, 30.0, 4.75)]
+
+    PedidoRepository.atualizar_status_se(pedidos[0].id, StatusPedido.EM_ANDAMENTO.value,
+                                         StatusPedido.PREPARANDO.value)
+    PedidoRepository.atualizar(pedidos[1].id, status=StatusPedido.FINALIZADO.value)
+    PedidoRepository.atualizar(pedidos[2].id, status=StatusPedido.FINALIZADO.value, total=8.0)
+    PedidoRepository.atualizar(pedidos[3].id, observacoes='Sem cebola')
+    PedidoRepository.deletar(pedidos[3].id)
+    PedidoRepository.deletar_permanentemente(pedidos[4].id)
+    # Pedido que muda de dia (ex.: correção manual da data)
+    executar("UPDATE pedidos SET criado_em = '2026-01-01 10:00:00' WHERE id = ?",
+             (pedidos[0].id,))
+    return pedidos
+
+
+def test_triggers_conferem_com_o_recalculo(app):
+    movimentar_pedidos()
+
+    assert PedidoRepository.reconstruir_estatisticas(apenas_verificar=True) == []
+    assert PedidoRepository.obter_estatisticas() == {
+        'total_pedidos': 4,
+        'pedidos_por_status': {'preparando': 1, 'finalizado': 2, 'cancelado': 1},
+        'receita_total': 20.5
+    }
+    assert PedidoRepository.obter_estatisticas_diarias('2026-01-01')['2026-01-01'] == {
+        'preparando': {'quantidade': 1, 'total': 10.0}
+    }
+
+
+def test_reconstruir_corrige_divergencias(app):
+    movimentar_pedidos()
+    executar("UPDATE pedidos_estatisticas_status SET quantidade = 9 WHERE status = 'finalizado'")
+    executar("DELETE FROM pedidos_estatisticas_diarias WHERE dia = '2026-01-01'")
+
+    divergencias = PedidoRepository.reconstruir_estatisticas(apenas_verificar=True)
+    assert divergencias == [
+        {'tabela': 'pedidos_estatisticas_status', 'chave': ['finalizado'],
+         'mantido': (9, 20.5), 'recalculado': (2, 20.5)},
+        {'tabela': 'pedidos_estatisticas_diarias', 'chave': ['2026-01-01', 'preparando'],
+         'mantido': None, 'recalculado': (1, 10.0)},
+    ]
+    # Só verificar não grava nada
+    assert PedidoRepository.reconstruir_estatisticas(apenas_verificar=True) == divergencias
+
+    assert PedidoRepository.reconstruir_estatisticas() == divergencias
+    assert PedidoRepository.reconstruir_estatisticas(apenas_verificar=True) == []
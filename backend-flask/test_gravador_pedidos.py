@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Timeout da gravação em lote: a requisição só falha se o pedido não foi gravado"""
+
+import threading
+import time
+
+import pytest
+
+from app import create_app
+from app.models.db import get_connection, pragmas_da_config
+from app.models.pedido import Pedido, ItemPedido
+from app.models.produto import Produto
+from app.models.usuario import Usuario
+from app.repositories.pedido_repository import PedidoRepository
+from app.repositories.produto_repository import ProdutoRepository
+from app.repositories.usuario_repository import UsuarioRepository
+from app.service.gravador_pedidos import FilaPedidosAtrasadaError, GravadorPedidos
+
+# Segundos que o gravador leva no primeiro pedido
+LENTIDAO = 0.6
+
+
+@pytest.fixture
+def ambiente(tmp_path, monkeypatch):
+    """App em banco temporário, um usuário, um produto e um gravador lento"""
+    app = create_app({'DB_PATH': str(tmp_path / 'db.sqlite3'), 'DB_CHECKPOINT_INTERVALO': 0})
+    with app.app_context():
+        usuario = UsuarioRepository.criar(Usuario(nome='Ana', email='ana@email.com',
+                                                  senha='x', role='client'))
+        produto = ProdutoRepository.criar(Produto(nome='Coxinha', preco=6.0, categoria='Lanches'))
+
+    em_gravacao = threading.Event()
+    inserir_original = PedidoRepository.inserir_com_itens
+
+    def inserir_lento(cursor, pedido, itens):
+        if not em_gravacao.is_set():
+            em_gravacao.set()
+            time.sleep(LENTIDAO)
+        return inserir_original(cursor, pedido, itens)
+
+    monkeypatch.setattr(PedidoRepository, 'inserir_com_itens', staticmethod(inserir_lento))
+
+    gravador = GravadorPedidos(app.config['DB_PATH'], espera_maxima=0.0, timeout=0.2,
+                               pragmas=pragmas_da_config(app.config))
+    yield app, gravador, usuario, produto, em_gravacao
+    gravador.parar()
+
+
+def novo_pedido(usuario, produto):
+    return (Pedido(usuario_id=usuario.id, total=6.0),
+            [ItemPedido(produto_id=produto.id, quantidade=1, preco_unitario=6.0)])
+
+
+def contar_pedidos(app):
+    with app.app_context():
+        conn = get_connection()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM pedidos").fetchone()[0]
+        finally:
+            conn.close()
+
+
+def test_pedido_em_gravacao_espera_o_commit_apos_o_timeout(ambiente):
+    app, gravador, usuario, produto, _ = ambiente
+
+    # O gravador já pegou o pedido quando o timeout vence: espera o lote
+    pedido = gravador.gravar(*novo_pedido(usuario, produto))
+
+    assert pedido.id is not None
+    assert contar_pedidos(app) == 1
+
+
+def test_pedido_ainda_na_fila_e_cancelado_sem_ser_gravado(ambiente):
+    app, gravador, usuario, produto, em_gravacao = ambiente
+
+    primeiro = gravador.enviar(*novo_pedido(usuario, produto))
+    assert em_gravacao.wait(1.0)
+
+    # O segundo fica na fila atrás do lote lento e vence o timeout lá
+    with pytest.raises(FilaPedidosAtrasadaError):
+        gravador.gravar(*novo_pedido(usuario, produto))
+
+    assert primeiro.result(timeout=2.0).id is not None
+    gravador.parar()
+    assert contar_pedidos(app) == 1
+    assert gravador.stats()['expirados'] == 1
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Idempotency-Key em POST /api/pedidos/: repetição, 409 em andamento e 422 com outro corpo"""
+
+import hashlib
+import json
+
+import pytest
+
+from app import create_app
+from app.models.db import get_connection
+from app.models.produto import Produto
+from app.models.usuario import Usuario
+from app.repositories.produto_repository import ProdutoRepository
+from app.repositories.usuario_repository import UsuarioRepository
+from app.utils.idempotencia import reservar
+from app.utils.jwt_utils import generate_token
+
+
+@pytest.fixture
+def ambiente(tmp_path):
+    """App em banco temporário, duas clientes e um produto"""
+    app = create_app({'DB_PATH': str(tmp_path / 'db.sqlite3'), 'DB_CHECKPOINT_INTERVALO': 0,
+                      'JWT_REVOGACAO_VERIFICACAO': 0})
+    with app.app_context():
+        usuarios = [UsuarioRepository.criar(Usuario(nome=nome, email=f'{nome.lower()}@email.com',
+                                                    senha='x', role='client'))
+                    for nome in ('Ana', 'Bia')]
+        produto = ProdutoRepository.criar(Produto(nome='Coxinha', preco=6.0, categoria='Lanches'))
+    return app, usuarios, produto
+
+
+def corpo_pedido(produto, quantidade=1):
+    return json.dumps({'itens_carrinho': [{'produto_id': produto.id, 'quantidade': quantidade}]})
+
+
+def criar_pedido(app, usuario, corpo, chave='carrinho-1'):
+    token = generate_token({'user_id': usuario.id, 'email': usuario.email,
+                            'role': usuario.role, 'is_admin': False})
+    return app.test_client().post('/api/pedidos/', data=corpo, content_type='application/json',
+                                  headers={'Authorization': f'Bearer {token}',
+                                           'Idempotency-Key': chave})
+
+
+def contar_pedidos(app):
+    with app.app_context():
+        conn = get_connection()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM pedidos").fetchone()[0]
+        finally:
+            conn.close()
+
+
+def test_repeticao_devolve_a_resposta_gravada(ambiente):
+    app, (ana, _), produto = ambiente
+
+    primeira = criar_pedido(app, ana, corpo_pedido(produto))
+    repetida = criar_pedido(app, ana, corpo_pedido(produto))
+
+    assert primeira.status_code == repetida.status_code == 201
+    assert 'Idempotent-Replayed' not in primeira.headers
+    assert repetida.headers['Idempotent-Replayed'] == 'true'
+    assert repetida.json == primeira.json
+    assert contar_pedidos(app) == 1
+
+
+def test_chave_em_andamento_responde_409(ambiente):
+    app, (ana, _), produto = ambiente
+    corpo = corpo_pedido(produto)
+    with app.app_context():
+        # Primeira tentativa ainda rodando: chave reservada sem resposta
+        assert reservar(ana.id, 'carrinho-1', hashlib.sha256(corpo.encode()).hexdigest()) is None
+
+    resposta = criar_pedido(app, ana, corpo)
+
+    assert resposta.status_code == 409
+    assert resposta.headers['Retry-After'] == '1'
+    assert contar_pedidos(app) == 0
+
+
+def test_mesma_chave_com_outro_corpo_responde_422(ambiente):
+    app, (ana, _), produto = ambiente
+    assert criar_pedido(app, ana, corpo_pedido(produto)).status_code == 201
+
+    resposta = criar_pedido(app, ana, corpo_pedido(produto, quantidade=2))
+
+    assert resposta.status_code == 422
+    assert contar_pedidos(app) == 1
+
+
+def test_resposta_de_erro_libera_a_chave(ambiente):
+    app, (ana, _), produto = ambiente
+    with app.app_context():
+        ProdutoRepository.atualizar(produto.id, disponivel=False)
+    assert criar_pedido(app, ana, corpo_pedido(produto)).status_code == 400
+
+    with app.app_context():
+        ProdutoRepository.atualizar(produto.id, disponivel=True)
+    resposta = criar_pedido(app, ana, corpo_pedido(produto))
+
+    assert resposta.status_code == 201
+    assert 'Idempotent-Replayed' not in resposta.headers
+    assert contar_pedidos(app) == 1
+
+
+def test_chaves_valem_por_usuario(ambiente):
+    app, (ana, bia), produto = ambiente
+
+    assert criar_pedido(app, ana, corpo_pedido(produto)).status_code == 201
+    resposta = criar_pedido(app, bia, corpo_pedido(produto))
+
+    assert resposta.status_code == 201
+    assert 'Idempotent-Replayed' not in resposta.headers
+    assert contar_pedidos(app) == 2
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Limite de taxa do login: 429 com Retry-After e devolução da ficha do IP no sucesso"""
+
+import pytest
+
+from app import create_app
+from app.models.usuario import Usuario
+from app.repositories.usuario_repository import UsuarioRepository
+
+
+@pytest.fixture(params=['memoria', 'sqlite'])
+def app(request, tmp_path):
+    """App em banco temporário, com cada backend do limitador e uma cliente"""
+    app = create_app({
+        'DB_PATH': str(tmp_path / 'db.sqlite3'), 'DB_CHECKPOINT_INTERVALO': 0,
+        'SENHA_SCRYPT_N': 2 ** 10,
+        'LOGIN_LIMITE_BACKEND': request.param,
+        'LOGIN_LIMITE_IP_RAJADA': 3, 'LOGIN_LIMITE_IP_POR_MINUTO': 1.0,
+        'LOGIN_LIMITE_EMAIL_RAJADA': 2, 'LOGIN_LIMITE_EMAIL_POR_MINUTO': 1.0,
+    })
+    with app.app_context():
+        # Senha antiga em texto puro: confere e é convertida para scrypt no login
+        UsuarioRepository.criar(Usuario(nome='Ana', email='ana@email.com',
+                                        senha='segredo', role='client'))
+    return app
+
+
+def login(cliente, email='ana@email.com', senha='segredo'):
+    return cliente.post('/api/auth/login',
+                        json={'email': email, 'senha': senha, 'role': 'client'})
+
+
+def test_email_sem_fichas_responde_429_com_retry_after(app):
+    cliente = app.test_client()
+
+    # O email é normalizado: maiúsculas e espaços contam para o mesmo balde
+    assert login(cliente, senha='errada').status_code == 401
+    assert login(cliente, email=' ANA@email.com ', senha='errada').status_code == 401
+    resposta = login(cliente)
+
+    assert resposta.status_code == 429
+    # Uma ficha por minuto: a próxima chega em 60 s
+    assert resposta.headers['Retry-After'] == '60'
+    assert 'erro' in resposta.json
+    # Outro email do mesmo IP ainda tem ficha
+    assert login(cliente, email='bia@email.com').status_code == 401
+
+
+def test_login_com_sucesso_devolve_a_ficha_do_ip(app):
+    cliente = app.test_client()
+
+    # Sucessos não gastam o balde do IP (rajada 3); só o do email
+    for _ in range(2):
+        assert login(cliente).status_code == 200
+
+    # As três fichas do IP continuam lá para as falhas
+    for email in ('x@email.com', 'y@email.com', 'z@email.com'):
+        assert login(cliente, email=email).status_code == 401
+    resposta = login(cliente, email='w@email.com')
+
+    assert resposta.status_code == 429
+    assert resposta.headers['Retry-After'] == '60'
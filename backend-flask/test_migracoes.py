@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Migrações numeradas: ordem, schema_version, falha atômica e trava entre workers"""
+
+import os
+import shutil
+import sqlite3
+import threading
+
+import pytest
+
+from app.models.migracoes import MigracaoError, listar_migracoes, migrar, versoes_aplicadas
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRACOES_PATH = os.path.join(BASE_DIR, 'database', 'migracoes')
+DB_EXEMPLO = os.path.join(BASE_DIR, 'database', 'db.sqlite3')
+
+
+def escrever(diretorio, arquivo, sql):
+    with open(os.path.join(diretorio, arquivo), 'w', encoding='utf-8') as f:
+        f.write(sql)
+
+
+def consultar(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def registradas(db_path):
+    return consultar(db_path, "SELECT versao, nome FROM schema_version ORDER BY versao")
+
+
+@pytest.fixture
+def migracoes(tmp_path):
+    """Diretório de migrações de teste com duas versões"""
+    diretorio = tmp_path / 'migracoes'
+    diretorio.mkdir()
+    escrever(diretorio, '0001_inicial.sql', "CREATE TABLE itens (id INTEGER PRIMARY KEY);")
+    escrever(diretorio, '0002_nome.sql', "ALTER TABLE itens ADD COLUMN nome TEXT;")
+    return str(diretorio)
+
+
+def test_ordem_numerica_e_arquivos_ignorados(migracoes):
+    escrever(migracoes, '10_dez.sql', "SELECT 1;")
+    escrever(migracoes, '0003_tres.sql', "SELECT 1;")
+    escrever(migracoes, 'LEIAME.md', "")
+    escrever(migracoes, '0004_rascunho.sql.bak', "")
+
+    assert [(versao, nome) for versao, nome, _ in listar_migracoes(migracoes)] == [
+        (1, 'inicial'), (2, 'nome'), (3, 'tres'), (10, 'dez')]
+
+
+def test_versao_repetida_e_recusada(migracoes):
+    escrever(migracoes, '02_outra.sql', "SELECT 1;")
+
+    with pytest.raises(MigracaoError, match='Versão 2 repetida'):
+        listar_migracoes(migracoes)
+
+
+def test_aplica_uma_vez_e_registra_em_schema_version(tmp_path, migracoes):
+    db_path = str(tmp_path / 'db.sqlite3')
+
+    assert migrar(db_path, migracoes) == [1, 2]
+    assert migrar(db_path, migracoes) == []
+    assert registradas(db_path) == [(1, 'inicial'), (2, 'nome')]
+
+    escrever(migracoes, '0003_preco.sql', "ALTER TABLE itens ADD COLUMN preco REAL;")
+    assert migrar(db_path, migracoes) == [3]
+    assert [coluna[1] for coluna in consultar(db_path, "PRAGMA table_info(itens)")] == \
+        ['id', 'nome', 'preco']
+
+
+def test_migracao_com_erro_nao_deixa_ddl_nem_registro(tmp_path, migracoes):
+    db_path = str(tmp_path / 'db.sqlite3')
+    escrever(migracoes, '0003_quebrada.sql',
+             "CREATE TABLE extras (id INTEGER);\nINSERT INTO tabela_inexistente VALUES (1);")
+    escrever(migracoes, '0004_depois.sql', "CREATE TABLE depois (id INTEGER);")
+
+    with pytest.raises(MigracaoError, match='0003_quebrada'):
+        migrar(db_path, migracoes)
+
+    # As anteriores ficam; a quebrada e as seguintes não rodam
+    assert registradas(db_path) == [(1, 'inicial'), (2, 'nome')]
+    tabelas = {linha[0] for linha in consultar(db_path, "SELECT name FROM sqlite_master")}
+    assert 'extras' not in tabelas and 'depois' not in tabelas
+
+
+def test_versao_anterior_a_atual_nunca_aplicada_e_recusada(tmp_path, migracoes):
+    db_path = str(tmp_path / 'db.sqlite3')
+    escrever(migracoes, '0005_cinco.sql', "SELECT 1;")
+    migrar(db_path, migracoes)
+
+    escrever(migracoes, '0004_atrasada.sql', "SELECT 1;")
+    with pytest.raises(MigracaoError, match='0004_atrasada'):
+        migrar(db_path, migracoes)
+
+
+def test_workers_simultaneos_migram_uma_vez(tmp_path, migracoes):
+    db_path = str(tmp_path / 'db.sqlite3')
+    # Migração demorada o bastante para os outros workers esperarem a trava
+    escrever(migracoes, '0003_carga.sql', """
+        CREATE TABLE numeros (n INTEGER);
+        WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < 200000)
+        INSERT INTO numeros SELECT n FROM seq;
+    """)
+    largada = threading.Barrier(6)
+    aplicadas, erros = [], []
+
+    def worker():
+        largada.wait()
+        try:
+            aplicadas.extend(migrar(db_path, migracoes))
+        except Exception as e:
+            erros.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    assert erros == []
+    assert sorted(aplicadas) == [1, 2, 3]
+    assert consultar(db_path, "SELECT COUNT(*) FROM numeros") == [(200000,)]
+
+
+def test_banco_de_exemplo_chega_a_ultima_versao_com_os_dados(tmp_path):
+    db_path = str(tmp_path / 'db.sqlite3')
+    shutil.copy(DB_EXEMPLO, db_path)
+    pedidos = consultar(db_path, "SELECT COUNT(*) FROM pedidos")
+
+    aplicadas = migrar(db_path, MIGRACOES_PATH)
+
+    ultima = listar_migracoes(MIGRACOES_PATH)[-1][0]
+    assert aplicadas == list(range(1, ultima + 1))
+    conn = sqlite3.connect(db_path)
+    try:
+        assert versoes_aplicadas(conn) == set(aplicadas)
+    finally:
+        conn.close()
+    assert consultar(db_path, "SELECT COUNT(*) FROM pedidos") == pedidos
+    # Cargas condicionais das migrações: estatísticas e busca cobrem os dados antigos
+    assert consultar(db_path, "SELECT COALESCE(SUM(quantidade), 0) FROM pedidos_estatisticas_status") \
+        == pedidos
+    assert consultar(db_path, "SELECT COUNT(*) FROM produtos_fts_docsize") == \
+        consultar(db_path, "SELECT COUNT(*) FROM produtos")
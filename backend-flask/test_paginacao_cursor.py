@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Paginação por cursor de GET /api/pedidos/: empates em criado_em e cursor inválido"""
+
+import pytest
+
+from app import create_app
+from app.models.db import get_connection
+from app.models.usuario import Usuario
+from app.repositories.usuario_repository import UsuarioRepository
+from app.utils.jwt_utils import generate_token
+
+# (usuário, criado_em): três pedidos no mesmo segundo para testar o desempate por id
+PEDIDOS = [
+    ('ana', '2026-01-01 10:00:00'),
+    ('ana', '2026-01-01 12:00:00'),
+    ('bia', '2026-01-01 12:00:00'),
+    ('ana', '2026-01-01 12:00:00'),
+    ('bia', '2026-01-02 08:00:00'),
+    ('ana', '2026-01-03 09:30:00'),
+    ('ana', '2026-01-03 09:30:00'),
+]
+
+
+def token_de(usuario):
+    return generate_token({'user_id': usuario.id, 'email': usuario.email,
+                           'role': usuario.role, 'is_admin': False})
+
+
+@pytest.fixture
+def ambiente(tmp_path):
+    """App em banco temporário, duas clientes, uma atendente e os PEDIDOS"""
+    app = create_app({'DB_PATH': str(tmp_path / 'db.sqlite3'), 'DB_CHECKPOINT_INTERVALO': 0,
+                      'JWT_REVOGACAO_VERIFICACAO': 0})
+    with app.app_context():
+        usuarios = {
+            'ana': UsuarioRepository.criar(Usuario(nome='Ana', email='ana@email.com',
+                                                   senha='x', role='client')),
+            'bia': UsuarioRepository.criar(Usuario(nome='Bia', email='bia@email.com',
+                                                   senha='x', role='client')),
+            'caio': UsuarioRepository.criar(Usuario(nome='Caio', email='caio@email.com',
+                                                    senha='x', role='attendant')),
+        }
+        conn = get_connection()
+        conn.executemany(
+            "INSERT INTO pedidos (usuario_id, total, criado_em) VALUES (?, 10.0, ?)",
+            [(usuarios[nome].id, criado_em) for nome, criado_em in PEDIDOS])
+        conn.commit()
+        conn.close()
+    return app, usuarios
+
+
+def ids_esperados(usuario=None):
+    """Ids na ordem da listagem: criado_em DESC, id DESC"""
+    pedidos = [(criado_em, pedido_id) for pedido_id, (nome, criado_em) in enumerate(PEDIDOS, 1)
+               if usuario is None or nome == usuario]
+    return [pedido_id for _, pedido_id in sorted(pedidos, reverse=True)]
+
+
+def percorrer(cliente, token, **parametros):
+    """Segue next_cursor até a última página; retorna os ids e o número de páginas"""
+    ids, paginas, cursor = [], 0, None
+    while True:
+        query = dict(parametros, limit=2, **({'cursor': cursor} if cursor else {}))
+        resposta = cliente.get('/api/pedidos/', query_string=query,
+                               headers={'Authorization': f'Bearer {token}'})
+        assert resposta.status_code == 200
+        ids += [pedido['id'] for pedido in resposta.json['pedidos']]
+        paginas += 1
+        cursor = resposta.json['next_cursor']
+        if cursor is None:
+            return ids, paginas
+
+
+@pytest.mark.parametrize('parametros', [{}, {'fields': 'id,criado_em'}])
+def test_paginas_cobrem_todos_os_pedidos_sem_repetir_empates(ambiente, parametros):
+    app, usuarios = ambiente
+
+    ids, paginas = percorrer(app.test_client(), token_de(usuarios['caio']), **parametros)
+
+    assert ids == ids_esperados()
+    assert paginas == 4
+
+
+def test_cliente_pagina_apenas_os_proprios_pedidos(ambiente):
+    app, usuarios = ambiente
+
+    ids, _ = percorrer(app.test_client(), token_de(usuarios['ana']))
+
+    assert ids == ids_esperados('ana')
+
+
+@pytest.mark.parametrize('cursor', ['nao-e-base64!', 'WzEsMl0', 'eyJhIjoxfQ'])
+def test_cursor_malformado_responde_400(ambiente, cursor):
+    app, usuarios = ambiente
+
+    resposta = app.test_client().get(
+        '/api/pedidos/', query_string={'cursor': cursor},
+        headers={'Authorization': f"Bearer {token_de(usuarios['caio'])}"})
+
+    assert resposta.status_code == 400
+    assert resposta.json == {'erro': 'Cursor de paginação inválido'}
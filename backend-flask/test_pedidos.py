@@ -4,10 +4,22 @@
 from app import create_app
 from app.service.pedido_service import PedidoService
 import json
+import os
+import shutil
+import tempfile
+
+DB_EXEMPLO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database', 'db.sqlite3')
 
 def test_pedidos():
     """Testa se os pedidos estão retornando dados do produto"""
-    app = create_app()
+    # Usa uma cópia: a aplicação migra o banco e o deixa em modo WAL
+    with tempfile.TemporaryDirectory() as diretorio:
+        db_path = os.path.join(diretorio, 'db.sqlite3')
+        shutil.copy(DB_EXEMPLO, db_path)
+        app = create_app({'DB_PATH': db_path, 'DB_CHECKPOINT_INTERVALO': 0})
+        _listar_pedidos(app)
+
+def _listar_pedidos(app):
     with app.app_context():
         try:
             # Listar todos os pedidos
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""Confere o plano (EXPLAIN QUERY PLAN) de toda SQL executada pelos repositórios.
+
+Cada método público dos repositórios é chamado contra um banco temporário
+enquanto as conexões registram as instruções executadas. O teste falha se
+alguma delas:
+- varre uma tabela inteira (SCAN sem índice, ou percorrendo um índice
+  completo sem LIMIT), ou
+- ordena/agrupa em uma B-tree temporária (USE TEMP B-TREE).
+
+Percorrer um índice parcial conta como busca: ele só tem as linhas pedidas.
+Varreduras que são o próprio objetivo da consulta ficam em
+VARREDURAS_INTENCIONAIS, com o motivo.
+"""
+
+import functools
+import re
+
+import pytest
+
+from app import create_app
+from app.models import db
+from app.models.categoria import Categoria
+from app.models.pedido import Pedido, ItemPedido, StatusPedido
+from app.models.produto import Produto
+from app.models.usuario import Usuario
+from app.repositories.categoria_repository import CategoriaRepository
+from app.repositories.pedido_repository import PedidoRepository, ItemPedidoRepository
+from app.repositories.produto_repository import ProdutoRepository
+from app.repositories.revogacao_tokens import obter_lista_revogacao
+from app.repositories.usuario_repository import UsuarioRepository
+
+REPOSITORIOS = (PedidoRepository, ItemPedidoRepository, ProdutoRepository,
+                CategoriaRepository, UsuarioRepository)
+
+# Consultas que leem a tabela inteira de propósito (regex sobre a SQL normalizada)
+VARREDURAS_INTENCIONAIS = {
+    r"^SELECT .* FROM produtos ORDER BY nome$":
+        "carga do catálogo inteiro no cache e listagem sem filtro",
+    r"^SELECT COUNT\(\*\) FROM (produtos|pedidos)$":
+        "contagem total",
+    r"^SELECT rowid FROM produtos_fts WHERE produtos_fts MATCH .* ORDER BY bm25\(":
+        "a relevância bm25 é calculada por consulta, não há índice para ela",
+    r"^SELECT .* FROM pedidos ORDER BY criado_em DESC, id DESC$":
+        "listagem de todos os pedidos sem limit",
+    r"^SELECT pe\.id, .* FROM pedidos pe LEFT JOIN .* ORDER BY pe\.criado_em, pe\.id, ip\.id$":
+        "exportação sem filtro percorre o histórico inteiro",
+    r"^SELECT status, quantidade, (CAST\(total AS REAL\)|total) FROM pedidos_estatisticas_status( WHERE quantidade > 0)?$":
+        "uma linha por status",
+    r"^SELECT dia, status, quantidade, total FROM pedidos_estatisticas_diarias$":
+        "reconstruir_estatisticas compara a tabela inteira",
+    r"^SELECT (date\(criado_em\), )?status, COUNT\(\*\), COALESCE\(SUM\(total\), 0\) FROM pedidos GROUP BY":
+        "reconstruir_estatisticas recalcula a partir de todos os pedidos",
+}
+
+
+@pytest.fixture
+def instrucoes(monkeypatch):
+    """Lista que recebe toda SQL executada pelas conexões abertas daqui em diante"""
+    executadas = []
+    conectar_original = db.conectar
+
+    def conectar(*args, **kwargs):
+        conn = conectar_original(*args, **kwargs)
+        conn.set_trace_callback(executadas.append)
+        return conn
+
+    monkeypatch.setattr(db, 'conectar', conectar)
+    return executadas
+
+
+@pytest.fixture
+def chamados(monkeypatch):
+    """Conjunto com os métodos públicos dos repositórios que foram chamados"""
+    registrados = set()
+
+    def envolver(funcao, chave):
+        @functools.wraps(funcao)
+        def chamada(*args, **kwargs):
+            registrados.add(chave)
+            return funcao(*args, **kwargs)
+        return staticmethod(chamada)
+
+    for classe in REPOSITORIOS:
+        for nome, valor in list(vars(classe).items()):
+            if isinstance(valor, staticmethod) and not nome.startswith('_'):
+                monkeypatch.setattr(classe, nome,
+                                    envolver(valor.__func__, f"{classe.__name__}.{nome}"))
+    return registrados
+
+
+def metodos_publicos():
+    return {f"{classe.__name__}.{nome}"
+            for classe in REPOSITORIOS
+            for nome, valor in vars(classe).items()
+            if isinstance(valor, staticmethod) and not nome.startswith('_')}
+
+
+def exercitar_repositorios():
+    """Chama cada método público dos repositórios com e sem os filtros opcionais"""
+    usuario = UsuarioRepository.criar(Usuario(nome='Ana', email='ana@email.com',
+                                              senha='x', role='client'))
+    UsuarioRepository.buscar_por_id(usuario.id)
+    UsuarioRepository.buscar_por_email('ana@email.com')
+    UsuarioRepository.listar_todos()
+    UsuarioRepository.listar_projetado(['id', 'nome'])
+    UsuarioRepository.atualizar_senha(usuario.id, 'y', 'x')
+    UsuarioRepository.atualizar(usuario.id, nome='Ana Maria', email='ana.maria@email.com')
+    UsuarioRepository.contar_usuarios()
+
+    categoria = CategoriaRepository.criar(Categoria(nome='Lanches'))
+    CategoriaRepository.buscar_por_id(categoria.id)
+    CategoriaRepository.buscar_por_nome('Lanches')
+    CategoriaRepository.listar_todas()
+    CategoriaRepository.atualizar(categoria.id, descricao='Salgados')
+    CategoriaRepository.contar_categorias()
+
+    produto = ProdutoRepository.criar(Produto(nome='Pão de queijo', preco=5.0,
+                                              categoria='Lanches'))
+    ProdutoRepository.buscar_por_id(produto.id)
+    ProdutoRepository.buscar_por_ids([produto.id])
+    ProdutoRepository.buscar_por_categoria('Lanches')
+    ProdutoRepository.listar_todos()
+    ProdutoRepository.listar_projetado(['id', 'nome'])
+    ProdutoRepository.listar_projetado(['id', 'nome'], disponiveis_apenas=True)
+    ProdutoRepository.listar_projetado(['id', 'nome'], categoria='Lanches')
+    ProdutoRepository.atualizar(produto.id, preco=6.0)
+    ProdutoRepository.contar_produtos()
+    ProdutoRepository.buscar_por_texto('pao')
+
+    pedido = PedidoRepository.criar(Pedido(usuario_id=usuario.id, total=6.0))
+    ItemPedidoRepository.criar(ItemPedido(pedido_id=pedido.id, produto_id=produto.id,
+                                          quantidade=1, preco_unitario=6.0))
+    pedido = PedidoRepository.criar_com_itens(
+        Pedido(usuario_id=usuario.id, total=12.0),
+        [ItemPedido(produto_id=produto.id, quantidade=2, preco_unitario=6.0)])
+    PedidoRepository.buscar_por_id(pedido.id)
+    ItemPedidoRepository.buscar_por_id(1)
+    ItemPedidoRepository.buscar_por_pedido(pedido.id)
+    ItemPedidoRepository.buscar_por_pedidos([1, pedido.id])
+
+    cursor = ('2030-01-01 00:00:00', 10)
+    for status in (None, StatusPedido.EM_ANDAMENTO.value):
+        PedidoRepository.buscar_por_usuario(usuario.id, status)
+        PedidoRepository.buscar_por_usuario(usuario.id, status, limit=20)
+        PedidoRepository.buscar_por_usuario(usuario.id, status, limit=20, cursor=cursor)
+        PedidoRepository.listar_todos(status)
+        PedidoRepository.listar_todos(status, limit=20)
+        PedidoRepository.listar_todos(status, limit=20, offset=40)
+        PedidoRepository.listar_todos(status, limit=20, cursor=cursor)
+        PedidoRepository.listar_projetado(['id', 'total'], usuario.id, status, limit=20)
+        PedidoRepository.listar_projetado(['id', 'total'], None, status, limit=20, cursor=cursor)
+        PedidoRepository.contar_pedidos(status)
+        list(PedidoRepository.exportar(status))
+        list(PedidoRepository.exportar(status, '2020-01-01', '2030-01-01'))
+
+    PedidoRepository.ler_versao()
+    PedidoRepository.listar_fila([StatusPedido.EM_ANDAMENTO.value,
+                                  StatusPedido.PREPARANDO.value, StatusPedido.PRONTO.value])
+    PedidoRepository.atualizar(pedido.id, observacoes='Sem cebola')
+    PedidoRepository.atualizar_status_se(pedido.id, StatusPedido.EM_ANDAMENTO.value,
+                                         StatusPedido.PREPARANDO.value)
+    PedidoRepository.obter_estatisticas()
+    PedidoRepository.obter_estatisticas_diarias('2020-01-01')
+    PedidoRepository.reconstruir_estatisticas(apenas_verificar=True)
+
+    revogacao = obter_lista_revogacao()
+    revogacao.revogar('jti-teste', 4102444800)
+    revogacao.revogado('jti-teste')
+
+    ItemPedidoRepository.deletar_por_pedido(pedido.id)
+    PedidoRepository.deletar(pedido.id)
+    PedidoRepository.deletar_permanentemente(pedido.id)
+    UsuarioRepository.deletar(usuario.id)
+    ProdutoRepository.deletar(produto.id)
+    ProdutoRepository.deletar_permanentemente(produto.id)
+    CategoriaRepository.deletar(categoria.id)
+    CategoriaRepository.deletar_permanentemente(categoria.id)
+
+
+def consultas_distintas(instrucoes):
+    """SQL normalizada das consultas com plano (SELECT, UPDATE, DELETE), sem repetições"""
+    vistas = {}
+    for sql in instrucoes:
+        normalizada = " ".join(sql.split())
+        # Instruções internas do FTS5 sobre as tabelas-sombra
+        if "'main'." in normalizada:
+            continue
+        if re.match(r"(SELECT|WITH|UPDATE|DELETE)\b", normalizada, re.IGNORECASE):
+            vistas.setdefault(normalizada, None)
+    return list(vistas)
+
+
+def problemas_do_plano(conn, sql, indices_parciais):
+    plano = [linha[3] for linha in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+    problemas = []
+    for passo in plano:
+        if 'USE TEMP B-TREE' in passo:
+            problemas.append(passo)
+        elif passo.startswith('SCAN ') and 'VIRTUAL TABLE' not in passo \
+                and 'CONSTANT ROW' not in passo:
+            indice = re.search(r"USING (?:COVERING )?INDEX (\w+)", passo)
+            if indice and indice.group(1) in indices_parciais:
+                continue
+            # Percorrer um índice em ordem com LIMIT para cedo
+            if indice and re.search(r"\bLIMIT\b", sql):
+                continue
+            problemas.append(passo)
+    return plano, problemas
+
+
+def test_planos_das_consultas_dos_repositorios(tmp_path, instrucoes, chamados):
+    app = create_app({'DB_PATH': str(tmp_path / 'db.sqlite3'), 'DB_POOL_SIZE': 1,
+                      'DB_CHECKPOINT_INTERVALO': 0, 'JWT_REVOGACAO_VERIFICACAO': 0})
+
+    with app.app_context():
+        exercitar_repositorios()
+
+        faltando = metodos_publicos() - chamados
+        assert not faltando, f"Métodos sem chamada em exercitar_repositorios: {sorted(faltando)}"
+
+        consultas = consultas_distintas(instrucoes)
+        conn = db.get_connection()
+        indices_parciais = {nome for nome, sql in conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql LIKE '% WHERE %'")}
+
+        falhas = []
+        for sql in consultas:
+            if any(re.search(padrao, sql) for padrao in VARREDURAS_INTENCIONAIS):
+                continue
+            plano, problemas = problemas_do_plano(conn, sql, indices_parciais)
+            if problemas:
+                falhas.append(f"{sql}\n    " + "\n    ".join(plano))
+        conn.close()
+
+    assert not falhas, "Consultas com varredura ou ordenação temporária:\n" + "\n".join(falhas)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Pool de conexões: reutilização por app context e afinidade por thread"""
+
+import threading
+
+import pytest
+
+from app import create_app
+from app.models.db import ConnectionPool, PoolEsgotadoError, get_connection
+
+
+@pytest.fixture
+def app(tmp_path):
+    """App em banco temporário com pool de duas conexões"""
+    return create_app({'DB_PATH': str(tmp_path / 'db.sqlite3'), 'DB_POOL_SIZE': 2,
+                       'DB_CHECKPOINT_INTERVALO': 0})
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'pool.sqlite3'), max_size=2, timeout=0.1)
+    yield pool
+    pool.close_all()
+
+
+def test_mesma_conexao_durante_o_app_context_e_devolvida_no_teardown(app):
+    pool = app.extensions['sqlite_pool']
+
+    with app.app_context():
+        primeira = get_connection()
+        primeira.execute("SELECT 1")
+        # close() só encerra a transação; a conexão segue com o app context
+        primeira.close()
+        segunda = get_connection()
+        assert segunda._conn is primeira._conn
+        assert pool.stats() == {'abertas': 1, 'livres': 0, 'max_size': 2}
+
+    assert pool.stats() == {'abertas': 1, 'livres': 1, 'max_size': 2}
+
+    with app.app_context():
+        # O próximo app context da mesma thread reaproveita a conexão
+        assert get_connection()._conn is primeira._conn
+    assert pool.stats()['abertas'] == 1
+
+
+def test_transacao_pendente_e_descartada_ao_devolver(app):
+    with app.app_context():
+        conn = get_connection()
+        conn.execute("INSERT INTO categorias (nome) VALUES ('Bebidas')")
+        assert conn.in_transaction
+
+    with app.app_context():
+        conn = get_connection()
+        assert not conn.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM categorias").fetchone()[0] == 0
+
+
+def test_cada_thread_recebe_a_conexao_que_devolveu(pool):
+    usadas = {}
+    juntas = threading.Barrier(2)
+
+    def trabalhar(nome):
+        # As duas threads seguram uma conexão ao mesmo tempo e devolvem antes
+        # de pedir de novo: as duas ficam livres e cada thread escolhe uma
+        usadas[nome] = pool.acquire()
+        juntas.wait()
+        pool.release(usadas[nome])
+        juntas.wait()
+        usadas[nome + '_de_novo'] = pool.acquire()
+        juntas.wait()
+        pool.release(usadas[nome + '_de_novo'])
+
+    threads = [threading.Thread(target=trabalhar, args=(nome,)) for nome in ('a', 'b')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert usadas['a'] is not usadas['b']
+    assert usadas['a_de_novo'] is usadas['a']
+    assert usadas['b_de_novo'] is usadas['b']
+    assert pool.stats() == {'abertas': 2, 'livres': 2, 'max_size': 2}
+
+
+def test_pool_esgotado_recusa_apos_o_timeout(pool):
+    conexoes = [pool.acquire(), pool.acquire()]
+
+    with pytest.raises(PoolEsgotadoError):
+        pool.acquire()
+
+    pool.release(conexoes.pop())
+    assert pool.acquire() is not None
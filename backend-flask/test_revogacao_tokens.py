@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Logout revoga o token: a próxima requisição com ele responde 401, em qualquer worker"""
+
+import pytest
+
+from app import create_app
+from app.models.usuario import Usuario
+from app.repositories.revogacao_tokens import obter_lista_revogacao
+from app.repositories.usuario_repository import UsuarioRepository
+from app.utils.jwt_utils import generate_token
+
+
+def nova_app(db_path):
+    return create_app({'DB_PATH': db_path, 'DB_CHECKPOINT_INTERVALO': 0,
+                       'JWT_REVOGACAO_VERIFICACAO': 0})
+
+
+@pytest.fixture
+def ambiente(tmp_path):
+    """Duas apps (workers) no mesmo banco temporário e um usuário"""
+    db_path = str(tmp_path / 'db.sqlite3')
+    app = nova_app(db_path)
+    with app.app_context():
+        usuario = UsuarioRepository.criar(Usuario(nome='Ana', email='ana@email.com',
+                                                  senha='x', role='client'))
+    return app, nova_app(db_path), usuario
+
+
+def novo_token(usuario):
+    return generate_token({'user_id': usuario.id, 'email': usuario.email,
+                           'role': usuario.role, 'is_admin': False})
+
+
+def status_me(app, token):
+    resposta = app.test_client().get('/api/auth/me',
+                                     headers={'Authorization': f'Bearer {token}'})
+    return resposta.status_code
+
+
+def test_token_revogado_no_logout_responde_401(ambiente):
+    app, _, usuario = ambiente
+    token, outro_token = novo_token(usuario), novo_token(usuario)
+    # Token já verificado (e guardado no cache) antes do logout
+    assert status_me(app, token) == 200
+
+    resposta = app.test_client().post('/api/auth/logout',
+                                      headers={'Authorization': f'Bearer {token}'})
+
+    assert resposta.status_code == 200
+    assert status_me(app, token) == 401
+    # Só o token do logout deixa de valer
+    assert status_me(app, outro_token) == 200
+
+
+def test_revogacao_vale_para_os_outros_workers(ambiente):
+    app, outro_worker, usuario = ambiente
+    token = novo_token(usuario)
+    assert status_me(outro_worker, token) == 200
+
+    app.test_client().post('/api/auth/logout', headers={'Authorization': f'Bearer {token}'})
+
+    assert status_me(outro_worker, token) == 401
+    with outro_worker.app_context():
+        assert obter_lista_revogacao().stats()['revogados'] == 1
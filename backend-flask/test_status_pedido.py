@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Troca de status com compare-and-swap: 409 quando outra requisição mudou antes, 404 sem pedido"""
+
+import threading
+
+import pytest
+
+from app import create_app
+from app.models.pedido import Pedido, ItemPedido
+from app.models.produto import Produto
+from app.models.usuario import Usuario
+from app.repositories.pedido_repository import PedidoRepository
+from app.repositories.produto_repository import ProdutoRepository
+from app.repositories.usuario_repository import UsuarioRepository
+from app.utils.jwt_utils import generate_token
+
+
+@pytest.fixture
+def ambiente(tmp_path):
+    """App em banco temporário, uma atendente, uma cliente e um pedido em andamento"""
+    app = create_app({'DB_PATH': str(tmp_path / 'db.sqlite3'), 'DB_CHECKPOINT_INTERVALO': 0,
+                      'JWT_REVOGACAO_VERIFICACAO': 0})
+    with app.app_context():
+        atendente = UsuarioRepository.criar(Usuario(nome='Caio', email='caio@email.com',
+                                                    senha='x', role='attendant'))
+        cliente = UsuarioRepository.criar(Usuario(nome='Ana', email='ana@email.com',
+                                                  senha='x', role='client'))
+        produto = ProdutoRepository.criar(Produto(nome='Coxinha', preco=6.0, categoria='Lanches'))
+        pedido = PedidoRepository.criar_com_itens(
+            Pedido(usuario_id=cliente.id, total=6.0),
+            [ItemPedido(produto_id=produto.id, quantidade=1, preco_unitario=6.0)])
+    return app, atendente, cliente, pedido
+
+
+def cabecalhos(usuario):
+    token = generate_token({'user_id': usuario.id, 'email': usuario.email,
+                            'role': usuario.role, 'is_admin': False})
+    return {'Authorization': f'Bearer {token}'}
+
+
+def mudar_status(app, usuario, pedido_id, novo_status, status_atual=None):
+    dados = {'status': novo_status}
+    if status_atual:
+        dados['status_atual'] = status_atual
+    return app.test_client().put(f'/api/pedidos/{pedido_id}/status', json=dados,
+                                 headers=cabecalhos(usuario))
+
+
+def test_status_visto_desatualizado_responde_409_com_o_pedido_atual(ambiente):
+    app, atendente, _, pedido = ambiente
+
+    primeira = mudar_status(app, atendente, pedido.id, 'preparando', 'em_andamento')
+    # Segunda atendente ainda vê o pedido em andamento
+    segunda = mudar_status(app, atendente, pedido.id, 'cancelado', 'em_andamento')
+
+    assert primeira.status_code == 200
+    assert segunda.status_code == 409
+    assert segunda.json['pedido']['status'] == 'preparando'
+
+
+def test_transicoes_simultaneas_so_uma_vence(ambiente):
+    app, atendente, _, pedido = ambiente
+    largada = threading.Barrier(4)
+    respostas = []
+
+    def transicao(novo_status):
+        largada.wait()
+        respostas.append(mudar_status(app, atendente, pedido.id, novo_status, 'em_andamento'))
+
+    threads = [threading.Thread(target=transicao, args=(novo_status,))
+               for novo_status in ('preparando', 'cancelado', 'preparando', 'cancelado')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    codigos = sorted(resposta.status_code for resposta in respostas)
+    assert codigos == [200, 409, 409, 409]
+    vencedora = next(resposta for resposta in respostas if resposta.status_code == 200)
+    with app.app_context():
+        assert PedidoRepository.buscar_por_id(pedido.id).status == \
+            vencedora.json['pedido']['status']
+
+
+def test_cancelamento_que_perde_a_troca_responde_409(ambiente, monkeypatch):
+    app, _, cliente, pedido = ambiente
+    trocar_original = PedidoRepository.atualizar_status_se
+
+    def cozinha_antes(pedido_id, status_esperado, novo_status):
+        # A cozinha muda o status entre a leitura do cancelamento e a gravação
+        trocar_original(pedido_id, 'em_andamento', 'preparando')
+        return trocar_original(pedido_id, status_esperado, novo_status)
+
+    monkeypatch.setattr(PedidoRepository, 'atualizar_status_se', staticmethod(cozinha_antes))
+    resposta = app.test_client().put(f'/api/pedidos/{pedido.id}/cancelar',
+                                     headers=cabecalhos(cliente))
+
+    assert resposta.status_code == 409
+    assert resposta.json['pedido']['status'] == 'preparando'
+
+
+@pytest.mark.parametrize('status_atual', [None, 'em_andamento'])
+def test_pedido_inexistente_responde_404(ambiente, status_atual):
+    app, atendente, _, _ = ambiente
+
+    resposta = mudar_status(app, atendente, 999, 'preparando', status_atual)
+
+    assert resposta.status_code == 404
+    assert resposta.json == {'erro': 'Pedido não encontrado'}
@@ -60,8 +60,8 @@ export async function apiRequest<T>(
   }
 
   const config: RequestInit = {
-    headers,
     ...options,
+    headers,
   };
 
   try {
@@ -163,8 +163,17 @@ export const api = {
     }>('/api/auth/me');
   },
 
-  // Logout
+  // Logout: revoga o token no servidor e o remove localmente
   logout() {
+    const token = tokenManager.getToken();
+    if (token) {
+      fetch(`${API_BASE_URL}/api/auth/logout`, {
+        method: 'POST',
+        headers: { Authorization: `Bearer ${token}` },
+      }).catch(() => {
+        // O token local é removido de qualquer forma
+      });
+    }
     tokenManager.removeToken();
   },
 
@@ -369,7 +378,7 @@ export const api = {
       quantidade: number;
     }>;
     observacoes?: string;
-  }) {
+  }, idempotencyKey?: string) {
     return apiRequest<{
       mensagem: string;
       pedido: {
@@ -393,6 +402,8 @@ export const api = {
     }>('/api/pedidos/', {
       method: 'POST',
       body: JSON.stringify(data),
+      // Mesma chave em todas as tentativas: o backend repete a resposta em vez de criar outro pedido
+      headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : undefined,
     });
   },
 
@@ -400,11 +411,13 @@ export const api = {
     status?: string;
     limit?: number;
     offset?: number;
+    cursor?: string;
   }) {
     const params = new URLSearchParams();
     if (filters?.status) params.set('status', filters.status);
     if (filters?.limit) params.set('limit', filters.limit.toString());
     if (filters?.offset) params.set('offset', filters.offset.toString());
+    if (filters?.cursor) params.set('cursor', filters.cursor);
 
     const query = params.toString();
     const endpoint = `/api/pedidos/${query ? `?${query}` : ''}`;
@@ -429,9 +442,25 @@ export const api = {
         }>;
       }>;
       total: number;
+      next_cursor: string | null;
     }>(endpoint);
   },
 
+  // Assina o stream SSE de pedidos; retorna a função que encerra a conexão
+  subscribeOrders(onEvent: (event: { tipo: string; dados: any }) => void) {
+    const token = tokenManager.getToken();
+    const url = `${API_BASE_URL}/api/pedidos/stream${token ? `?token=${encodeURIComponent(token)}` : ''}`;
+    const source = new EventSource(url);
+
+    for (const tipo of ['pedido_criado', 'status_atualizado', 'resync']) {
+      source.addEventListener(tipo, (event) => {
+        onEvent({ tipo, dados: JSON.parse((event as MessageEvent).data) });
+      });
+    }
+
+    return () => source.close();
+  },
+
   async getOrder(id: number) {
     return apiRequest<{
       pedido: {
@@ -455,13 +484,14 @@ export const api = {
     }>(`/api/pedidos/${id}`);
   },
 
-  async updateOrderStatus(id: number, status: string) {
+  async updateOrderStatus(id: number, status: string, statusAtual?: string) {
+    // status_atual: a troca só acontece se o pedido ainda estiver nesse status (409 se mudou)
     return apiRequest<{
       mensagem: string;
       pedido: any;
     }>(`/api/pedidos/${id}/status`, {
       method: 'PUT',
-      body: JSON.stringify({ status }),
+      body: JSON.stringify({ status, status_atual: statusAtual }),
     });
   },
 
@@ -489,6 +519,20 @@ export const api = {
     }>('/api/pedidos/estatisticas');
   },
 
+  // Executa várias leituras (GET) em uma única chamada a /api/batch
+  async batch(requisicoes: Array<{ id?: string; url: string }>) {
+    return apiRequest<{
+      respostas: Array<{
+        id: string | number;
+        status: number;
+        corpo: any;
+      }>;
+    }>('/api/batch', {
+      method: 'POST',
+      body: JSON.stringify({ requisicoes }),
+    });
+  },
+
   // Verificar se está autenticado
   isAuthenticated(): boolean {
     return tokenManager.hasToken();
@@ -1,4 +1,4 @@
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useMemo, useRef, useState } from "react";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
 import { RadioGroup, RadioGroupItem } from "@/components/ui/radio-group";
@@ -70,6 +70,13 @@ const Checkout = () => {
     setCartItems(items => items.filter((_, i) => i !== index));
   };
 
+  // Chave de idempotência do pedido atual; reaproveitada se o envio falhar e o
+  // usuário tentar de novo, e descartada quando o carrinho ou as observações mudam
+  const orderKeyRef = useRef<string | null>(null);
+  useEffect(() => {
+    orderKeyRef.current = null;
+  }, [cartItems, observacoes]);
+
   const handleConfirmOrder = async () => {
     if (!user) {
       toast.error("Você precisa estar logado para fazer um pedido");
@@ -92,10 +99,11 @@ const Checkout = () => {
       }));
 
       // Criar pedido na API
+      orderKeyRef.current ??= crypto.randomUUID();
       const response = await api.createOrder({
         itens_carrinho: itensCarrinho,
         observacoes: observacoes.trim() || undefined
-      });
+      }, orderKeyRef.current);
 
       toast.success(`Pedido #${response.pedido.id} criado com sucesso! 🎉`);
 
@@ -53,6 +53,36 @@ const Orders = () => {
     loadOrders();
   }, [canManageOrders, statusFilter]);
 
+  // Aplicar na lista os pedidos que chegam pelo stream; só o "resync" (eventos
+  // perdidos) recarrega a lista inteira
+  useEffect(() => {
+    if (!canManageOrders) return;
+
+    return api.subscribeOrders(({ tipo, dados }) => {
+      if (tipo === 'resync') {
+        loadOrders();
+        return;
+      }
+      if (dados?.pedido) {
+        aplicarPedido(dados.pedido);
+      }
+    });
+  }, [canManageOrders, statusFilter]);
+
+  const aplicarPedido = (pedido: Partial<Order> & { id: number }) => {
+    setOrders((atuais) => {
+      const anterior = atuais.find((order) => order.id === pedido.id);
+      const restantes = atuais.filter((order) => order.id !== pedido.id);
+      const atualizado = { ...anterior, ...pedido, itens: pedido.itens ?? anterior?.itens ?? [] } as Order;
+
+      if (statusFilter !== "all" && atualizado.status !== statusFilter) {
+        return restantes;
+      }
+      // Mais recentes primeiro, como a listagem (ids crescem com a criação)
+      return [...restantes, atualizado].sort((a, b) => b.id - a.id);
+    });
+  };
+
   const loadOrders = async () => {
     try {
       setIsLoading(true);
@@ -70,14 +100,15 @@ const Orders = () => {
     }
   };
 
-  const updateOrderStatus = async (orderId: number, newStatus: string) => {
+  const updateOrderStatus = async (orderId: number, newStatus: string, currentStatus: string) => {
     try {
-      await api.updateOrderStatus(orderId, newStatus);
+      await api.updateOrderStatus(orderId, newStatus, currentStatus);
       toast.success('Status do pedido atualizado!');
       loadOrders(); // Recarregar pedidos
     } catch (error: any) {
       console.error('Erro ao atualizar status:', error);
       toast.error(error.message || 'Erro ao atualizar status');
+      loadOrders(); // Outro atendente pode ter mudado o pedido
     }
   };
 
@@ -292,7 +323,7 @@ const Orders = () => {
                           key={nextStatus}
                           size="sm"
                           variant={nextStatus === 'cancelado' ? 'destructive' : 'default'}
-                          onClick={() => updateOrderStatus(order.id, nextStatus)}
+                          onClick={() => updateOrderStatus(order.id, nextStatus, order.status)}
                         >
                           {nextStatus === 'finalizado' && 'Finalizar Pedido'}
                           {nextStatus === 'cancelado' && 'Cancelar Pedido'}